@@ -0,0 +1 @@
+"""Benchmark suite for the job handlers; run with ``python -m bench``."""
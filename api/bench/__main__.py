@@ -0,0 +1,228 @@
+"""Benchmark every job handler on synthetic media.
+
+Run from the ``api`` directory (or in the API/worker container):
+
+    python -m bench                                  # small inputs
+    python -m bench --sizes all --repeat 3 --output after.json
+    python -m bench --baseline before.json           # compare, exit 1 on regressions
+
+Each case runs in its own process and reports wall time, CPU time (its own,
+its pool worker's and ffmpeg's), peak RSS, output size and per-stage times.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from bench.cases import Case, build_cases
+from bench.media import SIZES, ensure_media
+from config import get_settings
+from models.job import JobType
+
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Differences below these are treated as noise when comparing to a baseline
+NOISE_SECONDS = 0.02
+NOISE_MB = 5.0
+
+COMPARED_METRICS = ("wall_seconds", "cpu_seconds", "peak_rss_mb")
+
+
+def _run_once(case: Case, args: argparse.Namespace, env: dict[str, str]) -> dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        cmd = [
+            sys.executable, "-m", "bench.run_case",
+            "--case", case.name,
+            "--video-seconds", str(args.video_seconds),
+            "--result", result_path,
+        ]
+        if args.redis:
+            cmd.append("--redis")
+        if args.keep_output:
+            cmd.append("--keep-output")
+        completed = subprocess.run(cmd, cwd=API_DIR, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            return {"case": case.name, "error": lines[-1] if lines else f"exited with {completed.returncode}"}
+        with open(result_path, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_path)
+
+
+def _summarize(case: Case, runs: list[dict[str, Any]]) -> dict[str, Any]:
+    ok = [run for run in runs if not run.get("error")]
+    summary = {"case": case.name, "job_type": case.job_type, "size": case.size, "runs": runs}
+    if not ok:
+        summary["error"] = runs[-1].get("error")
+        return summary
+
+    last = ok[-1]
+    summary.update({
+        "input_bytes": last["input_bytes"],
+        "wall_seconds": statistics.median(run["wall_seconds"] for run in ok),
+        "cpu_seconds": statistics.median(run["cpu_seconds"] for run in ok),
+        "peak_rss_mb": max(run["peak_rss_mb"] for run in ok),
+        "output_bytes": last["output_bytes"],
+        "stages": last["stages"],
+        "error": None,
+    })
+    return summary
+
+
+def _compare(results: list[dict[str, Any]], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """Print the change against the baseline per case; returns the regressions."""
+    previous = {entry["case"]: entry for entry in baseline.get("cases", [])}
+    regressions = []
+
+    print(f"\nCompared with baseline from {baseline.get('meta', {}).get('started_at', '?')}:")
+    for entry in results:
+        old = previous.get(entry["case"])
+        if not old or old.get("error") or entry.get("error"):
+            continue
+
+        changes = []
+        for metric in COMPARED_METRICS:
+            before, after = old[metric], entry[metric]
+            noise = NOISE_MB if metric == "peak_rss_mb" else NOISE_SECONDS
+            ratio = (after - before) / before if before else 0.0
+            changes.append(f"{metric.split('_')[0]} {ratio:+.1%}")
+            if ratio > threshold and after - before > noise:
+                regressions.append(f"{entry['case']}: {metric} {before:.3f} -> {after:.3f} ({ratio:+.1%})")
+        if old.get("output_bytes") != entry.get("output_bytes"):
+            changes.append(f"output {old.get('output_bytes')} -> {entry.get('output_bytes')} bytes")
+        print(f"  {entry['case']:<36} " + ", ".join(changes))
+
+    missing = sorted(set(previous) - {entry["case"] for entry in results})
+    if missing:
+        print(f"  Not run this time: {', '.join(missing)}")
+    return regressions
+
+
+def _ffmpeg_version() -> Optional[str]:
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout
+    except OSError:
+        return None
+    return out.splitlines()[0] if out else None
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=API_DIR, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sizes", default="small", help=f"Comma-separated from {', '.join(SIZES)}, or 'all'")
+    parser.add_argument("--cases", default="*", help="Glob on case names, e.g. 'video_*' or 'image_resize/*'")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; medians are reported")
+    parser.add_argument("--video-seconds", type=int, default=5, help="Length of the generated videos")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "ezclip-bench"))
+    parser.add_argument("--redis", action="store_true", help="Send progress updates to Redis instead of an in-memory stand-in")
+    parser.add_argument("--output", default="bench-results.json", help="Where to write the results")
+    parser.add_argument("--baseline", help="Earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown counted as a regression")
+    parser.add_argument("--keep-output", action="store_true", help="Keep processed files in the work directory")
+    parser.add_argument("--list", action="store_true", help="List the selected cases and exit")
+    args = parser.parse_args()
+
+    sizes = SIZES if args.sizes == "all" else tuple(s.strip() for s in args.sizes.split(","))
+    unknown = set(sizes) - set(SIZES)
+    if unknown:
+        parser.error(f"Unknown size(s): {', '.join(sorted(unknown))}")
+
+    all_cases = build_cases(args.video_seconds)
+    uncovered = {t.value for t in JobType if t != JobType.BATCH} - {case.job_type for case in all_cases}
+    if uncovered:
+        print(f"Warning: no benchmark case for {', '.join(sorted(uncovered))}", file=sys.stderr)
+
+    cases = [c for c in all_cases if c.size in sizes and fnmatch.fnmatch(c.name, args.cases)]
+    if args.list or not cases:
+        for case in cases:
+            print(case.name)
+        return 0 if cases else 1
+
+    media_dir = os.path.join(args.workdir, "media")
+    created = ensure_media({case.input_file for case in cases}, media_dir, args.video_seconds)
+    if created:
+        print(f"Generated {', '.join(created)} in {media_dir}")
+
+    env = {
+        **os.environ,
+        "UPLOAD_DIR": media_dir,
+        "PROCESSED_DIR": os.path.join(args.workdir, "processed"),
+        "TEMP_DIR": os.path.join(args.workdir, "temp"),
+        "PROCESS_POOL_WORKERS": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [API_DIR, os.environ.get("PYTHONPATH")])),
+    }
+    for key in ("PROCESSED_DIR", "TEMP_DIR"):
+        os.makedirs(env[key], exist_ok=True)
+
+    settings = get_settings()
+    meta = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ffmpeg": _ffmpeg_version(),
+        "ffmpeg_threads": settings.ffmpeg_threads,
+        "rembg_model": settings.rembg_model,
+        "sizes": list(sizes),
+        "repeat": args.repeat,
+        "video_seconds": args.video_seconds,
+        "queue": "redis" if args.redis else "memory",
+    }
+
+    print(f"{'case':<36} {'wall s':>9} {'cpu s':>9} {'rss MB':>8} {'output':>12}")
+    results = []
+    for case in cases:
+        runs = [_run_once(case, args, env) for _ in range(args.repeat)]
+        entry = _summarize(case, runs)
+        results.append(entry)
+        if entry["error"]:
+            print(f"{case.name:<36} error: {entry['error']}")
+        else:
+            print(
+                f"{case.name:<36} {entry['wall_seconds']:>9.3f} {entry['cpu_seconds']:>9.3f} "
+                f"{entry['peak_rss_mb']:>8.1f} {entry['output_bytes'] or 0:>12,}"
+            )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "cases": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    failed = [entry["case"] for entry in results if entry["error"]]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = _compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Benchmark cases: one or more per job type and input size.
+
+Request data is built with the same models the routers validate, so the
+handlers receive exactly what an API call would enqueue.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+
+from bench.media import SIZES, IMAGE_SIZES, VIDEO_SIZES, image_name, video_name, gif_name
+from models.image import (
+    ImageConvertRequest,
+    ImageResizeRequest,
+    ImageCropRequest,
+    ImageFilterRequest,
+    ImageRotateRequest,
+    ImageRemoveBgRequest,
+    ImageRemoveBgInteractiveRequest,
+)
+from models.job import JobType
+from models.video import (
+    VideoConvertRequest,
+    VideoToGifRequest,
+    GifToVideoRequest,
+    VideoTrimRequest,
+    VideoCropRequest,
+    VideoResizeRequest,
+    VideoCompressRequest,
+    VideoThumbnailRequest,
+    VideoAudioRequest,
+)
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    job_type: str
+    size: str
+    input_file: str
+    data: dict[str, Any] = field(hash=False)
+
+
+def _case(job_type: JobType, size: str, request: BaseModel) -> Case:
+    data = request.model_dump(mode="json")
+    if job_type == JobType.IMAGE_REMOVE_BG_INTERACTIVE:
+        # The router flattens points to [x, y] pairs before enqueueing
+        data["fg_points"] = [[p["x"], p["y"]] for p in data["fg_points"]]
+        data["bg_points"] = [[p["x"], p["y"]] for p in data["bg_points"]]
+    return Case(
+        name=f"{job_type.value}/{size}",
+        job_type=job_type.value,
+        size=size,
+        input_file=data["file_id"],
+        data=data,
+    )
+
+
+def build_cases(video_seconds: int) -> list[Case]:
+    """Every case for every size, in a stable order."""
+    cases = []
+
+    for size in SIZES:
+        image = image_name(size)
+        width, height = IMAGE_SIZES[size]
+        cases += [
+            _case(JobType.IMAGE_CONVERT, size, ImageConvertRequest(file_id=image, target_format="webp")),
+            _case(JobType.IMAGE_RESIZE, size, ImageResizeRequest(file_id=image, width=width // 2)),
+            _case(JobType.IMAGE_CROP, size, ImageCropRequest(
+                file_id=image, x=width // 4, y=height // 4, width=width // 2, height=height // 2,
+            )),
+            _case(JobType.IMAGE_FILTER, size, ImageFilterRequest(file_id=image, filter_type="blur")),
+            _case(JobType.IMAGE_ROTATE, size, ImageRotateRequest(file_id=image, direction="cw_90")),
+        ]
+        # rembg at 50 MP and GrabCut beyond 1 MP take minutes; they do not
+        # tell us more than the smaller inputs
+        if size != "large":
+            cases.append(_case(JobType.IMAGE_REMOVE_BG, size, ImageRemoveBgRequest(file_id=image)))
+        if size == "small":
+            cases.append(_case(JobType.IMAGE_REMOVE_BG_INTERACTIVE, size, ImageRemoveBgInteractiveRequest(
+                file_id=image,
+                rect=[int(width * 0.25), int(height * 0.15), int(width * 0.5), int(height * 0.7)],
+                fg_points=[{"x": width / 2, "y": height / 2}],
+            )))
+
+        video = video_name(size, video_seconds)
+        width, height = VIDEO_SIZES[size]
+        clip = min(3, video_seconds)
+        cases += [
+            _case(JobType.VIDEO_CONVERT, size, VideoConvertRequest(file_id=video, target_format="mp4")),
+            _case(JobType.VIDEO_TO_GIF, size, VideoToGifRequest(file_id=video, start_time=0, duration=clip)),
+            _case(JobType.GIF_TO_VIDEO, size, GifToVideoRequest(file_id=gif_name(size))),
+            _case(JobType.VIDEO_TRIM, size, VideoTrimRequest(
+                file_id=video, start_time=video_seconds / 4, end_time=video_seconds * 3 / 4,
+            )),
+            _case(JobType.VIDEO_CROP, size, VideoCropRequest(
+                file_id=video, x=width // 4, y=height // 4, width=width // 2, height=height // 2,
+            )),
+            _case(JobType.VIDEO_RESIZE, size, VideoResizeRequest(file_id=video, resolution="720p")),
+            _case(JobType.VIDEO_COMPRESS, size, VideoCompressRequest(file_id=video)),
+            _case(JobType.VIDEO_THUMBNAIL, size, VideoThumbnailRequest(file_id=video, timestamp=video_seconds / 2)),
+            _case(JobType.VIDEO_AUDIO, size, VideoAudioRequest(file_id=video, action="extract")),
+        ]
+
+    return cases
@@ -0,0 +1,380 @@
+"""HTTP load test: concurrent users uploading, submitting jobs and following SSE.
+
+Each simulated user loops: chunked upload through ``/api/upload/chunk``,
+submit an operation, hold ``/api/jobs/{id}/progress`` until the job
+finishes, then delete the upload. Concurrency is stepped through the
+``--users`` levels, each held for ``--duration`` seconds, and every level
+reports p50/p95/p99 latency per endpoint, SSE event-delivery lag and job
+throughput. The first level whose API latency or error rate clearly departs
+from the lowest level is reported as the degradation point.
+
+Without ``--url`` the FastAPI app is served by uvicorn inside this process
+(the configured Redis must be reachable, and EMBEDDED_WORKER decides whether
+jobs run here too). For numbers not skewed by the load generator sharing the
+event loop, start ``uvicorn main:app`` separately and pass ``--url``.
+
+    python -m bench.load --users 1,4,16,64 --duration 30
+    python -m bench.load --url http://localhost:8000 --operation image_convert
+
+Needs httpx (requirements-dev.txt).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depends on the environment
+    httpx = None
+
+from bench.media import IMAGE_SIZES, image_name, make_image
+
+
+# Operations a user can submit: endpoint and request body for an uploaded image
+OPERATIONS = {
+    "image_resize": ("/api/image/resize", {"width": 640}),
+    "image_convert": ("/api/image/convert", {"target_format": "webp"}),
+    "image_rotate": ("/api/image/rotate", {"direction": "cw_90"}),
+    "image_filter": ("/api/image/filter", {"filter_type": "blur"}),
+}
+
+# Endpoints whose latency decides where the API degrades; job run time is
+# bounded by worker capacity rather than the API
+API_ENDPOINTS = ("upload_chunk", "submit", "sse_first_event", "delete_upload")
+
+FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class LevelStats:
+    """Latency samples and error counts collected at one concurrency level."""
+
+    def __init__(self, users: int):
+        self.users = users
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.error_messages: dict[str, str] = {}
+        self.jobs: dict[str, int] = {}
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def add(self, name: str, seconds: float):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def error(self, name: str, exc: BaseException):
+        self.errors[name] = self.errors.get(name, 0) + 1
+        self.error_messages.setdefault(name, f"{type(exc).__name__}: {exc}"[:200])
+
+    @contextlib.asynccontextmanager
+    async def timed(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error(name, e)
+            raise
+        self.add(name, time.perf_counter() - started)
+
+    def error_rate(self, names: tuple[str, ...]) -> float:
+        requests = sum(len(self.samples.get(n, [])) + self.errors.get(n, 0) for n in names)
+        return sum(self.errors.get(n, 0) for n in names) / requests if requests else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        endpoints = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples.get(name, []))
+            endpoints[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": values[-1] if values else None,
+                "first_error": self.error_messages.get(name),
+            }
+        return {
+            "users": self.users,
+            "seconds": round(self.elapsed, 3),
+            "jobs": dict(self.jobs),
+            "jobs_per_second": self.jobs.get("completed", 0) / self.elapsed if self.elapsed else 0.0,
+            "api_error_rate": self.error_rate((*API_ENDPOINTS, "sse_stream")),
+            "endpoints": endpoints,
+        }
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace, payload: bytes, filename: str):
+        self.args = args
+        self.payload = payload
+        self.filename = filename
+        self.endpoint, self.body = OPERATIONS[args.operation]
+
+    async def upload(self, client: "httpx.AsyncClient", stats: LevelStats) -> str:
+        # Unique trailing bytes (ignored by JPEG decoders) keep dedup and the
+        # result cache from turning repeated uploads into no-ops
+        content = self.payload + (uuid.uuid4().bytes if self.args.unique_uploads else b"")
+        chunk_size = self.args.chunk_kb * 1024
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        upload_id = str(uuid.uuid4())
+
+        result = {}
+        for index, chunk in enumerate(chunks):
+            async with stats.timed("upload_chunk"):
+                response = await client.post(
+                    "/api/upload/chunk",
+                    files={"file": (self.filename, io.BytesIO(chunk), "application/octet-stream")},
+                    data={
+                        "upload_id": upload_id,
+                        "chunk_index": str(index),
+                        "total_chunks": str(len(chunks)),
+                        "filename": self.filename,
+                    },
+                )
+                response.raise_for_status()
+                result = response.json()
+        return result["file_id"]
+
+    async def submit(self, client: "httpx.AsyncClient", stats: LevelStats, file_id: str) -> str:
+        async with stats.timed("submit"):
+            response = await client.post(self.endpoint, json={"file_id": file_id, **self.body})
+            response.raise_for_status()
+            return response.json()["job_id"]
+
+    async def follow(self, client: "httpx.AsyncClient", stats: LevelStats, job_id: str) -> str:
+        """Hold the job's SSE stream until it finishes; returns the final status."""
+        opened = time.perf_counter()
+        status = None
+        async with stats.timed("sse_stream"):
+            async with client.stream("GET", f"/api/jobs/{job_id}/progress", timeout=self.args.job_timeout) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    received = time.time()
+                    if status is None:
+                        stats.add("sse_first_event", time.perf_counter() - opened)
+
+                    event = json.loads(line[len("data: "):])
+                    status = event.get("status") or status or "pending"
+                    if event.get("updated_at"):
+                        # Publish time (UTC) to arrival; only meaningful with synchronized clocks
+                        published = datetime.fromisoformat(event["updated_at"]).replace(tzinfo=timezone.utc)
+                        stats.add("event_lag", received - published.timestamp())
+                    if event.get("status") in FINAL_STATUSES:
+                        break
+        return status or "unknown"
+
+    async def user(self, client: "httpx.AsyncClient", stats: LevelStats, deadline: float):
+        while time.monotonic() < deadline:
+            try:
+                file_id = await self.upload(client, stats)
+                submitted = time.perf_counter()
+                job_id = await self.submit(client, stats, file_id)
+                status = await self.follow(client, stats, job_id)
+                stats.add("job_total", time.perf_counter() - submitted)
+                stats.jobs[status] = stats.jobs.get(status, 0) + 1
+
+                if self.args.cleanup:
+                    async with stats.timed("delete_upload"):
+                        response = await client.delete(f"/api/upload/file/{file_id}")
+                        response.raise_for_status()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Already counted against the endpoint; back off briefly
+                await asyncio.sleep(0.5)
+
+    async def run_level(self, client: "httpx.AsyncClient", users: int) -> LevelStats:
+        stats = LevelStats(users)
+        deadline = time.monotonic() + self.args.duration
+        tasks = [asyncio.create_task(self.user(client, stats, deadline)) for _ in range(users)]
+
+        # Let in-flight iterations finish so slow jobs are still measured
+        done, pending = await asyncio.wait(tasks, timeout=self.args.duration + self.args.drain_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        stats.elapsed = time.monotonic() - stats.started
+        return stats
+
+
+def _degradation(levels: list[dict[str, Any]], factor: float, floor: float) -> Optional[dict[str, Any]]:
+    """First level where an API endpoint's p95 exceeds ``factor`` times the first
+    level's (and by more than ``floor`` seconds), or more than 1% of API
+    requests fail."""
+    if not levels:
+        return None
+    base = levels[0]["endpoints"]
+
+    for level in levels:
+        if level["api_error_rate"] > 0.01:
+            return {"users": level["users"], "reason": f"{level['api_error_rate']:.1%} of API requests failed"}
+        for name in API_ENDPOINTS:
+            before = (base.get(name) or {}).get("p95")
+            after = (level["endpoints"].get(name) or {}).get("p95")
+            if before is None or after is None:
+                continue
+            if after > before * factor and after - before > floor:
+                return {
+                    "users": level["users"],
+                    "reason": f"{name} p95 {after * 1000:.0f} ms vs {before * 1000:.0f} ms at {levels[0]['users']} user(s)",
+                }
+    return None
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.0f}" if value is not None else "-"
+
+
+def _print_level(level: dict[str, Any]):
+    endpoints = level["endpoints"]
+    print(
+        f"\n{level['users']} user(s): {level['jobs_per_second']:.2f} jobs/s, "
+        f"jobs {level['jobs'] or {}}, API errors {level['api_error_rate']:.1%}"
+    )
+    print(f"  {'endpoint':<16} {'count':>6} {'err':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in endpoints.items():
+        print(
+            f"  {name:<16} {stats['count']:>6} {stats['errors']:>5} "
+            f"{_ms(stats['p50']):>8} {_ms(stats['p95']):>8} {_ms(stats['p99']):>8}"
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def _serve_in_process():
+    """Serve the app with uvicorn in this event loop; yields its base URL."""
+    import uvicorn
+    from main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()  # Raises the startup error
+            raise RuntimeError("Server stopped during startup")
+        await asyncio.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    media_dir = os.path.join(args.workdir, "media")
+    os.makedirs(media_dir, exist_ok=True)
+    name = image_name(args.image_size)
+    path = os.path.join(media_dir, name)
+    if not os.path.exists(path):
+        make_image(path, *IMAGE_SIZES[args.image_size])
+    with open(path, "rb") as f:
+        payload = f.read()
+
+    levels = [int(users) for users in args.users.split(",")]
+    test = LoadTest(args, payload, name)
+    results = []
+
+    async with contextlib.AsyncExitStack() as stack:
+        base_url = args.url or await stack.enter_async_context(_serve_in_process())
+        client = await stack.enter_async_context(httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(args.request_timeout),
+            # SSE streams hold a connection each, next to the user's other request
+            limits=httpx.Limits(max_connections=max(levels) * 2 + 10, max_keepalive_connections=max(levels) * 2),
+        ))
+
+        for users in levels:
+            stats = await test.run_level(client, users)
+            level = stats.summary()
+            results.append(level)
+            _print_level(level)
+
+    degraded = _degradation(results, args.degrade_factor, args.degrade_floor_ms / 1000)
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.url or "in-process",
+            "operation": args.operation,
+            "image": name,
+            "upload_bytes": len(payload),
+            "chunk_kb": args.chunk_kb,
+            "duration_per_level": args.duration,
+        },
+        "levels": results,
+        "degraded_at": degraded,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.load",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", help="Base URL of a running API; omit to serve the app in-process")
+    parser.add_argument("--users", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds each level runs")
+    parser.add_argument("--drain-timeout", type=float, default=60, help="Seconds to let in-flight jobs finish")
+    parser.add_argument("--operation", choices=sorted(OPERATIONS), default="image_resize")
+    parser.add_argument("--image-size", choices=sorted(IMAGE_SIZES), default="small")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Upload chunk size")
+    parser.add_argument("--same-upload", dest="unique_uploads", action="store_false",
+                        help="Upload identical bytes every time (exercises dedup and the result cache)")
+    parser.add_argument("--no-cleanup", dest="cleanup", action="store_false",
+                        help="Keep uploads instead of deleting them after each job")
+    parser.add_argument("--request-timeout", type=float, default=30)
+    parser.add_argument("--job-timeout", type=float, default=300, help="Longest a job's SSE stream is held")
+    parser.add_argument("--degrade-factor", type=float, default=2.0,
+                        help="p95 growth over the first level that counts as degraded")
+    parser.add_argument("--degrade-floor-ms", type=float, default=50,
+                        help="Ignore p95 growth smaller than this")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "ezclip-bench"))
+    parser.add_argument("--output", default="load-results.json")
+    args = parser.parse_args()
+
+    if httpx is None:
+        parser.error("httpx is required: pip install -r requirements-dev.txt")
+
+    report = asyncio.run(run(args))
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    degraded = report["degraded_at"]
+    if degraded:
+        print(f"\nAPI degrades at {degraded['users']} user(s): {degraded['reason']}")
+    else:
+        print("\nNo degradation detected at the tested levels")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Deterministic synthetic inputs for the benchmark cases.
+
+Images are drawn with Pillow and a seeded NumPy generator, GIFs with Pillow,
+and videos with ffmpeg's ``testsrc2``/``sine`` lavfi sources, so every run
+(and every machine) benchmarks the same content. Files are generated once
+per work directory and reused.
+"""
+
+import os
+import subprocess
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+# Input sizes per benchmark size class
+IMAGE_SIZES = {
+    "small": (1280, 800),  # 1 MP
+    "medium": (4000, 3000),  # 12 MP
+    "large": (8660, 5774),  # 50 MP
+}
+VIDEO_SIZES = {
+    "small": (640, 360),
+    "medium": (1920, 1080),
+    "large": (3840, 2160),
+}
+GIF_SIZES = {
+    "small": (320, 180),
+    "medium": (640, 360),
+    "large": (1280, 720),
+}
+SIZES = tuple(IMAGE_SIZES)
+
+GIF_FRAMES = 45
+GIF_FRAME_MS = 66
+
+
+def image_name(size: str) -> str:
+    width, height = IMAGE_SIZES[size]
+    return f"image_{width}x{height}.jpg"
+
+
+def video_name(size: str, seconds: int) -> str:
+    width, height = VIDEO_SIZES[size]
+    return f"video_{width}x{height}_{seconds}s.mp4"
+
+
+def gif_name(size: str) -> str:
+    width, height = GIF_SIZES[size]
+    return f"anim_{width}x{height}.gif"
+
+
+def make_image(path: str, width: int, height: int, seed: int = 0):
+    """Gradient with seeded noise and a few solid shapes, saved as JPEG."""
+    rng = np.random.default_rng(seed)
+    img = Image.new("RGB", (width, height))
+
+    xs = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    # Filled in strips to keep memory flat for 50 MP images
+    for top in range(0, height, 256):
+        rows = min(256, height - top)
+        ys = np.linspace(top, top + rows - 1, rows, dtype=np.float32)[:, None] / height * 255
+        strip = np.stack(np.broadcast_arrays(xs, ys, 255 - (xs + ys) / 2), axis=-1)
+        strip = strip + rng.normal(0, 12, strip.shape).astype(np.float32)
+        img.paste(Image.fromarray(np.clip(strip, 0, 255).astype(np.uint8), "RGB"), (0, top))
+
+    draw = ImageDraw.Draw(img)
+    # A clear subject in the middle for background removal, plus hard edges elsewhere
+    draw.ellipse((width * 0.3, height * 0.2, width * 0.7, height * 0.8), fill=(200, 60, 40))
+    for i in range(8):
+        x = width * (0.05 + 0.11 * i)
+        y = height * (0.05 if i % 2 else 0.85)
+        draw.rectangle((x, y, x + width * 0.08, y + height * 0.1), fill=(30 * i, 255 - 30 * i, 128))
+
+    img.save(path, format="JPEG", quality=90)
+
+
+def make_gif(path: str, width: int, height: int):
+    """A ball bouncing across a gradient, ``GIF_FRAMES`` frames long."""
+    background = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    radius = height // 6
+    frames = []
+    for i in range(GIF_FRAMES):
+        frame = background.copy()
+        x = (width - 2 * radius) * i // (GIF_FRAMES - 1)
+        y = abs((height - 2 * radius) * (1 - 2 * i / (GIF_FRAMES - 1)))
+        ImageDraw.Draw(frame).ellipse((x, y, x + 2 * radius, y + 2 * radius), fill=(240, 180, 20))
+        frames.append(frame.quantize(colors=64))
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=GIF_FRAME_MS, loop=0)
+
+
+def make_video(path: str, width: int, height: int, seconds: int):
+    """ffmpeg test pattern with a sine tone, H.264/AAC in MP4."""
+    cmd = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=30:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={seconds}",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "23", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "128k",
+        # Keep encoder version strings and timestamps out of the file
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        "-map_metadata", "-1", "-shortest",
+        path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def ensure_media(names: set[str], media_dir: str, video_seconds: int) -> list[str]:
+    """Generate the named inputs that do not exist yet; returns the ones created."""
+    os.makedirs(media_dir, exist_ok=True)
+    created = []
+
+    for size in SIZES:
+        builders = {
+            image_name(size): lambda path, size=size: make_image(path, *IMAGE_SIZES[size]),
+            gif_name(size): lambda path, size=size: make_gif(path, *GIF_SIZES[size]),
+            video_name(size, video_seconds): lambda path, size=size: make_video(
+                path, *VIDEO_SIZES[size], video_seconds
+            ),
+        }
+        for name, build in builders.items():
+            path = os.path.join(media_dir, name)
+            if name not in names or os.path.exists(path):
+                continue
+            # Build under a temporary name so an interrupted run never leaves a partial input
+            partial = os.path.join(media_dir, f".partial_{name}")
+            build(partial)
+            os.replace(partial, path)
+            created.append(name)
+
+    return created
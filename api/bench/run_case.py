@@ -0,0 +1,135 @@
+"""Run a single benchmark case in a fresh process and write its measurements.
+
+Started by ``python -m bench`` once per case and repetition, so peak RSS
+and CPU time belong to that case alone. The parent sets UPLOAD_DIR,
+PROCESSED_DIR and TEMP_DIR to the benchmark work directory and limits the
+process pool to one worker, whose usage is read before and after the case.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+import uuid
+from typing import Any
+
+from bench.cases import build_cases
+from bench.usage import process_usage, warm_up
+from config import get_settings
+from services.executor_service import executor_service, PoolType
+from services.handlers import processing_handlers
+from services.queue_service import job_queue
+from services.trace_service import JobTrace, job_trace
+
+
+MB = 1024 * 1024
+
+
+class UpdateRecorder:
+    """Counts progress updates; forwards them to Redis only when ``forward`` is set.
+
+    Without Redis it stands in for the queue, so handlers run with nothing
+    but the local filesystem.
+    """
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self.count = 0
+
+    async def update_job(self, job_id: str, **fields) -> bool:
+        self.count += 1
+        if self.forward:
+            return await self.forward(job_id, **fields)
+        return True
+
+
+async def run_case(name: str, video_seconds: int, use_redis: bool, keep_output: bool) -> dict[str, Any]:
+    settings = get_settings()
+    case = next((c for c in build_cases(video_seconds) if c.name == name), None)
+    if case is None:
+        raise SystemExit(f"Unknown case: {name}")
+    handler = processing_handlers()[case.job_type]
+
+    job_id = f"bench-{uuid.uuid4()}"
+    if use_redis:
+        await job_queue.connect()
+    recorder = UpdateRecorder(job_queue.update_job if use_redis else None)
+    job_queue.update_job = recorder.update_job
+
+    # Start the pool worker outside the measured window
+    pool_cpu_before, _ = await executor_service.run(PoolType.PROCESS, warm_up)
+    cpu_before, _ = process_usage()
+    children_cpu_before, _ = process_usage(resource.RUSAGE_CHILDREN)
+
+    trace = JobTrace()
+    token = job_trace.set(trace)
+    error = None
+    result: dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        result = await handler(job_id, dict(case.data))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    job_trace.reset(token)
+
+    pool_cpu_after, pool_peak = await executor_service.run(PoolType.PROCESS, warm_up)
+    cpu_after, main_peak = process_usage()
+    # ffmpeg and ffprobe have exited and been reaped by now
+    children_cpu_after, children_peak = process_usage(resource.RUSAGE_CHILDREN)
+
+    output_bytes = None
+    output_file = result.get("output_file")
+    if output_file:
+        output_path = os.path.join(settings.processed_dir, output_file)
+        if os.path.exists(output_path):
+            output_bytes = os.path.getsize(output_path)
+            if not keep_output:
+                os.remove(output_path)
+
+    if use_redis:
+        await job_queue.redis.delete(f"job:{job_id}")
+        await job_queue.disconnect()
+    executor_service.shutdown()
+
+    cpu = {
+        "main": cpu_after - cpu_before,
+        "pool": pool_cpu_after - pool_cpu_before,
+        "subprocesses": children_cpu_after - children_cpu_before,
+    }
+    rss = {"main": main_peak / MB, "pool": pool_peak / MB, "subprocesses": children_peak / MB}
+    return {
+        "case": case.name,
+        "job_type": case.job_type,
+        "size": case.size,
+        "input_bytes": os.path.getsize(os.path.join(settings.upload_dir, case.input_file)),
+        "wall_seconds": wall,
+        "cpu_seconds": sum(cpu.values()),
+        "cpu_seconds_by_process": cpu,
+        "peak_rss_mb": max(rss.values()),
+        "peak_rss_mb_by_process": rss,
+        "output_bytes": output_bytes,
+        "updates": recorder.count,
+        "stages": trace.to_dict()["stages"],
+        "error": error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--case", required=True)
+    parser.add_argument("--video-seconds", type=int, required=True)
+    parser.add_argument("--result", required=True, help="Path the JSON measurements are written to")
+    parser.add_argument("--redis", action="store_true", help="Send progress updates to Redis")
+    parser.add_argument("--keep-output", action="store_true")
+    args = parser.parse_args()
+
+    measurements = asyncio.run(run_case(args.case, args.video_seconds, args.redis, args.keep_output))
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(measurements, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Resource usage helpers; also run inside process pool workers."""
+
+import resource
+import sys
+
+
+def process_usage(who: int = resource.RUSAGE_SELF) -> tuple[float, int]:
+    """CPU seconds (user + system) and peak RSS in bytes."""
+    usage = resource.getrusage(who)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return usage.ru_utime + usage.ru_stime, peak
+
+
+def warm_up() -> tuple[float, int]:
+    """Import the pool-side image code so it is not timed as part of the first case."""
+    import pool.image_ops  # noqa: F401
+    return process_usage()
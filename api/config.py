@@ -7,20 +7,122 @@ class Settings(BaseSettings):
     redis_host: str = "redis"
     redis_port: int = 6379
 
+    # Job queue backend: "redis", or "memory" to keep jobs inside the API process
+    # (needs embedded_worker; no Redis server, but jobs are lost on restart and
+    # the result cache and upload deduplication are off)
+    queue_backend: str = "redis"
+
     # File paths
     upload_dir: str = "/data/uploads"
     processed_dir: str = "/data/processed"
     temp_dir: str = "/data/temp"
+    cache_dir: str = "/data/cache"
+    blob_dir: str = "/data/blobs"  # Deduplicated upload content; same filesystem as upload_dir
+    probe_dir: str = "/data/probe"  # Cached ffprobe metadata, shared by the API and workers
 
     # Limits
     max_upload_size: int = 500  # MB
     max_image_size: int = 50  # MB
     max_video_size: int = 500  # MB
+    max_batch_size: int = 1000  # Jobs per batch
+
+    # Result cache (identical input content + job type + parameters)
+    result_cache_enabled: bool = True
+    result_cache_size: int = 2048  # MB of cached outputs, evicted least recently used first
+    probe_cache_max_entries: int = 20000  # ffprobe sidecars kept, least recently used dropped first
+
+    # Job retention (keeps Redis memory bounded)
+    completed_job_ttl_seconds: int = 7 * 24 * 3600
+    failed_job_ttl_seconds: int = 24 * 3600  # Failed and cancelled jobs
+    max_retained_jobs: int = 10000  # Sweeper deletes the oldest finished jobs beyond this
+    job_sweep_interval_seconds: int = 300
+    upload_index_ttl_seconds: int = 30 * 24 * 3600  # Upload dedup entries unused this long expire
 
     # Processing
     ffmpeg_threads: int = 4
     rembg_model: str = "u2net"
 
+    # Job time and resource limits
+    job_timeout_min_seconds: int = 60  # Floor for every job's wall-clock limit
+    job_timeout_max_seconds: int = 3 * 3600
+    image_timeout_seconds_per_megapixel: float = 2.0
+    video_timeout_factors: dict[str, float] = {
+        "video_convert": 3.0,
+        "video_to_gif": 4.0,
+        "gif_to_video": 3.0,
+        "video_trim": 1.0,
+        "video_crop": 3.0,
+        "video_resize": 3.0,
+        "video_compress": 4.0,
+        "video_thumbnail": 0.5,
+        "video_audio": 2.0,
+    }  # Processing seconds allowed per second of input
+    max_image_pixels: int = 100_000_000  # Larger images are rejected (decompression bombs)
+    process_pool_memory_limit_mb: int = 0  # RLIMIT_AS for Pillow pool processes; 0 = unlimited
+    ffmpeg_nice: int = 10  # 0 = inherit the worker's priority
+    ffmpeg_ionice_class: int = 2  # 1 = realtime, 2 = best-effort, 3 = idle; 0 = inherit
+    ffmpeg_ionice_level: int = 7  # 0 (highest) to 7 (lowest) for realtime and best-effort
+    ffmpeg_cpu_time_limit: int = 0  # RLIMIT_CPU seconds per ffmpeg process; 0 = unlimited
+    ffmpeg_memory_limit_mb: int = 0  # RLIMIT_AS per ffmpeg process; 0 = unlimited
+
+    # Worker pool
+    embedded_worker: bool = True  # Run job consumers inside the API process
+    worker_concurrency: int = 4  # Concurrent jobs per worker process
+    job_type_concurrency: dict[str, int] = {
+        "video_convert": 2,
+        "video_to_gif": 2,
+        "gif_to_video": 2,
+        "video_crop": 2,
+        "video_resize": 2,
+        "video_compress": 2,
+        "image_remove_bg": 1,
+    }  # Per job type caps; together capped types use at most worker_concurrency - 1 consumers
+    lane_weights: dict[str, int] = {"interactive": 6, "normal": 3, "bulk": 1}  # Weighted dequeue share
+    lane_starvation_seconds: int = 120  # Jobs waiting longer than this are dequeued first
+    # Admission control: a submission that would take a lane past either limit gets 429
+    # (0 = unlimited; the work limit does not apply to a lane with nothing waiting)
+    lane_max_queued_jobs: dict[str, int] = {"interactive": 200, "normal": 2000, "bulk": 20000}
+    lane_max_queued_seconds: dict[str, int] = {
+        "interactive": 600,
+        "normal": 4 * 3600,
+        "bulk": 24 * 3600,
+    }  # Estimated processing time of the jobs waiting in the lane
+    job_cost_seconds: dict[str, float] = {
+        "image_convert": 1,
+        "image_resize": 1,
+        "image_crop": 1,
+        "image_filter": 1,
+        "image_rotate": 1,
+        "image_remove_bg": 8,
+        "image_remove_bg_interactive": 4,
+        "video_convert": 60,
+        "video_to_gif": 20,
+        "gif_to_video": 10,
+        "video_trim": 5,
+        "video_crop": 60,
+        "video_resize": 60,
+        "video_compress": 90,
+        "video_thumbnail": 2,
+        "video_audio": 15,
+    }  # Rough processing seconds per job, used until a type has learned estimates
+    job_estimate_min_samples: int = 3  # Finished jobs of a type before its learned rates are used
+    job_estimate_smoothing: float = 0.2  # Weight of each finished job in the learned rates (0-1)
+    # Fair share between clients within each lane
+    # Clients are told apart by address. X-Forwarded-For/X-Real-IP are believed only from
+    # these proxies (addresses or CIDRs), e.g. the UI's nginx
+    trusted_proxies: list[str] = ["127.0.0.1", "::1"]
+    client_id_header: str = ""  # Header naming the client instead (e.g. X-Client-Id); only for trusted callers
+    client_max_active_jobs: int = 0  # Jobs one client may have processing at once; 0 = unlimited
+    client_weights: dict[str, float] = {}  # Dequeue share per client ID, relative to the default of 1
+    worker_name: str = ""  # Consumer name prefix; defaults to hostname-pid
+    job_lease_seconds: int = 60  # Unacknowledged jobs idle this long are reclaimed by another worker
+    job_max_attempts: int = 3
+    progress_updates_per_second: float = 4  # Per job cap on published progress updates
+    sse_keepalive_seconds: float = 15  # Idle time before an SSE keepalive comment
+    job_trace_file: str = ""  # Append each finished job's timing spans here as JSON lines; empty = off
+    process_pool_workers: int = 0  # Pillow work; 0 = one per CPU core
+    thread_pool_workers: int = 0  # rembg/OpenCV work (releases the GIL); 0 = one per CPU core
+
     # Allowed formats
     allowed_image_formats: list[str] = ["png", "jpg", "jpeg", "webp", "avif", "gif", "bmp"]
     allowed_video_formats: list[str] = ["mp4", "webm", "avi", "mov", "mkv", "gif"]
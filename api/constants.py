@@ -59,3 +59,23 @@ MIME_TYPES = {
 # File extension lists
 IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".bmp"]
 VIDEO_EXTENSIONS = [".mp4", ".webm", ".avi", ".mov", ".mkv"]
+
+# Default priority lane per job type (quick editor operations jump ahead of encodes)
+JOB_TYPE_LANES = {
+    "image_convert": "interactive",
+    "image_resize": "interactive",
+    "image_crop": "interactive",
+    "image_filter": "interactive",
+    "image_rotate": "interactive",
+    "image_remove_bg": "normal",
+    "image_remove_bg_interactive": "interactive",
+    "video_convert": "normal",
+    "video_to_gif": "normal",
+    "gif_to_video": "normal",
+    "video_trim": "interactive",
+    "video_crop": "normal",
+    "video_resize": "normal",
+    "video_compress": "normal",
+    "video_thumbnail": "interactive",
+    "video_audio": "normal",
+}
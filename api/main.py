@@ -1,29 +1,61 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
+import ipaddress
 import os
 
 from config import get_settings
-from routers import image, video, batch, jobs, upload
-from services.queue_service import job_queue
+from routers import image, video, batch, jobs, upload, metrics as metrics_router
+from services.queue_service import job_queue, QueueFullError, current_client
+from services.event_service import job_events
+from services.executor_service import executor_service
+from services.handlers import register_handlers
+from services.metrics_service import metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     settings = get_settings()
+    if settings.queue_backend == "memory" and not settings.embedded_worker:
+        # Nothing outside this process could run the queued jobs
+        raise RuntimeError("QUEUE_BACKEND=memory requires EMBEDDED_WORKER=true")
+
+    # Fail at startup rather than per request on a malformed TRUSTED_PROXIES
+    _trusted_networks(tuple(settings.trusted_proxies))
 
     # Ensure directories exist
-    for directory in [settings.upload_dir, settings.processed_dir, settings.temp_dir]:
+    for directory in [settings.upload_dir, settings.processed_dir, settings.temp_dir, settings.cache_dir, settings.blob_dir, settings.probe_dir]:
         os.makedirs(directory, exist_ok=True)
 
-    # Start job queue worker
-    await job_queue.start_worker()
+    await metrics.start()
+
+    # Index jobs stored by versions that kept a plain job list
+    migrated = await job_queue.migrate_job_list()
+    if migrated:
+        print(f"Indexed {migrated} jobs from job_list")
+    requeued = await job_queue.migrate_job_queue()
+    if requeued:
+        print(f"Queued {requeued} waiting jobs from job_queue")
+
+    # Start embedded job queue worker (disable when running `python -m worker` separately)
+    if settings.embedded_worker:
+        register_handlers()
+        await job_queue.start_worker()
 
     yield
 
     # Shutdown
-    await job_queue.stop_worker()
+    await job_events.stop()
+    if settings.embedded_worker:
+        await job_queue.stop_worker()
+        executor_service.shutdown()
+    else:
+        await job_queue.disconnect()
+    await metrics.stop()
 
 
 app = FastAPI(
@@ -40,14 +72,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+
+@lru_cache()
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address.strip())
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def _client_address(request: Request) -> Optional[str]:
+    """The caller's address, seen through the configured trusted proxies.
+
+    Forwarding headers are ignored unless the request comes from a trusted
+    proxy; X-Forwarded-For is then read from the right, stopping at the
+    first address that is not a trusted proxy itself.
+    """
+    settings = get_settings()
+    peer = request.client.host if request.client else None
+    networks = _trusted_networks(tuple(settings.trusted_proxies))
+    if peer is None or not _is_trusted_proxy(peer, networks):
+        return peer
+
+    forwarded = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(forwarded):
+        if not _is_trusted_proxy(hop, networks):
+            return hop
+    return request.headers.get("x-real-ip") or (forwarded[0] if forwarded else peer)
+
+
+@app.middleware("http")
+async def identify_client(request: Request, call_next):
+    # Jobs submitted by the request are queued under this identity
+    settings = get_settings()
+    client = None
+    if settings.client_id_header:
+        client = request.headers.get(settings.client_id_header)
+    token = current_client.set(client or _client_address(request))
+    try:
+        return await call_next(request)
+    finally:
+        current_client.reset(token)
+
+
+@app.exception_handler(QueueFullError)
+async def queue_full_handler(request: Request, exc: QueueFullError):
+    # Any submission endpoint: tell the client when to try again
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "lane": exc.lane},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Include routers
 app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
 app.include_router(image.router, prefix="/api/image", tags=["Image"])
 app.include_router(video.router, prefix="/api/video", tags=["Video"])
 app.include_router(batch.router, prefix="/api/batch", tags=["Batch"])
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(metrics_router.router, tags=["Metrics"])
 
 
 @app.get("/health")
@@ -24,9 +24,14 @@ from .video import (
 from .job import (
     JobStatus,
     JobType,
+    JobLane,
     JobResponse,
+    JobSummary,
     JobDetailResponse,
+    JobTimings,
+    JobEstimate,
     JobListResponse,
+    QueuePressureResponse,
 )
 
 __all__ = [
@@ -54,7 +59,12 @@ __all__ = [
     # Job
     "JobStatus",
     "JobType",
+    "JobLane",
     "JobResponse",
+    "JobSummary",
     "JobDetailResponse",
+    "JobTimings",
+    "JobEstimate",
     "JobListResponse",
+    "QueuePressureResponse",
 ]
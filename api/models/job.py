@@ -35,6 +35,12 @@ class JobType(str, Enum):
     BATCH = "batch"
 
 
+class JobLane(str, Enum):
+    INTERACTIVE = "interactive"
+    NORMAL = "normal"
+    BULK = "bulk"
+
+
 class JobResponse(BaseModel):
     job_id: str
     status: JobStatus
@@ -42,23 +48,77 @@ class JobResponse(BaseModel):
     message: Optional[str] = None
 
 
-class JobDetailResponse(BaseModel):
+class JobSummary(BaseModel):
+    """Listing projection of a job; leaves out the request ``data`` blob."""
     job_id: str
     job_type: JobType
     status: JobStatus
     progress: int = Field(ge=0, le=100)
     message: Optional[str] = None
-    input_file: Optional[str] = None
     output_file: Optional[str] = None
     file_size: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     error: Optional[str] = None
+    lane: Optional[JobLane] = None
+    queue_position: Optional[int] = Field(default=None, description="Jobs ahead in the lane while pending")
+    batch_id: Optional[str] = None
+
+
+class JobSpan(BaseModel):
+    name: str
+    start: float = Field(description="Seconds after the job started processing")
+    duration: float
+
+
+class JobStageTiming(BaseModel):
+    seconds: float
+    count: int
+
+
+class JobTimings(BaseModel):
+    """Where a finished job spent its time (decode, process, save, ffprobe, ...)."""
+    total_seconds: float
+    stages: dict[str, JobStageTiming]
+    spans: list[JobSpan]
+
+
+class JobEstimate(BaseModel):
+    """Predicted cost of a job, from finished jobs of its type and the size of its input."""
+    seconds: float = Field(description="Predicted processing time")
+    output_size: Optional[int] = Field(default=None, description="Predicted output bytes, once learned")
+    remaining_seconds: Optional[float] = Field(
+        default=None, description="Processing time left, refined from progress; None once finished"
+    )
+    learned: bool = Field(description="False while the job type's configured default is used")
+
+
+class JobDetailResponse(JobSummary):
+    input_file: Optional[str] = None
     metadata: Optional[dict[str, Any]] = None
+    timings: Optional[JobTimings] = None
+    estimate: Optional[JobEstimate] = None
 
 
 class JobListResponse(BaseModel):
-    jobs: list[JobDetailResponse]
+    jobs: list[JobSummary]
     total: int
-    page: int
     page_size: int
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to fetch the next page")
+
+
+class LanePressure(BaseModel):
+    waiting: int
+    in_progress: int
+    estimated_seconds: float = Field(description="Estimated processing time of the waiting jobs")
+    max_waiting: Optional[int] = Field(default=None, description="None = unlimited")
+    max_estimated_seconds: Optional[int] = Field(default=None, description="None = unlimited")
+    pressure: float = Field(description="Fill ratio of the fuller limit; new jobs are refused at 1")
+    accepting: bool
+    reason: Optional[str] = None
+    retry_after: Optional[int] = Field(default=None, description="Seconds to wait before submitting again")
+
+
+class QueuePressureResponse(BaseModel):
+    """Queue load per lane, so clients can slow down before they are refused."""
+    lanes: dict[JobLane, LanePressure]
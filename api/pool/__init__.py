@@ -0,0 +1,7 @@
+"""Code that runs inside process pool workers.
+
+Pool processes are spawned and import only what the submitted functions
+need, so this package depends on nothing but the standard library and
+Pillow; importing ``services`` here would load the queue, Redis, rembg and
+ONNX Runtime into every pool process.
+"""
@@ -0,0 +1,147 @@
+"""Pillow operations run in the process pool.
+
+Module-level functions that only take picklable arguments (paths and plain
+values). Filter and rotation names are the string values of
+``models.image.ImageFilter`` and ``RotateDirection``; the models are not
+imported here because they pull in pydantic.
+"""
+
+from PIL import Image, ImageFilter, ImageEnhance, ImageOps
+
+from pool.tracing import span
+
+
+def open_image(path: str) -> Image.Image:
+    # Pillow decodes lazily; load now so the decode stage is timed on its own
+    with span("decode"):
+        img = Image.open(path)
+        try:
+            img.load()
+        except BaseException:
+            img.close()
+            raise
+    return img
+
+
+def save_image(img: Image.Image, path: str, **kwargs):
+    with span("save"):
+        img.save(path, **kwargs)
+
+
+def convert_image(input_path: str, output_path: str, target_format: str, quality: int):
+    with open_image(input_path) as img:
+        # Convert RGBA to RGB for JPEG
+        if target_format.lower() in ["jpg", "jpeg"] and img.mode == "RGBA":
+            with span("process"):
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[3])
+                img = background
+
+        save_kwargs = {}
+        if target_format.lower() in ["jpg", "jpeg", "webp"]:
+            save_kwargs["quality"] = quality
+        if target_format.lower() == "webp":
+            save_kwargs["method"] = 6
+
+        save_image(img, output_path, format=target_format.upper(), **save_kwargs)
+
+
+def resize_image(input_path: str, output_path: str, width: int, height: int, maintain_aspect: bool):
+    with open_image(input_path) as img:
+        original_width, original_height = img.size
+
+        if maintain_aspect:
+            if width and height:
+                ratio = min(width / original_width, height / original_height)
+                new_width = int(original_width * ratio)
+                new_height = int(original_height * ratio)
+            elif width:
+                ratio = width / original_width
+                new_width = width
+                new_height = int(original_height * ratio)
+            elif height:
+                ratio = height / original_height
+                new_width = int(original_width * ratio)
+                new_height = height
+            else:
+                new_width, new_height = original_width, original_height
+        else:
+            new_width = width or original_width
+            new_height = height or original_height
+
+        with span("process"):
+            resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        save_image(resized, output_path)
+
+
+def crop_image(input_path: str, output_path: str, x: int, y: int, width: int, height: int):
+    with open_image(input_path) as img:
+        with span("process"):
+            cropped = img.crop((x, y, x + width, y + height))
+        save_image(cropped, output_path)
+
+
+def apply_filter(img: Image.Image, filter_type: str, intensity: float) -> Image.Image:
+    if filter_type == "grayscale":
+        result = ImageOps.grayscale(img)
+        if img.mode == "RGBA":
+            result = result.convert("RGBA")
+    elif filter_type == "sepia":
+        gray = ImageOps.grayscale(img)
+        result = ImageOps.colorize(gray, "#704214", "#C0A080")
+        if img.mode == "RGBA":
+            result = result.convert("RGBA")
+    elif filter_type == "blur":
+        radius = int(intensity * 5)
+        result = img.filter(ImageFilter.GaussianBlur(radius=radius))
+    elif filter_type == "sharpen":
+        enhancer = ImageEnhance.Sharpness(img)
+        result = enhancer.enhance(1 + intensity)
+    elif filter_type == "brightness":
+        enhancer = ImageEnhance.Brightness(img)
+        result = enhancer.enhance(intensity)
+    elif filter_type == "contrast":
+        enhancer = ImageEnhance.Contrast(img)
+        result = enhancer.enhance(intensity)
+    elif filter_type == "invert":
+        if img.mode == "RGBA":
+            r, g, b, a = img.split()
+            rgb = Image.merge("RGB", (r, g, b))
+            inverted = ImageOps.invert(rgb)
+            r, g, b = inverted.split()
+            result = Image.merge("RGBA", (r, g, b, a))
+        else:
+            result = ImageOps.invert(img.convert("RGB"))
+    else:
+        result = img
+    return result
+
+
+def filter_image(input_path: str, output_path: str, filter_type: str, intensity: float):
+    with open_image(input_path) as img:
+        with span("process"):
+            result = apply_filter(img, filter_type, intensity)
+        save_image(result, output_path)
+
+
+def apply_rotation(img: Image.Image, direction: str) -> Image.Image:
+    if direction == "cw_90":
+        result = img.rotate(-90, expand=True)
+    elif direction == "cw_180":
+        result = img.rotate(180)
+    elif direction == "cw_270":
+        result = img.rotate(-270, expand=True)
+    elif direction == "flip_h":
+        result = ImageOps.mirror(img)
+    elif direction == "flip_v":
+        result = ImageOps.flip(img)
+    else:
+        result = img
+    return result
+
+
+def rotate_image(input_path: str, output_path: str, direction: str):
+    with open_image(input_path) as img:
+        with span("process"):
+            result = apply_rotation(img, direction)
+        save_image(result, output_path)
@@ -0,0 +1,15 @@
+"""Initializer for process pool workers."""
+
+import resource
+
+from PIL import Image
+
+
+def init_process_worker(memory_limit_mb: int, max_image_pixels: int):
+    # Runs in each pool process: a runaway allocation raises MemoryError in
+    # the job instead of taking the whole host down
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    # Pool processes refuse decompression bombs like the API does
+    Image.MAX_IMAGE_PIXELS = max_image_pixels
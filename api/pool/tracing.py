@@ -0,0 +1,93 @@
+"""Per-job timing spans, recorded the same way in the API, threads and pool processes."""
+
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+
+# Individual spans kept per job; stage totals stay exact beyond this
+MAX_SPANS = 200
+
+
+class JobTrace:
+    """Timing spans of one job, safe to record into from several threads."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        # (name, wall-clock start, duration) of the first MAX_SPANS spans
+        self._spans: list[tuple[str, float, float]] = []
+        # name -> [total seconds, count]
+        self._stages: dict[str, list] = {}
+
+    def add(self, name: str, start: float, duration: float):
+        with self._lock:
+            stage = self._stages.setdefault(name, [0.0, 0])
+            stage[0] += duration
+            stage[1] += 1
+            if len(self._spans) < MAX_SPANS:
+                self._spans.append((name, start, duration))
+
+    def extend(self, spans: list[tuple[str, float, float]]):
+        """Add spans recorded elsewhere, e.g. by ``call_traced`` in a pool process."""
+        for name, start, duration in spans:
+            self.add(name, start, duration)
+
+    @property
+    def spans(self) -> list[tuple[str, float, float]]:
+        with self._lock:
+            return list(self._spans)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Total run time, per-stage totals and spans (start relative to the job's start)."""
+        with self._lock:
+            return {
+                "total_seconds": round(time.perf_counter() - self._started, 6),
+                "stages": {
+                    name: {"seconds": round(seconds, 6), "count": count}
+                    for name, (seconds, count) in self._stages.items()
+                },
+                "spans": [
+                    {"name": name, "start": round(start - self.started_at, 6), "duration": round(duration, 6)}
+                    for name, start, duration in self._spans
+                ],
+            }
+
+
+# Trace of the job running in the current task or thread
+job_trace: ContextVar[Optional[JobTrace]] = ContextVar("job_trace", default=None)
+
+
+@contextlib.contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the enclosed block as a stage of the current job (no-op outside a job).
+
+    A plain ``with`` block, so it also covers ``await``s in async code.
+    """
+    trace = job_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start, time.perf_counter() - started)
+
+
+def call_traced(fn: Callable[..., Any], *args, **kwargs) -> tuple[Any, list[tuple[str, float, float]]]:
+    """Run ``fn`` under a fresh trace and return its result with the recorded spans.
+
+    Used in pool processes, which cannot see the parent's trace.
+    """
+    trace = JobTrace()
+    token = job_trace.set(trace)
+    try:
+        return fn(*args, **kwargs), trace.spans
+    finally:
+        job_trace.reset(token)
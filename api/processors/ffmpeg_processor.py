@@ -1,57 +1,124 @@
 import asyncio
+import os
 import re
+import shutil
+import signal
 from typing import Callable, Optional, Awaitable
 
+from config import get_settings
+from services.metrics_service import metrics, current_job_type
+from services.probe_service import probe_cache, probe_duration
+from services.trace_service import span
+
 
 class FFmpegProcessor:
     """FFmpeg processor with progress tracking."""
 
+    def __init__(self):
+        self.settings = get_settings()
+
+    def _limit_prefix(self) -> list[str]:
+        """Wrapper commands that lower ffmpeg's priority and cap its resources.
+
+        Each wrapper execs the next, so ffmpeg keeps the PID (and process
+        group) of the spawned process. Wrappers missing from the system are
+        skipped.
+        """
+        prefix = []
+        if self.settings.ffmpeg_nice and shutil.which("nice"):
+            prefix += ["nice", "-n", str(self.settings.ffmpeg_nice)]
+        if self.settings.ffmpeg_ionice_class and shutil.which("ionice"):
+            # -t: run anyway where the I/O scheduler does not support priorities
+            prefix += ["ionice", "-t", "-c", str(self.settings.ffmpeg_ionice_class)]
+            if self.settings.ffmpeg_ionice_class in (1, 2):
+                prefix += ["-n", str(self.settings.ffmpeg_ionice_level)]
+
+        limits = []
+        if self.settings.ffmpeg_cpu_time_limit:
+            limits.append(f"--cpu={self.settings.ffmpeg_cpu_time_limit}")
+        if self.settings.ffmpeg_memory_limit_mb:
+            limits.append(f"--as={self.settings.ffmpeg_memory_limit_mb * 1024 * 1024}")
+        if limits and shutil.which("prlimit"):
+            prefix += ["prlimit", *limits, "--"]
+
+        return prefix
+
     async def get_duration(self, input_path: str) -> float:
-        """Get video duration in seconds."""
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            input_path
-        ]
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-
-        stdout, _ = await process.communicate()
-
-        try:
-            return float(stdout.decode().strip())
-        except (ValueError, AttributeError):
-            return 0
+        """Get video duration in seconds (from the shared probe cache)."""
+        with span("ffprobe"):
+            probe = await probe_cache.get(input_path)
+        return probe_duration(probe)
 
     async def run(
         self,
         args: list[str],
         progress_callback: Optional[Callable[[int], Awaitable[None]]] = None,
-        input_path: Optional[str] = None
+        input_path: Optional[str] = None,
+        stage: str = "ffmpeg",
     ):
-        """Run FFmpeg command with optional progress tracking."""
+        """Run FFmpeg command with optional progress tracking.
+
+        The run (decode, filters and encode in one process) is timed as the
+        job's ``stage`` span.
+        """
 
         # Get duration for progress calculation
         duration = 0
         if progress_callback and input_path:
             duration = await self.get_duration(input_path)
 
-        cmd = ["ffmpeg", "-y", "-progress", "pipe:1", "-nostats"] + args
-
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        cmd = self._limit_prefix() + ["ffmpeg", "-y", "-progress", "pipe:1", "-nostats"] + args
+
+        with span(stage):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # Own process group, so cancellation can stop ffmpeg and anything it spawns
+                start_new_session=True,
+            )
+
+            try:
+                speed = await self._wait_with_progress(process, progress_callback, duration)
+            finally:
+                if process.returncode is None:
+                    await self._terminate(process)
+
+        if process.returncode == -signal.SIGXCPU:
+            raise RuntimeError(
+                f"FFmpeg exceeded its CPU time limit of {self.settings.ffmpeg_cpu_time_limit} seconds"
+            )
+        if process.returncode != 0:
+            stderr = await process.stderr.read()
+            raise RuntimeError(f"FFmpeg error: {stderr.decode()}")
 
+        if speed is not None:
+            metrics.observe("ezclip_ffmpeg_speed_ratio", speed, {"job_type": current_job_type.get()})
+
+    async def _terminate(self, process: asyncio.subprocess.Process, grace: float = 0.5):
+        """Stop the process group, escalating to SIGKILL after a short grace period."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                return
+            try:
+                await asyncio.wait_for(asyncio.shield(process.wait()), grace)
+                return
+            except asyncio.TimeoutError:
+                continue
+
+    async def _wait_with_progress(
+        self,
+        process: asyncio.subprocess.Process,
+        progress_callback: Optional[Callable[[int], Awaitable[None]]],
+        duration: float,
+    ) -> Optional[float]:
+        """Follow ffmpeg's progress output; returns its last reported speed ratio."""
         # Parse progress from stdout
         current_time = 0
+        last_progress = -1
+        speed = None
 
         while True:
             line = await process.stdout.readline()
@@ -72,18 +139,23 @@ class FFmpegProcessor:
                 if match:
                     h, m, s = match.groups()
                     current_time = int(h) * 3600 + int(m) * 60 + float(s)
+            elif line.startswith("speed="):
+                # e.g. "speed=1.53x", or "speed=N/A" before the first frame
+                try:
+                    speed = float(line.split("=")[1].strip().rstrip("x"))
+                except ValueError:
+                    pass
 
-            # Calculate and report progress
+            # Calculate and report progress (only when the percentage moves)
             if progress_callback and duration > 0:
                 progress = min(int((current_time / duration) * 100), 100)
-                await progress_callback(progress)
+                if progress != last_progress:
+                    last_progress = progress
+                    await progress_callback(progress)
 
             # Check for completion
             if line.startswith("progress=end"):
                 break
 
         await process.wait()
-
-        if process.returncode != 0:
-            stderr = await process.stderr.read()
-            raise RuntimeError(f"FFmpeg error: {stderr.decode()}")
+        return speed
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Any
 
-from models.job import JobResponse, JobStatus, JobType
+from config import get_settings
+from models.job import JobResponse, JobStatus, JobType, JobLane, JobDetailResponse
 from services.queue_service import job_queue
 
 router = APIRouter()
@@ -14,7 +17,8 @@ class BatchItem(BaseModel):
 
 
 class BatchRequest(BaseModel):
-    items: list[BatchItem] = Field(min_length=1, max_length=100)
+    items: list[BatchItem] = Field(min_length=1)
+    lane: JobLane = JobLane.BULK
 
 
 class BatchResponse(BaseModel):
@@ -23,9 +27,35 @@ class BatchResponse(BaseModel):
     total: int
 
 
+class BatchDetailResponse(BaseModel):
+    batch_id: str
+    total: int
+    created_at: datetime
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    cancelled: int
+
+
+class BatchJobsResponse(BaseModel):
+    batch_id: str
+    jobs: list[JobDetailResponse]
+    total: int
+    offset: int
+    limit: int
+
+
 @router.post("", response_model=BatchResponse)
 async def create_batch(request: BatchRequest):
     """Create multiple processing jobs at once."""
+    settings = get_settings()
+
+    if len(request.items) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds maximum size of {settings.max_batch_size} items"
+        )
 
     # Validate job types
     valid_types = {t.value for t in JobType if t != JobType.BATCH}
@@ -37,19 +67,17 @@ async def create_batch(request: BatchRequest):
                 detail=f"Invalid job type: {item.job_type}"
             )
 
-    # Enqueue all jobs
-    jobs = []
-    for item in request.items:
-        job_id = await job_queue.enqueue(item.job_type, item.data)
-        jobs.append(JobResponse(
-            job_id=job_id,
-            status=JobStatus.PENDING,
-            progress=0
-        ))
-
-    # Create batch ID for tracking
-    import uuid
+    # Enqueue all jobs as a tracked batch
     batch_id = str(uuid.uuid4())
+    job_ids = await job_queue.enqueue_many(
+        [(item.job_type, item.data) for item in request.items],
+        request.lane,
+        batch_id=batch_id,
+    )
+    jobs = [
+        JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
+        for job_id in job_ids
+    ]
 
     return BatchResponse(
         batch_id=batch_id,
@@ -58,6 +86,41 @@ async def create_batch(request: BatchRequest):
     )
 
 
+@router.get("/{batch_id}", response_model=BatchDetailResponse)
+async def get_batch(batch_id: str):
+    """Get batch progress from its server-side counters."""
+    batch = await job_queue.get_batch(batch_id)
+
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return BatchDetailResponse(**batch)
+
+
+@router.get("/{batch_id}/jobs", response_model=BatchJobsResponse)
+async def get_batch_jobs(
+    batch_id: str,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=500),
+):
+    """List the jobs of a batch."""
+    batch = await job_queue.get_batch(batch_id)
+
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    job_ids = await job_queue.get_batch_job_ids(batch_id, offset, limit)
+    jobs = [job for job in await job_queue.get_jobs(job_ids) if job]
+
+    return BatchJobsResponse(
+        batch_id=batch_id,
+        jobs=jobs,
+        total=batch["total"],
+        offset=offset,
+        limit=limit,
+    )
+
+
 class BatchStatusResponse(BaseModel):
     batch_id: str
     jobs: list[dict[str, Any]]
@@ -76,8 +139,7 @@ async def get_batch_status(job_ids: list[str]):
     pending = 0
     processing = 0
 
-    for job_id in job_ids:
-        job = await job_queue.get_job(job_id)
+    for job in await job_queue.get_jobs(job_ids):
         if job:
             jobs.append({
                 "job_id": job.job_id,
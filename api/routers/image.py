@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from typing import Optional
 
 from models.image import (
     ImageConvertRequest,
@@ -9,72 +10,60 @@ from models.image import (
     ImageRemoveBgRequest,
     ImageRemoveBgInteractiveRequest,
 )
-from models.job import JobResponse, JobStatus, JobType
+from models.job import JobResponse, JobStatus, JobType, JobLane
 from services.queue_service import job_queue
-from services.image_service import image_service
-from services.rembg_service import rembg_service
 
 router = APIRouter()
 
 
-# Register handlers
-job_queue.register_handler(JobType.IMAGE_CONVERT.value, image_service.convert)
-job_queue.register_handler(JobType.IMAGE_RESIZE.value, image_service.resize)
-job_queue.register_handler(JobType.IMAGE_CROP.value, image_service.crop)
-job_queue.register_handler(JobType.IMAGE_FILTER.value, image_service.apply_filter)
-job_queue.register_handler(JobType.IMAGE_ROTATE.value, image_service.rotate)
-job_queue.register_handler(JobType.IMAGE_REMOVE_BG.value, rembg_service.remove_background)
-job_queue.register_handler(JobType.IMAGE_REMOVE_BG_INTERACTIVE.value, rembg_service.remove_background_interactive)
-
-
 @router.post("/convert", response_model=JobResponse)
-async def convert_image(request: ImageConvertRequest):
+async def convert_image(request: ImageConvertRequest, lane: Optional[JobLane] = None):
     """Convert image to different format."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_CONVERT.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_CONVERT.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/resize", response_model=JobResponse)
-async def resize_image(request: ImageResizeRequest):
+async def resize_image(request: ImageResizeRequest, lane: Optional[JobLane] = None):
     """Resize image."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_RESIZE.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_RESIZE.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/crop", response_model=JobResponse)
-async def crop_image(request: ImageCropRequest):
+async def crop_image(request: ImageCropRequest, lane: Optional[JobLane] = None):
     """Crop image."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_CROP.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_CROP.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/filter", response_model=JobResponse)
-async def apply_filter(request: ImageFilterRequest):
+async def apply_filter(request: ImageFilterRequest, lane: Optional[JobLane] = None):
     """Apply filter to image."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_FILTER.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_FILTER.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/rotate", response_model=JobResponse)
-async def rotate_image(request: ImageRotateRequest):
+async def rotate_image(request: ImageRotateRequest, lane: Optional[JobLane] = None):
     """Rotate or flip image."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_ROTATE.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_ROTATE.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/remove-bg", response_model=JobResponse)
-async def remove_background(request: ImageRemoveBgRequest):
+async def remove_background(request: ImageRemoveBgRequest, lane: Optional[JobLane] = None):
     """Remove image background using AI."""
-    job_id = await job_queue.enqueue(JobType.IMAGE_REMOVE_BG.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.IMAGE_REMOVE_BG.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/remove-bg-interactive", response_model=JobResponse)
-async def remove_background_interactive(request: ImageRemoveBgInteractiveRequest):
+async def remove_background_interactive(request: ImageRemoveBgInteractiveRequest, lane: Optional[JobLane] = None):
     """Remove image background using user-specified region."""
     # Convert Point objects to lists for JSON serialization
     data = request.model_dump()
     data["fg_points"] = [[p["x"], p["y"]] for p in data["fg_points"]]
     data["bg_points"] = [[p["x"], p["y"]] for p in data["bg_points"]]
-    job_id = await job_queue.enqueue(JobType.IMAGE_REMOVE_BG_INTERACTIVE.value, data)
+    job_id = await job_queue.enqueue(JobType.IMAGE_REMOVE_BG_INTERACTIVE.value, data, lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
@@ -1,12 +1,15 @@
 import os
 import asyncio
 import json
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse, StreamingResponse
-import redis.asyncio as redis
 
 from config import get_settings
-from models.job import JobDetailResponse, JobListResponse, JobResponse, JobStatus
+from models.job import JobDetailResponse, JobListResponse, JobResponse, JobStatus, JobType, QueuePressureResponse
+from services.blob_service import blob_store
+from services.cache_service import result_cache
+from services.event_service import job_events
 from services.queue_service import job_queue
 
 router = APIRouter()
@@ -14,17 +17,122 @@ router = APIRouter()
 
 @router.get("", response_model=JobListResponse)
 async def list_jobs(
-    page: int = Query(default=1, ge=1),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     page_size: int = Query(default=20, ge=1, le=100),
+    status: Optional[JobStatus] = Query(default=None),
+    job_type: Optional[JobType] = Query(default=None),
 ):
-    """List all jobs with pagination."""
-    jobs, total = await job_queue.list_jobs(page, page_size)
+    """List job summaries, newest first, with cursor pagination."""
+    try:
+        jobs, total, next_cursor = await job_queue.list_jobs(cursor, page_size, status, job_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return JobListResponse(
         jobs=jobs,
         total=total,
-        page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/stats")
+async def get_job_stats():
+    """Retained job count, Redis memory use and result cache hit rate."""
+    return {
+        **await job_queue.get_storage_stats(),
+        "result_cache": await result_cache.get_stats(),
+    }
+
+
+@router.get("/pressure", response_model=QueuePressureResponse)
+async def get_queue_pressure():
+    """Queue depth and estimated work per lane against the admission limits.
+
+    Submissions to a lane that is not accepting get 429 with Retry-After.
+    """
+    return QueuePressureResponse(lanes=await job_queue.get_pressure())
+
+
+@router.get("/stream")
+async def stream_jobs_progress(
+    job_ids: list[str] = Query(default=[], description="Job IDs to watch (repeat or comma-separate)"),
+    batch_id: Optional[str] = Query(default=None, description="Watch every job in a batch"),
+):
+    """Stream progress updates for many jobs over one SSE connection.
+
+    Sends a ``snapshot`` event with the current state of every job, then one
+    message per update (tagged by ``job_id``), and a ``done`` event once all
+    jobs have reached a final state.
+    """
+    settings = get_settings()
+
+    ids = [job_id for value in job_ids for job_id in value.split(",") if job_id]
+    if batch_id:
+        if not await job_queue.get_batch(batch_id):
+            raise HTTPException(status_code=404, detail="Batch not found")
+        ids.extend(await job_queue.get_batch_job_ids(batch_id))
+    ids = list(dict.fromkeys(ids))
+
+    if not ids:
+        raise HTTPException(status_code=400, detail="No jobs to watch")
+    if len(ids) > settings.max_batch_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot watch more than {settings.max_batch_size} jobs at once"
+        )
+
+    final_statuses = [JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value]
+
+    def job_event(job: JobDetailResponse) -> dict:
+        return {
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "progress": job.progress,
+            "message": job.message,
+            "output_file": job.output_file,
+            "error": job.error,
+            "file_size": job.file_size,
+        }
+
+    async def event_generator():
+        async with job_events.subscribe(ids) as updates:
+            # Initial state of every job, fetched in one round trip
+            jobs = [job for job in await job_queue.get_jobs(ids) if job]
+            yield f"event: snapshot\ndata: {json.dumps([job_event(job) for job in jobs])}\n\n"
+
+            # Unknown jobs can never finish, so only wait on the ones that exist
+            active = {job.job_id for job in jobs if job.status.value not in final_statuses}
+
+            while active:
+                try:
+                    data = await asyncio.wait_for(updates.get(), timeout=settings.sse_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    # Idle: re-check in case a final update was skipped
+                    pending_ids = list(active)
+                    for job_id, job in zip(pending_ids, await job_queue.get_jobs(pending_ids)):
+                        if job is None or job.status.value in final_statuses:
+                            active.discard(job_id)
+                            if job:
+                                yield f"data: {json.dumps(job_event(job))}\n\n"
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield f"data: {json.dumps(data)}\n\n"
+
+                if data.get("status") in final_statuses:
+                    active.discard(data["job_id"])
+
+            yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
     )
 
 
@@ -45,17 +153,8 @@ async def get_job_progress(job_id: str):
     settings = get_settings()
 
     async def event_generator():
-        # Connect to Redis for pub/sub
-        r = redis.Redis(
-            host=settings.redis_host,
-            port=settings.redis_port,
-            decode_responses=True,
-        )
-
-        pubsub = r.pubsub()
-        await pubsub.subscribe(f"job_updates:{job_id}")
-
-        try:
+        # Listen through the shared subscription before reading the snapshot
+        async with job_events.subscribe([job_id]) as updates:
             # Send initial status
             job = await job_queue.get_job(job_id)
             if job:
@@ -65,25 +164,19 @@ async def get_job_progress(job_id: str):
                 if job.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]:
                     return
 
-            # Listen for updates
+            # Push updates as they arrive; keepalive only while idle
             while True:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=30)
-
-                if message and message["type"] == "message":
-                    data = json.loads(message["data"])
-                    yield f"data: {json.dumps(data)}\n\n"
-
-                    # Close on completion
-                    if data.get("status") in ["completed", "failed", "cancelled"]:
-                        break
+                try:
+                    data = await asyncio.wait_for(updates.get(), timeout=settings.sse_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
 
-                # Send keepalive
-                yield f": keepalive\n\n"
-                await asyncio.sleep(1)
+                yield f"data: {json.dumps(data)}\n\n"
 
-        finally:
-            await pubsub.unsubscribe(f"job_updates:{job_id}")
-            await r.close()
+                # Close on completion
+                if data.get("status") in ["completed", "failed", "cancelled"]:
+                    break
 
     return StreamingResponse(
         event_generator(),
@@ -126,7 +219,6 @@ async def cancel_job(job_id: str):
 @router.post("/{job_id}/use-result")
 async def use_result_as_input(job_id: str):
     """Copy job result to uploads for use as input in next operation."""
-    import shutil
     import uuid
 
     settings = get_settings()
@@ -147,12 +239,12 @@ async def use_result_as_input(job_id: str):
     if not os.path.exists(output_path):
         raise HTTPException(status_code=404, detail="Output file not found")
 
-    # Generate new file ID and copy to uploads
+    # Generate new file ID and store it with the other uploads (deduplicated)
     ext = os.path.splitext(job.output_file)[1]
     new_file_id = f"{uuid.uuid4()}_edited{ext}"
     new_path = os.path.join(settings.upload_dir, new_file_id)
 
-    shutil.copy2(output_path, new_path)
+    await blob_store.add_file(new_file_id, output_path)
 
     # Determine content type
     ext_lower = ext.lower()
@@ -0,0 +1,60 @@
+import time
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.event_service import job_events
+from services.metrics_service import metrics
+from services.queue_service import job_queue
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    await metrics.start()
+
+    pressure = await job_queue.get_pressure()
+
+    gauges = [
+        (
+            "ezclip_queue_depth",
+            "Jobs waiting to be picked up, per lane",
+            {f'lane="{lane}"': load["waiting"] for lane, load in pressure.items()},
+        ),
+        (
+            "ezclip_jobs_in_progress",
+            "Jobs delivered to a worker and not yet finished, per lane",
+            {f'lane="{lane}"': load["in_progress"] for lane, load in pressure.items()},
+        ),
+        (
+            "ezclip_queue_estimated_seconds",
+            "Estimated processing time of the jobs waiting, per lane",
+            {f'lane="{lane}"': load["estimated_seconds"] for lane, load in pressure.items()},
+        ),
+        (
+            "ezclip_queue_pressure",
+            "Fill ratio of the fuller admission limit, per lane (submissions are refused at 1)",
+            {f'lane="{lane}"': load["pressure"] for lane, load in pressure.items()},
+        ),
+        (
+            "ezclip_sse_connections",
+            "Open progress streams served by this API process",
+            {"": job_events.listener_count},
+        ),
+    ]
+
+    # Not applicable to the in-memory queue backend
+    if metrics.redis:
+        started = time.monotonic()
+        await metrics.redis.ping()
+        gauges.append((
+            "ezclip_redis_ping_seconds",
+            "Redis PING round trip measured during this scrape",
+            {"": time.monotonic() - started},
+        ))
+
+    return PlainTextResponse(
+        await metrics.render(gauges),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -1,13 +1,22 @@
 import os
+import time
 import uuid
 import re
-import aiofiles
 from urllib.parse import unquote
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import FileResponse
 from PIL import Image
 
 from config import get_settings
+from services.blob_service import (
+    blob_store,
+    write_stream_hashed,
+    write_files_hashed,
+    copy_stream_to,
+)
+from services.executor_service import executor_service, PoolType
+from services.metrics_service import metrics
+from services.probe_service import probe_frame_rate
 from services.file_service import (
     sanitize_filename,
     get_mime_type,
@@ -21,6 +30,12 @@ from services.file_service import (
 router = APIRouter()
 
 
+def _record_upload(started: float, size: int, deduplicated: bool):
+    metrics.observe("ezclip_upload_seconds", time.monotonic() - started)
+    metrics.inc("ezclip_upload_bytes_total", size)
+    metrics.inc("ezclip_uploads_total", labels={"deduplicated": str(deduplicated).lower()})
+
+
 @router.post("")
 async def upload_file(
     file: UploadFile = File(...),
@@ -31,26 +46,32 @@ async def upload_file(
     # Sanitize filename
     original_filename = sanitize_filename(file.filename or "unnamed")
 
-    # Read file to get size
-    content = await file.read()
-    file_size = len(content)
+    started = time.monotonic()
 
-    # Validate
-    validate_file(original_filename, file.content_type or "", file_size)
+    # Copy the spooled upload out and hash it in the same pass, without loading it into memory
+    temp_path = blob_store.temp_path()
+    try:
+        digest, file_size = await executor_service.run(PoolType.THREAD, write_stream_hashed, file.file, temp_path)
 
-    # Generate unique file ID
-    file_id = f"{uuid.uuid4()}_{original_filename}"
-    file_path = os.path.join(settings.upload_dir, file_id)
+        # Validate
+        validate_file(original_filename, file.content_type or "", file_size)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
-    # Save file
-    async with aiofiles.open(file_path, "wb") as f:
-        await f.write(content)
+    # Generate unique file ID; identical content shares one stored blob
+    file_id = f"{uuid.uuid4()}_{original_filename}"
+    deduplicated = await blob_store.store(file_id, digest, file_size, temp_path)
+    _record_upload(started, file_size, deduplicated)
 
     return {
         "file_id": file_id,
         "filename": original_filename,
         "size": file_size,
         "content_type": get_mime_type(original_filename),
+        "sha256": digest,
+        "deduplicated": deduplicated,
     }
 
 
@@ -75,38 +96,42 @@ async def upload_chunk(
 
     # Save chunk
     chunk_path = os.path.join(chunk_dir, f"chunk_{chunk_index:05d}")
-    content = await file.read()
-
-    async with aiofiles.open(chunk_path, "wb") as f:
-        await f.write(content)
+    await executor_service.run(PoolType.THREAD, copy_stream_to, file.file, chunk_path)
 
     # Check if all chunks uploaded
     uploaded_chunks = len([f for f in os.listdir(chunk_dir) if f.startswith("chunk_")])
 
     if uploaded_chunks == total_chunks:
-        # Combine chunks
-        file_id = f"{uuid.uuid4()}_{original_filename}"
-        final_path = os.path.join(settings.upload_dir, file_id)
+        chunk_paths = [os.path.join(chunk_dir, f"chunk_{i:05d}") for i in range(total_chunks)]
+        started = time.monotonic()
+
+        # Combine the chunks in order, hashing them as they are written
+        temp_path = blob_store.temp_path()
+        try:
+            digest, file_size = await executor_service.run(
+                PoolType.THREAD, write_files_hashed, chunk_paths, temp_path
+            )
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
 
-        async with aiofiles.open(final_path, "wb") as outfile:
-            for i in range(total_chunks):
-                chunk_path = os.path.join(chunk_dir, f"chunk_{i:05d}")
-                async with aiofiles.open(chunk_path, "rb") as infile:
-                    await outfile.write(await infile.read())
+        file_id = f"{uuid.uuid4()}_{original_filename}"
+        deduplicated = await blob_store.store(file_id, digest, file_size, temp_path)
+        _record_upload(started, file_size, deduplicated)
 
         # Clean up chunks
         import shutil
         shutil.rmtree(chunk_dir, ignore_errors=True)
 
-        # Get final size
-        file_size = os.path.getsize(final_path)
-
         return {
             "status": "completed",
             "file_id": file_id,
             "filename": original_filename,
             "size": file_size,
             "content_type": get_mime_type(original_filename),
+            "sha256": digest,
+            "deduplicated": deduplicated,
         }
 
     return {
@@ -116,6 +141,28 @@ async def upload_chunk(
     }
 
 
+@router.get("/stats")
+async def get_upload_stats():
+    """Uploads served from existing content and the bytes that saved."""
+    return await blob_store.get_stats()
+
+
+@router.delete("/file/{file_id:path}")
+async def delete_uploaded_file(file_id: str):
+    """Delete an uploaded file; its stored content goes once nothing else uses it."""
+    # URL decode the file_id
+    file_id = unquote(file_id)
+
+    # Sanitize file_id
+    if ".." in file_id or file_id.startswith("/") or "\\" in file_id:
+        raise HTTPException(status_code=400, detail="Invalid file ID")
+
+    if not await blob_store.delete(file_id):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return {"file_id": file_id, "deleted": True}
+
+
 @router.get("/file/{file_id:path}")
 async def get_uploaded_file(file_id: str):
     """Get uploaded file info."""
@@ -279,12 +326,9 @@ async def get_file_metadata(file_id: str):
                         metadata["video_codec"] = stream.get("codec_name")
                         metadata["video_codec_long"] = stream.get("codec_long_name")
                         # Frame rate
-                        if "r_frame_rate" in stream:
-                            try:
-                                num, den = stream["r_frame_rate"].split("/")
-                                metadata["fps"] = round(int(num) / int(den), 2)
-                            except Exception:
-                                pass
+                        fps = probe_frame_rate(stream)
+                        if fps is not None:
+                            metadata["fps"] = round(fps, 2)
                         # Pixel format
                         if "pix_fmt" in stream:
                             metadata["pixel_format"] = stream["pix_fmt"]
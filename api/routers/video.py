@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from typing import Optional
 
 from models.video import (
     VideoConvertRequest,
@@ -11,83 +12,70 @@ from models.video import (
     VideoThumbnailRequest,
     VideoAudioRequest,
 )
-from models.job import JobResponse, JobStatus, JobType
+from models.job import JobResponse, JobStatus, JobType, JobLane
 from services.queue_service import job_queue
-from services.video_service import video_service
 
 router = APIRouter()
 
 
-# Register handlers
-job_queue.register_handler(JobType.VIDEO_CONVERT.value, video_service.convert)
-job_queue.register_handler(JobType.VIDEO_TO_GIF.value, video_service.to_gif)
-job_queue.register_handler(JobType.GIF_TO_VIDEO.value, video_service.from_gif)
-job_queue.register_handler(JobType.VIDEO_TRIM.value, video_service.trim)
-job_queue.register_handler(JobType.VIDEO_CROP.value, video_service.crop)
-job_queue.register_handler(JobType.VIDEO_RESIZE.value, video_service.resize)
-job_queue.register_handler(JobType.VIDEO_COMPRESS.value, video_service.compress)
-job_queue.register_handler(JobType.VIDEO_THUMBNAIL.value, video_service.thumbnail)
-job_queue.register_handler(JobType.VIDEO_AUDIO.value, video_service.handle_audio)
-
-
 @router.post("/convert", response_model=JobResponse)
-async def convert_video(request: VideoConvertRequest):
+async def convert_video(request: VideoConvertRequest, lane: Optional[JobLane] = None):
     """Convert video to different format."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_CONVERT.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_CONVERT.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/to-gif", response_model=JobResponse)
-async def video_to_gif(request: VideoToGifRequest):
+async def video_to_gif(request: VideoToGifRequest, lane: Optional[JobLane] = None):
     """Convert video to GIF."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_TO_GIF.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_TO_GIF.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/from-gif", response_model=JobResponse)
-async def gif_to_video(request: GifToVideoRequest):
+async def gif_to_video(request: GifToVideoRequest, lane: Optional[JobLane] = None):
     """Convert GIF to video."""
-    job_id = await job_queue.enqueue(JobType.GIF_TO_VIDEO.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.GIF_TO_VIDEO.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/trim", response_model=JobResponse)
-async def trim_video(request: VideoTrimRequest):
+async def trim_video(request: VideoTrimRequest, lane: Optional[JobLane] = None):
     """Trim video to specified duration."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_TRIM.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_TRIM.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/crop", response_model=JobResponse)
-async def crop_video(request: VideoCropRequest):
+async def crop_video(request: VideoCropRequest, lane: Optional[JobLane] = None):
     """Crop video to specified region."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_CROP.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_CROP.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/resize", response_model=JobResponse)
-async def resize_video(request: VideoResizeRequest):
+async def resize_video(request: VideoResizeRequest, lane: Optional[JobLane] = None):
     """Change video resolution."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_RESIZE.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_RESIZE.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/compress", response_model=JobResponse)
-async def compress_video(request: VideoCompressRequest):
+async def compress_video(request: VideoCompressRequest, lane: Optional[JobLane] = None):
     """Compress video file."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_COMPRESS.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_COMPRESS.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/thumbnail", response_model=JobResponse)
-async def extract_thumbnail(request: VideoThumbnailRequest):
+async def extract_thumbnail(request: VideoThumbnailRequest, lane: Optional[JobLane] = None):
     """Extract thumbnail from video."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_THUMBNAIL.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_THUMBNAIL.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
 
 
 @router.post("/audio", response_model=JobResponse)
-async def handle_audio(request: VideoAudioRequest):
+async def handle_audio(request: VideoAudioRequest, lane: Optional[JobLane] = None):
     """Extract or remove audio from video."""
-    job_id = await job_queue.enqueue(JobType.VIDEO_AUDIO.value, request.model_dump())
+    job_id = await job_queue.enqueue(JobType.VIDEO_AUDIO.value, request.model_dump(), lane)
     return JobResponse(job_id=job_id, status=JobStatus.PENDING, progress=0)
@@ -5,6 +5,7 @@ import uuid
 from abc import ABC
 
 from config import get_settings
+from services.queue_service import track_output
 
 
 class BaseProcessingService(ABC):
@@ -30,13 +31,18 @@ class BaseProcessingService(ABC):
     def _get_output_path(self, filename: str) -> str:
         """Get the full path for a processed output file.
 
+        The path is tracked for the running job, so a partial file is removed
+        if the job is cancelled or fails.
+
         Args:
             filename: The name of the output file.
 
         Returns:
             The absolute path to the file in the processed directory.
         """
-        return os.path.join(self.settings.processed_dir, filename)
+        path = os.path.join(self.settings.processed_dir, filename)
+        track_output(path)
+        return path
 
     def _generate_output_filename(self, original_filename: str, suffix: str, extension: str) -> str:
         """Generate a unique output filename.
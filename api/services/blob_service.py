@@ -0,0 +1,294 @@
+"""Content-addressed storage for uploaded files.
+
+Each distinct upload is stored once in ``blob_dir`` under its SHA-256. Every
+``file_id`` in ``upload_dir`` is a hard link to its blob, so code that opens
+uploads by path is unchanged while duplicate uploads take no extra space.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from typing import Any, BinaryIO, Optional
+
+from config import get_settings
+from services.executor_service import executor_service, PoolType
+from services.probe_service import probe_cache
+from services.queue_service import job_queue
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Redis keys: "blob:<sha256>" holds size and reference count,
+# "upload_file:<file_id>" the digest of an upload, "blob_stats" dedup counters.
+# Both index keys expire after upload_index_ttl_seconds without use, so Redis
+# can evict them under memory pressure (volatile-ttl); a lost entry only costs
+# deduplication, as every upload is its own hard link or copy of the content
+BLOB_PREFIX = "blob:"
+UPLOAD_PREFIX = "upload_file:"
+STATS_KEY = "blob_stats"
+
+# Takes a reference on an existing blob; returns 0 if the blob is unknown
+ACQUIRE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    local refs = redis.call('HINCRBY', KEYS[1], 'refs', 1)
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    return refs
+end
+return 0
+"""
+
+# Drops a reference; returns 1 when it was the last one. The entry stays at
+# zero references until the blob file is gone, so a store of the same content
+# meanwhile takes a reference on it instead of writing the blob file anew
+RELEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 1
+end
+if redis.call('HINCRBY', KEYS[1], 'refs', -1) <= 0 then
+    return 1
+end
+return 0
+"""
+
+# After the blob file was moved aside: drops the entry and returns 1 if it is
+# still unreferenced, or returns 0 if a store took a reference in the meantime
+# and the file has to be put back
+FINISH_RELEASE_SCRIPT = """
+if tonumber(redis.call('HGET', KEYS[1], 'refs') or 0) <= 0 then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+def _copy_hashed(source: BinaryIO, target: BinaryIO, digest: Any) -> int:
+    size = 0
+    while chunk := source.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        target.write(chunk)
+        size += len(chunk)
+    return size
+
+
+def write_stream_hashed(stream: BinaryIO, path: str) -> tuple[str, int]:
+    """Copy a file object from the start to ``path``, hashing it on the way; returns (digest, size)."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    with open(path, "wb") as f:
+        size = _copy_hashed(stream, f, digest)
+    return digest.hexdigest(), size
+
+
+def write_files_hashed(paths: list[str], path: str) -> tuple[str, int]:
+    """Concatenate several files into ``path`` (e.g. upload chunks in order), hashing them on the way."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as f:
+        for source in paths:
+            with open(source, "rb") as part:
+                size += _copy_hashed(part, f, digest)
+    return digest.hexdigest(), size
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_stream_to(stream: BinaryIO, path: str):
+    stream.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(stream, f, HASH_CHUNK_SIZE)
+
+
+def _link_or_copy(source: str, target: str):
+    try:
+        os.link(source, target)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        # Different filesystems; dedup degrades to a copy
+        shutil.copy2(source, target)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class BlobStore:
+    """Reference-counted, deduplicated upload storage.
+
+    New content is written to a temporary file from ``temp_path()`` while it
+    is hashed, then handed to ``store``, which keeps it as the blob or drops
+    it if the content is already stored.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._acquire_script = None
+        self._release_script = None
+        self._finish_release_script = None
+
+    @property
+    def redis(self):
+        return job_queue.redis
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.settings.blob_dir, digest)
+
+    def temp_path(self) -> str:
+        """A new temporary path next to the blobs, for content passed to ``store``."""
+        os.makedirs(self.settings.blob_dir, exist_ok=True)
+        return os.path.join(self.settings.blob_dir, f"{uuid.uuid4().hex}.tmp")
+
+    async def store(self, file_id: str, digest: str, size: int, temp_path: str) -> bool:
+        """Make ``file_id`` an upload with the content written to ``temp_path``.
+
+        The temporary file is taken over: it becomes the blob if no blob with
+        this digest exists yet and is removed otherwise. Returns True if the
+        upload was a duplicate that reused an existing blob.
+        """
+        try:
+            deduplicated = await self._store(file_id, digest, size, temp_path)
+        finally:
+            _remove(temp_path)
+        # Probe the upload in the background, so jobs on it are estimated without waiting
+        probe_cache.warm(os.path.join(self.settings.upload_dir, file_id))
+        return deduplicated
+
+    async def _store(self, file_id: str, digest: str, size: int, temp_path: str) -> bool:
+        await job_queue.connect()
+        file_path = os.path.join(self.settings.upload_dir, file_id)
+        if self.redis is None:
+            # No Redis to keep reference counts in (in-memory queue backend):
+            # every upload keeps its own copy
+            os.replace(temp_path, file_path)
+            return False
+
+        if self._acquire_script is None:
+            self._acquire_script = self.redis.register_script(ACQUIRE_SCRIPT)
+
+        ttl = self.settings.upload_index_ttl_seconds
+        blob_path = self._blob_path(digest)
+
+        if await self._acquire_script(keys=[f"{BLOB_PREFIX}{digest}"], args=[ttl], client=self.redis):
+            try:
+                await executor_service.run(PoolType.THREAD, _link_or_copy, blob_path, file_path)
+            except FileNotFoundError:
+                # The blob file went away underneath its index entry; store it again
+                await self._release(digest)
+            except BaseException:
+                await self._release(digest)
+                raise
+            else:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.set(f"{UPLOAD_PREFIX}{file_id}", digest, ex=ttl)
+                    pipe.hincrby(STATS_KEY, "deduplicated", 1)
+                    pipe.hincrby(STATS_KEY, "bytes_saved", size)
+                    await pipe.execute()
+                return True
+
+        # New content: link the upload to our own copy before publishing it as
+        # the blob, so a concurrent release of this digest cannot take it away
+        await executor_service.run(PoolType.THREAD, _link_or_copy, temp_path, file_path)
+        os.replace(temp_path, blob_path)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"{BLOB_PREFIX}{digest}", "size", str(size))
+            pipe.hincrby(f"{BLOB_PREFIX}{digest}", "refs", 1)
+            pipe.expire(f"{BLOB_PREFIX}{digest}", ttl)
+            pipe.set(f"{UPLOAD_PREFIX}{file_id}", digest, ex=ttl)
+            await pipe.execute()
+        return False
+
+    async def add_file(self, file_id: str, source_path: str) -> bool:
+        """Store a copy of an existing file (e.g. a job output) as an upload."""
+        temp_path = self.temp_path()
+        try:
+            digest, size = await executor_service.run(
+                PoolType.THREAD, write_files_hashed, [source_path], temp_path
+            )
+        except BaseException:
+            _remove(temp_path)
+            raise
+        return await self.store(file_id, digest, size, temp_path)
+
+    async def digest(self, file_id: str) -> Optional[str]:
+        """Content digest recorded when the file was uploaded, if any."""
+        await job_queue.connect()
+        if self.redis is None:
+            return None
+        # Reading an upload's digest counts as use and keeps the entry alive
+        return await self.redis.getex(
+            f"{UPLOAD_PREFIX}{file_id}", ex=self.settings.upload_index_ttl_seconds
+        )
+
+    async def delete(self, file_id: str) -> bool:
+        """Remove an upload, deleting its blob once no upload refers to it."""
+        await job_queue.connect()
+
+        file_path = os.path.join(self.settings.upload_dir, file_id)
+        if not os.path.exists(file_path):
+            return False
+        if self.redis is None:
+            os.remove(file_path)
+            return True
+
+        digest = await self.redis.getdel(f"{UPLOAD_PREFIX}{file_id}")
+        if not digest and os.stat(file_path).st_nlink > 1:
+            # The index entry expired; the upload still shares a blob, find it by content
+            digest = await executor_service.run(PoolType.THREAD, sha256_file, file_path)
+        os.remove(file_path)
+        if digest:
+            await self._release(digest)
+        return True
+
+    async def _release(self, digest: str):
+        if self._release_script is None:
+            self._release_script = self.redis.register_script(RELEASE_SCRIPT)
+            self._finish_release_script = self.redis.register_script(FINISH_RELEASE_SCRIPT)
+
+        key = f"{BLOB_PREFIX}{digest}"
+        if not await self._release_script(keys=[key], client=self.redis):
+            return
+
+        # Move the file aside first: a store that takes a reference from now on
+        # finds it missing and writes the content again, one that took it
+        # before the move gets it back
+        blob_path = self._blob_path(digest)
+        tomb_path = f"{blob_path}.{uuid.uuid4().hex}.deleted"
+        try:
+            os.rename(blob_path, tomb_path)
+        except FileNotFoundError:
+            tomb_path = None
+        try:
+            if not await self._finish_release_script(keys=[key], client=self.redis) and tomb_path:
+                # Same digest, same content, whichever copy ends up in place
+                os.replace(tomb_path, blob_path)
+                tomb_path = None
+        finally:
+            if tomb_path:
+                _remove(tomb_path)
+
+    async def get_stats(self) -> dict[str, Any]:
+        await job_queue.connect()
+        if self.redis is None:
+            return {"deduplicated_uploads": 0, "bytes_saved": 0}
+
+        deduplicated, bytes_saved = await self.redis.hmget(STATS_KEY, ["deduplicated", "bytes_saved"])
+        return {
+            "deduplicated_uploads": int(deduplicated or 0),
+            "bytes_saved": int(bytes_saved or 0),
+        }
+
+
+# Global instance
+blob_store = BlobStore()
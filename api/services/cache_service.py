@@ -0,0 +1,280 @@
+"""Content-addressed cache of job results.
+
+A result is keyed by the SHA-256 of the input file's content, the job type,
+the job's normalized parameters and the settings that shape the output, so
+re-running the same operation on the same content (even from a different
+upload) reuses the earlier output.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from config import get_settings
+from services.blob_service import blob_store, sha256_file
+from services.executor_service import executor_service, PoolType
+from services.queue_service import job_queue
+from services.trace_service import span
+
+
+# Redis keys: one hash per entry, an LRU index scored by last use (ms), the
+# total bytes held, and hit/miss counters
+ENTRY_PREFIX = "result_cache:"
+LRU_KEY = "result_cache_lru"
+BYTES_KEY = "result_cache_bytes"
+STATS_KEY = "result_cache_stats"
+
+# Part of every key; bump it when a change to the processing code alters its
+# outputs, so results made by the old code are no longer served
+CACHE_VERSION = 1
+
+# Adds a complete entry unless another worker stored the same result first;
+# returns the cache's total bytes, or -1 if the entry already existed
+STORE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], 'result') == 1 then
+    return -1
+end
+redis.call('HSET', KEYS[1], 'file', ARGV[1], 'output_name', ARGV[2], 'size', ARGV[3], 'result', ARGV[4])
+redis.call('ZADD', KEYS[2], ARGV[5], ARGV[6])
+return redis.call('INCRBY', KEYS[3], ARGV[3])
+"""
+
+
+def _link_or_copy(source: str, target: str):
+    # Hard links share the bytes on disk; fall back to a copy across devices
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _output_name(file_id: str, output_file: str) -> str:
+    """The operation part of an output's name: "resized.png" for "<file_id stem>_resized_<id>.png".
+
+    Cache entries keep only this part, so a hit never reveals the name of
+    the upload that first produced the result.
+    """
+    stem, ext = os.path.splitext(output_file)
+    base = f"{os.path.splitext(file_id)[0]}_"
+    if not stem.startswith(base):
+        return f"result{ext}"
+    return f"{stem[len(base):].rsplit('_', 1)[0]}{ext}"
+
+
+class ResultCache:
+    """LRU cache of job outputs bounded by ``result_cache_size`` (MB).
+
+    Cached outputs are hard links in ``cache_dir``. A hit links the cached
+    file into ``processed_dir`` under a fresh name, so every job still owns
+    its output and evicting an entry never breaks an earlier job's download.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._store_script = None
+
+    @property
+    def redis(self):
+        return job_queue.redis
+
+    def cached(
+        self,
+        job_type: str,
+        handler: Callable[[str, dict], Awaitable[dict]],
+    ) -> Callable[[str, dict], Awaitable[dict]]:
+        """Wrap a handler so identical requests are served from the cache."""
+
+        async def run(job_id: str, data: dict) -> dict:
+            key = None
+            try:
+                with span("cache_lookup"):
+                    key = await self._cache_key(job_type, data)
+                    result = await self._lookup(key, data.get("file_id"))
+                if result:
+                    # Marks the job as served from the cache (kept out of the runtime estimates)
+                    with span("cache_hit"):
+                        await job_queue.update_job(job_id, progress=90, message="Reusing cached result...")
+                    return result
+            except Exception as e:
+                print(f"Result cache lookup failed: {e}")
+
+            result = await handler(job_id, data)
+
+            if key:
+                try:
+                    with span("cache_store"):
+                        await self._store(key, data["file_id"], result)
+                except Exception as e:
+                    print(f"Result cache store failed: {e}")
+            return result
+
+        return run
+
+    async def get_stats(self) -> dict[str, Any]:
+        await job_queue.connect()
+        if self.redis is None:
+            return {"entries": 0, "bytes": 0, "max_bytes": 0, "hits": 0, "misses": 0, "hit_rate": 0.0}
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(STATS_KEY, ["hits", "misses"])
+            pipe.zcard(LRU_KEY)
+            pipe.get(BYTES_KEY)
+            (hits, misses), entries, size = await pipe.execute()
+
+        hits, misses = int(hits or 0), int(misses or 0)
+        return {
+            "entries": entries,
+            "bytes": int(size or 0),
+            "max_bytes": self.settings.result_cache_size * 1024 * 1024,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    async def file_digest(self, file_id: str) -> str:
+        """SHA-256 of an uploaded file, remembered until the file changes."""
+        # Uploads record their digest as they are stored
+        digest = await blob_store.digest(file_id)
+        if digest:
+            return digest
+
+        path = os.path.join(self.settings.upload_dir, file_id)
+        stat = os.stat(path)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        cached = await self.redis.get(f"file_hash:{file_id}")
+        if cached and cached.rsplit(":", 1)[0] == fingerprint:
+            return cached.rsplit(":", 1)[1]
+
+        digest = await executor_service.run(PoolType.THREAD, sha256_file, path)
+        await self.redis.set(
+            f"file_hash:{file_id}",
+            f"{fingerprint}:{digest}",
+            ex=self.settings.upload_index_ttl_seconds,
+        )
+        return digest
+
+    async def _cache_key(self, job_type: str, data: dict) -> Optional[str]:
+        file_id = data.get("file_id")
+        if not self.settings.result_cache_enabled or not file_id:
+            return None
+
+        await job_queue.connect()
+        if self.redis is None:
+            # The in-memory queue backend has nowhere shared to index entries
+            return None
+
+        params = {k: v for k, v in data.items() if k != "file_id" and v is not None}
+        payload = json.dumps({
+            "version": CACHE_VERSION,
+            "input": await self.file_digest(file_id),
+            "job_type": job_type,
+            "params": params,
+            # Settings that change the output, so a config change is not served stale results
+            "settings": {"rembg_model": self.settings.rembg_model},
+        }, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def _lookup(self, key: Optional[str], file_id: str) -> Optional[dict]:
+        if key is None:
+            return None
+
+        entry = await self.redis.hgetall(f"{ENTRY_PREFIX}{key}")
+        if "result" not in entry or "output_name" not in entry:
+            await self.redis.hincrby(STATS_KEY, "misses", 1)
+            return None
+
+        # Name the output after this job's input, as its handler would
+        stem, ext = os.path.splitext(entry["output_name"])
+        output_file = f"{os.path.splitext(file_id)[0]}_{stem}_{str(uuid.uuid4())[:8]}{ext}"
+        try:
+            await executor_service.run(
+                PoolType.THREAD,
+                _link_or_copy,
+                os.path.join(self.settings.cache_dir, entry["file"]),
+                os.path.join(self.settings.processed_dir, output_file),
+            )
+        except FileNotFoundError:
+            # Evicted by another worker since the lookup
+            await self.redis.hincrby(STATS_KEY, "misses", 1)
+            return None
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(LRU_KEY, {key: int(time.time() * 1000)}, xx=True)
+            pipe.hincrby(STATS_KEY, "hits", 1)
+            await pipe.execute()
+
+        return {**json.loads(entry["result"]), "output_file": output_file}
+
+    async def _store(self, key: str, file_id: str, result: dict):
+        output_file = result.get("output_file")
+        if not output_file:
+            return
+
+        output_path = os.path.join(self.settings.processed_dir, output_file)
+        size = os.path.getsize(output_path)
+        if size > self.settings.result_cache_size * 1024 * 1024:
+            return
+
+        # Each store links its own file; the entry pointing at one is added in a
+        # single step, so a worker that dies midway leaves no partial entry
+        cache_file = f"{key}_{uuid.uuid4().hex[:8]}{os.path.splitext(output_file)[1]}"
+        cache_path = os.path.join(self.settings.cache_dir, cache_file)
+        await executor_service.run(PoolType.THREAD, _link_or_copy, output_path, cache_path)
+
+        if self._store_script is None:
+            self._store_script = self.redis.register_script(STORE_SCRIPT)
+        try:
+            total = await self._store_script(
+                keys=[f"{ENTRY_PREFIX}{key}", LRU_KEY, BYTES_KEY],
+                args=[
+                    cache_file,
+                    _output_name(file_id, output_file),
+                    size,
+                    json.dumps({k: v for k, v in result.items() if k != "output_file"}),
+                    int(time.time() * 1000),
+                    key,
+                ],
+                client=self.redis,
+            )
+        except BaseException:
+            os.remove(cache_path)
+            raise
+
+        if total < 0:
+            # Another worker cached the same result concurrently
+            os.remove(cache_path)
+            return
+
+        await self._evict(total)
+
+    async def _evict(self, total: int):
+        """Drop least recently used entries until the cache fits its budget."""
+        max_bytes = self.settings.result_cache_size * 1024 * 1024
+
+        while total > max_bytes:
+            # ZPOPMIN is atomic, so concurrent workers never evict the same entry
+            popped = await self.redis.zpopmin(LRU_KEY)
+            if not popped:
+                break
+            key = popped[0][0]
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hmget(f"{ENTRY_PREFIX}{key}", ["file", "size"])
+                pipe.delete(f"{ENTRY_PREFIX}{key}")
+                (cache_file, size), _ = await pipe.execute()
+
+            if cache_file:
+                try:
+                    os.remove(os.path.join(self.settings.cache_dir, cache_file))
+                except FileNotFoundError:
+                    pass
+            total = await self.redis.decrby(BYTES_KEY, int(size or 0))
+
+
+# Global instance
+result_cache = ResultCache()
@@ -0,0 +1,102 @@
+"""Runtime and output-size estimates for queued jobs.
+
+Each job's input is measured in work units when it is enqueued: megapixels
+for images, megapixel-seconds of the processed span for video (seconds for
+audio, one per thumbnail). Finished jobs teach the queue backend how many
+seconds and output bytes each unit costs per job type, and the backend
+estimates new jobs from those rates as it stores them (``job_estimate``).
+Until a type has ``job_estimate_min_samples`` finished jobs, or when an
+input has not been probed yet, its configured ``job_cost_seconds`` is used
+instead.
+"""
+
+import os
+from typing import Any, Optional
+
+from config import get_settings
+from models.job import JobType
+from services.limits_service import IMAGE_JOB_TYPES, processed_duration
+from services.probe_service import probe_cache, probe_duration, probe_stream
+
+
+class JobEstimator:
+    """Measures job inputs and reports the estimates stored with them."""
+
+    def __init__(self):
+        self.settings = get_settings()
+
+    async def work_units(self, job_type: str, data: dict) -> Optional[float]:
+        """Size of a job's input in the units its rate is learned in; None if unknown.
+
+        Only metadata already in the probe cache is used, so enqueueing never
+        waits for ffprobe or an image decode.
+        """
+        if job_type == JobType.VIDEO_THUMBNAIL.value:
+            return 1.0
+
+        file_id = data.get("file_id")
+        if not file_id:
+            return None
+        try:
+            probe = await probe_cache.peek(os.path.join(self.settings.upload_dir, file_id))
+        except Exception:
+            return None
+        if not probe:
+            return None
+
+        video = probe_stream(probe, "video")
+        megapixels = (video.get("width") or 0) * (video.get("height") or 0) / 1_000_000
+        if job_type in IMAGE_JOB_TYPES:
+            # ffprobe reports a still image as a single video frame
+            return max(megapixels, 0.01) if megapixels else None
+
+        # Only the requested span is processed
+        duration = processed_duration(probe_duration(probe), data)
+        if not duration:
+            return None
+
+        if job_type == JobType.VIDEO_AUDIO.value:
+            return duration
+        return duration * max(megapixels, 0.01)
+
+    def sample(
+        self,
+        job_data: dict[str, str],
+        seconds: float,
+        file_size: Optional[int],
+    ) -> Optional[tuple[float, Optional[float]]]:
+        """(seconds, output bytes) per work unit of a finished job, if it was measured."""
+        units = float(job_data.get("work_units") or 0)
+        if units <= 0:
+            return None
+        return seconds / units, (file_size / units if file_size else None)
+
+    def remaining_seconds(self, job_data: dict[str, str], elapsed: float) -> float:
+        """Seconds left for a job that has been processing for ``elapsed`` seconds.
+
+        The upfront estimate is blended with the pace implied by the job's
+        progress, trusting the progress more the further along it is.
+        """
+        estimated = float(job_data.get("estimated_seconds") or 0)
+        progress = int(job_data.get("progress") or 0)
+        total = estimated
+        if progress > 0:
+            weight = progress / 100
+            total = (1 - weight) * estimated + weight * elapsed * 100 / progress
+        return max(0.0, total - elapsed)
+
+    def to_response(self, job_data: dict[str, str], elapsed: Optional[float]) -> Optional[dict[str, Any]]:
+        """The estimate reported on job details; ``elapsed`` is None once the job has finished."""
+        if "estimated_seconds" not in job_data:
+            return None
+        size = job_data.get("estimated_output_size")
+        return {
+            "seconds": float(job_data["estimated_seconds"]),
+            "output_size": int(size) if size else None,
+            "remaining_seconds": round(self.remaining_seconds(job_data, elapsed), 1) if elapsed is not None else None,
+            "learned": job_data.get("estimate_learned") == "1",
+        }
+
+
+# Global instance
+job_estimator = JobEstimator()
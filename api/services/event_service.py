@@ -0,0 +1,100 @@
+"""Shared job update subscription that fans out to in-process listeners."""
+
+import asyncio
+import contextlib
+import json
+from typing import AsyncIterator, Optional
+
+from services.queue_service import job_queue
+
+
+class JobEventHub:
+    """One queue backend subscription per process, fanned out to asyncio queues.
+
+    SSE streams register a queue for the job IDs they watch instead of opening
+    their own Redis connection, so the number of Redis connections stays
+    constant no matter how many clients are listening.
+    """
+
+    # Per-listener buffer; a slow client skips progress ticks but never final states
+    QUEUE_SIZE = 256
+    FINAL_STATUSES = ("completed", "failed", "cancelled")
+
+    def __init__(self):
+        self._listeners: dict[str, set[asyncio.Queue]] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    async def start(self):
+        if self._reader_task is None:
+            self._ready = asyncio.Event()
+            self._reader_task = asyncio.create_task(self._reader_loop())
+        await self._ready.wait()
+
+    async def stop(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, job_ids: list[str]) -> AsyncIterator[asyncio.Queue]:
+        """Receive updates for the given jobs on a queue while the context is open.
+
+        The shared subscription is active before this yields, so a snapshot
+        read inside the context cannot miss an update published after it.
+        """
+        await self.start()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        for job_id in job_ids:
+            self._listeners.setdefault(job_id, set()).add(queue)
+
+        try:
+            yield queue
+        finally:
+            for job_id in job_ids:
+                listeners = self._listeners.get(job_id)
+                if listeners is not None:
+                    listeners.discard(queue)
+                    if not listeners:
+                        del self._listeners[job_id]
+
+    @property
+    def listener_count(self) -> int:
+        return len({queue for listeners in self._listeners.values() for queue in listeners})
+
+    async def _reader_loop(self):
+        while True:
+            try:
+                async with job_queue.subscribe_updates() as updates:
+                    self._ready.set()
+                    async for job_id, data in updates:
+                        self._dispatch(job_id, data)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep listeners registered and resubscribe once the backend is back
+                print(f"Job event subscription error: {e}")
+                await asyncio.sleep(1)
+
+    def _dispatch(self, job_id: str, data: str):
+        listeners = self._listeners.get(job_id)
+        if not listeners:
+            return
+
+        event = json.loads(data)
+        for queue in listeners:
+            if queue.full():
+                if event.get("status") not in self.FINAL_STATUSES:
+                    continue
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+# Global instance
+job_events = JobEventHub()
@@ -0,0 +1,99 @@
+"""Executor pools for running blocking media work off the event loop."""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Optional
+
+from config import get_settings
+from pool.process import init_process_worker
+from pool.tracing import job_trace, call_traced
+
+
+class PoolType(str, Enum):
+    # CPU-bound pure Python/Pillow work; functions must be picklable (module level)
+    # and live in the ``pool`` package, which pool processes import on their own
+    PROCESS = "process"
+    # Work that releases the GIL (ONNX Runtime, OpenCV) or shares in-memory state
+    THREAD = "thread"
+
+
+class ExecutorService:
+    """Lazily created process and thread pools shared by all handlers.
+
+    Handlers choose the pool that fits their workload by calling ``run`` with
+    a ``PoolType``, keeping the asyncio loop free for uploads and SSE streams.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self, pool: PoolType) -> Executor:
+        if pool == PoolType.PROCESS:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.settings.process_pool_workers or os.cpu_count() or 1,
+                    # Avoid forking a process that holds event loop and ONNX threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=init_process_worker,
+                    initargs=(
+                        self.settings.process_pool_memory_limit_mb,
+                        self.settings.max_image_pixels,
+                    ),
+                )
+            return self._process_pool
+
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.settings.thread_pool_workers or os.cpu_count() or 1,
+                thread_name_prefix="ezclip-worker",
+            )
+        return self._thread_pool
+
+    async def run(self, pool: PoolType, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking function in the given pool and await its result.
+
+        Timing spans the function records are added to the calling job's trace.
+        If the caller is cancelled, work that has not started is dropped, and
+        work already running (which cannot be interrupted) is waited for
+        before the cancellation propagates, so the caller's cleanup, such as
+        removing a cancelled job's outputs, comes after its last write.
+        """
+        trace = job_trace.get()
+
+        if pool == PoolType.PROCESS:
+            if trace is None:
+                return await self._submit(pool, fn, *args, **kwargs)
+            # Pool processes record into their own trace and send the spans back
+            result, spans = await self._submit(pool, call_traced, fn, *args, **kwargs)
+            trace.extend(spans)
+            return result
+
+        # Threads run in a copy of the caller's context, so they see its job
+        return await self._submit(pool, contextvars.copy_context().run, fn, *args, **kwargs)
+
+    async def _submit(self, pool: PoolType, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        future = self._get_pool(pool).submit(fn, *args, **kwargs)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if not future.cancel():
+                await asyncio.wait([asyncio.wrap_future(future)])
+            raise
+
+    def shutdown(self):
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+
+# Global instance
+executor_service = ExecutorService()
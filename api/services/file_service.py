@@ -2,14 +2,13 @@
 
 import os
 import re
-import json
-import asyncio
 from typing import Optional
 
 from PIL import Image
 from PIL.ExifTags import TAGS, GPSTAGS
 
 from config import get_settings
+from services.probe_service import probe_cache
 
 
 # MIME type mapping
@@ -112,28 +111,8 @@ def extract_exif_data(image: Image.Image) -> dict:
 
 
 async def get_video_metadata(file_path: str) -> dict:
-    """Extract video metadata using ffprobe."""
-    try:
-        cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            file_path
-        ]
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, _ = await process.communicate()
-
-        if process.returncode == 0:
-            return json.loads(stdout.decode())
-        return {}
-    except Exception:
-        return {}
+    """Extract video metadata using ffprobe (cached per file version)."""
+    return await probe_cache.get(file_path)
 
 
 def is_image_file(filename: str) -> bool:
@@ -0,0 +1,46 @@
+"""Job handler registration shared by the API server and the standalone worker."""
+
+from typing import Awaitable, Callable
+
+from models.job import JobType
+from services.queue_service import job_queue
+from services.cache_service import result_cache
+from services.image_service import image_service
+from services.limits_service import job_limits
+from services.rembg_service import rembg_service
+from services.video_service import video_service
+
+
+def processing_handlers() -> dict[str, Callable[[str, dict], Awaitable[dict]]]:
+    """Every job type's processing handler, without caching or limits applied."""
+    return {
+        # Image
+        JobType.IMAGE_CONVERT.value: image_service.convert,
+        JobType.IMAGE_RESIZE.value: image_service.resize,
+        JobType.IMAGE_CROP.value: image_service.crop,
+        JobType.IMAGE_FILTER.value: image_service.apply_filter,
+        JobType.IMAGE_ROTATE.value: image_service.rotate,
+        JobType.IMAGE_REMOVE_BG.value: rembg_service.remove_background,
+        JobType.IMAGE_REMOVE_BG_INTERACTIVE.value: rembg_service.remove_background_interactive,
+
+        # Video
+        JobType.VIDEO_CONVERT.value: video_service.convert,
+        JobType.VIDEO_TO_GIF.value: video_service.to_gif,
+        JobType.GIF_TO_VIDEO.value: video_service.from_gif,
+        JobType.VIDEO_TRIM.value: video_service.trim,
+        JobType.VIDEO_CROP.value: video_service.crop,
+        JobType.VIDEO_RESIZE.value: video_service.resize,
+        JobType.VIDEO_COMPRESS.value: video_service.compress,
+        JobType.VIDEO_THUMBNAIL.value: video_service.thumbnail,
+        JobType.VIDEO_AUDIO.value: video_service.handle_audio,
+    }
+
+
+def register_handlers():
+    """Register every processing handler with the job queue."""
+    # Serve repeated requests from the result cache
+    for job_type, handler in processing_handlers().items():
+        job_queue.register_handler(job_type, result_cache.cached(job_type, handler))
+
+    # Time limits scaled to each job's input
+    job_queue.timeout_policy = job_limits.timeout_for
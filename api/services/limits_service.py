@@ -0,0 +1,92 @@
+"""Per-job wall-clock limits derived from the size of each job's input."""
+
+import os
+from typing import Optional
+from PIL import Image
+
+from config import get_settings
+from models.job import JobType
+from processors.ffmpeg_processor import FFmpegProcessor
+from services.executor_service import executor_service, PoolType
+
+
+IMAGE_JOB_TYPES = {
+    JobType.IMAGE_CONVERT.value,
+    JobType.IMAGE_RESIZE.value,
+    JobType.IMAGE_CROP.value,
+    JobType.IMAGE_FILTER.value,
+    JobType.IMAGE_ROTATE.value,
+    JobType.IMAGE_REMOVE_BG.value,
+    JobType.IMAGE_REMOVE_BG_INTERACTIVE.value,
+}
+
+
+def image_pixels(path: str) -> int:
+    # Only the header is read, so this is cheap even for huge images
+    with Image.open(path) as img:
+        width, height = img.size
+    return width * height
+
+
+def processed_duration(duration: float, data: dict) -> float:
+    """Seconds of a video job's input it processes: the requested span, else all of it.
+
+    ``duration`` is the probed input duration (0 if unknown). Trims give
+    ``start_time`` and ``end_time``, clips ``start_time`` and ``duration``.
+    """
+    start = float(data.get("start_time") or 0)
+    if data.get("end_time") is not None:
+        end = float(data["end_time"])
+        return max(0.0, (min(end, duration) if duration else end) - start)
+
+    span = max(0.0, duration - start) if duration else 0.0
+    if data.get("duration"):
+        span = min(span or float(data["duration"]), float(data["duration"]))
+    return span
+
+
+class JobLimits:
+    """Works out how long a job may run before it is failed.
+
+    Image jobs get time per megapixel, video jobs a multiple of the input
+    duration (``video_timeout_factors``), both clamped to the configured
+    minimum and maximum. Inputs that are too large to process safely are
+    rejected here, before any work starts.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.ffmpeg = FFmpegProcessor()
+
+    async def timeout_for(self, job_type: str, data: dict) -> Optional[float]:
+        """Seconds the job may run, or None if its type has no limit."""
+        file_id = data.get("file_id")
+        if not file_id:
+            return None
+        input_path = os.path.join(self.settings.upload_dir, file_id)
+
+        if job_type in IMAGE_JOB_TYPES:
+            pixels = await executor_service.run(PoolType.THREAD, image_pixels, input_path)
+            if pixels > self.settings.max_image_pixels:
+                raise ValueError(
+                    f"Image has {pixels:,} pixels, more than the limit of {self.settings.max_image_pixels:,}"
+                )
+            return self._clamp(pixels / 1_000_000 * self.settings.image_timeout_seconds_per_megapixel)
+
+        factor = self.settings.video_timeout_factors.get(job_type)
+        if factor is None:
+            return None
+
+        # Trims and clips only process the requested span
+        duration = processed_duration(await self.ffmpeg.get_duration(input_path), data)
+        return self._clamp(duration * factor)
+
+    def _clamp(self, seconds: float) -> float:
+        return min(
+            max(seconds, self.settings.job_timeout_min_seconds),
+            self.settings.job_timeout_max_seconds,
+        )
+
+
+# Global instance
+job_limits = JobLimits()
@@ -0,0 +1,372 @@
+"""Queue backend kept in the memory of a single process.
+
+For single-node installs that run the worker embedded in the API: jobs are
+dispatched through asyncio without a network round trip and no Redis server
+is needed. Jobs do not survive a restart, and a separate ``python -m worker``
+process cannot see them.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import itertools
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Optional
+
+from models.job import JobStatus, JobLane
+from services.queue_backend import (
+    QueueBackend,
+    Delivery,
+    LaneFullError,
+    index_score,
+    job_estimate,
+    lane_admits,
+    lane_poll_order,
+)
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+
+class MemoryQueueBackend(QueueBackend):
+    """Dicts, a sorted listing index and per-client deques, guarded by the event loop.
+
+    Every method runs on the event loop without awaiting in between, so each
+    one is atomic in the same way the Redis transactions and scripts are.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._jobs: dict[str, dict[str, str]] = {}
+        # time.time() after which a finished job is gone, like a Redis TTL
+        self._expires: dict[str, float] = {}
+        # (creation score, job ID), ascending
+        self._index: list[tuple[int, str]] = []
+        self._batches: dict[str, dict[str, str]] = {}
+        self._batch_jobs: dict[str, list[str]] = {}
+        self._batch_expires: dict[str, float] = {}
+        self._lane_seq = {lane.value: 0 for lane in JobLane}
+        self._lane_dequeued = {lane.value: 0 for lane in JobLane}
+        self._lane_work = {lane.value: 0.0 for lane in JobLane}
+        self._rates: dict[str, dict[str, float]] = {}
+        # Per lane and client: (enqueue time, delivery) waiting for a consumer
+        self._queues: dict[str, dict[str, deque[tuple[float, Delivery]]]] = {lane.value: {} for lane in JobLane}
+        # Per lane: virtual time of each client with jobs waiting, and of the lane
+        self._client_vtimes: dict[str, dict[str, float]] = {lane.value: {} for lane in JobLane}
+        self._lane_vtime = {lane.value: 0.0 for lane in JobLane}
+        self._client_active: dict[str, int] = {}
+        self._in_flight: dict[str, Delivery] = {}
+        self._entry_ids = itertools.count(1)
+        self._work_available: Optional[asyncio.Condition] = None
+        self._update_listeners: set[asyncio.Queue] = set()
+        self._cancel_listeners: set[asyncio.Queue] = set()
+
+    def _alive(self, job_id: str) -> Optional[dict[str, str]]:
+        job = self._jobs.get(job_id)
+        expires = self._expires.get(job_id)
+        if job is not None and expires is not None and expires <= time.time():
+            self._remove(job_id)
+            return None
+        return job
+
+    def _remove(self, job_id: str):
+        job = self._jobs.pop(job_id, None)
+        self._expires.pop(job_id, None)
+        if job is None:
+            return
+        entry = (index_score(job["created_at"]), job_id)
+        position = bisect.bisect_left(self._index, entry)
+        if position < len(self._index) and self._index[position] == entry:
+            del self._index[position]
+
+    def _batch(self, batch_id: str) -> Optional[dict[str, str]]:
+        expires = self._batch_expires.get(batch_id)
+        if expires is not None and expires <= time.time():
+            self._batches.pop(batch_id, None)
+            self._batch_jobs.pop(batch_id, None)
+            self._batch_expires.pop(batch_id, None)
+        return self._batches.get(batch_id)
+
+    async def add_jobs(
+        self, jobs: list[dict[str, str]], batch: Optional[dict[str, str]] = None, admit: bool = True
+    ):
+        estimates = []
+        incoming: dict[str, tuple[int, float]] = {}
+        for job in jobs:
+            units = float(job["work_units"]) if "work_units" in job else None
+            estimate = job_estimate(self.settings, job["job_type"], units, self._rates.get(job["job_type"], {}))
+            estimates.append(estimate)
+            count, work = incoming.get(job["lane"], (0, 0.0))
+            incoming[job["lane"]] = (count + 1, work + float(estimate["estimated_seconds"]))
+        for lane, (count, work) in incoming.items() if admit else ():
+            waiting = self._waiting(lane)
+            seconds = max(0.0, self._lane_work[lane])
+            if not lane_admits(self.settings, lane, waiting, seconds, count, work):
+                raise LaneFullError(lane, waiting, seconds, count, work)
+
+        now = time.time()
+        for job, estimate in zip(jobs, estimates):
+            job = {**job, **estimate}
+            lane = job["lane"]
+            self._lane_seq[lane] += 1
+            job["queue_seq"] = str(self._lane_seq[lane])
+
+            job_id = job["job_id"]
+            self._jobs[job_id] = dict(job)
+            bisect.insort(self._index, (index_score(job["created_at"]), job_id))
+            client = job["client"]
+            self._queues[lane].setdefault(client, deque()).append((now, Delivery(
+                lane=lane,
+                entry_id=str(next(self._entry_ids)),
+                fields={
+                    "job_id": job_id,
+                    "job_type": job["job_type"],
+                    "lane": lane,
+                    "queue_seq": job["queue_seq"],
+                    "estimated_seconds": job["estimated_seconds"],
+                    "client": client,
+                },
+            )))
+            self._client_vtimes[lane].setdefault(client, 0.0)
+            self._lane_work[lane] += float(job["estimated_seconds"])
+
+        if batch:
+            self._batches[batch["batch_id"]] = dict(batch)
+            self._batch_jobs[batch["batch_id"]] = [job["job_id"] for job in jobs]
+
+        if self._work_available:
+            async with self._work_available:
+                self._work_available.notify(len(jobs))
+
+    async def get_jobs(
+        self, job_ids: list[str], fields: Optional[tuple[str, ...]] = None
+    ) -> tuple[list[Optional[dict[str, str]]], dict[str, int]]:
+        jobs = []
+        for job_id in job_ids:
+            job = self._alive(job_id)
+            if job and fields:
+                job = {k: job[k] for k in fields if k in job}
+            jobs.append(dict(job) if job else None)
+        return jobs, dict(self._lane_dequeued)
+
+    async def get_job_field(self, job_id: str, field: str) -> Optional[str]:
+        job = self._alive(job_id)
+        return job.get(field) if job else None
+
+    async def increment_job_field(self, job_id: str, field: str, amount: int = 1) -> int:
+        job = self._alive(job_id)
+        if job is None:
+            return amount
+        value = int(job.get(field, 0)) + amount
+        job[field] = str(value)
+        return value
+
+    async def write_update(self, job_id: str, updates: dict[str, str], event: str, ttl: int) -> bool:
+        job = self._alive(job_id)
+        if job is None and "status" not in updates:
+            return False
+        if job is not None:
+            old = job.get("status")
+            if old in FINISHED_STATUSES:
+                return False
+            job.update(updates)
+
+            new = job.get("status")
+            batch_id = job.get("batch_id")
+            batch = self._batch(batch_id) if batch_id else None
+            if "status" in updates and old != new and batch:
+                if old:
+                    batch[old] = str(int(batch.get(old, 0)) - 1)
+                batch[new] = str(int(batch.get(new, 0)) + 1)
+            if "status" in updates and ttl > 0:
+                self._expires[job_id] = time.time() + ttl
+                if batch:
+                    # A batch lives as long as its longest-retained job
+                    self._batch_expires[batch_id] = max(self._batch_expires.get(batch_id, 0), time.time() + ttl)
+
+        for queue in self._update_listeners:
+            queue.put_nowait((job_id, event))
+        return True
+
+    async def get_batch(self, batch_id: str) -> Optional[dict[str, str]]:
+        batch = self._batch(batch_id)
+        return dict(batch) if batch else None
+
+    async def get_batch_job_ids(self, batch_id: str, offset: int = 0, limit: int = -1) -> list[str]:
+        job_ids = self._batch_jobs.get(batch_id, []) if self._batch(batch_id) else []
+        return job_ids[offset:] if limit < 0 else job_ids[offset:offset + limit]
+
+    async def list_job_ids(
+        self,
+        cursor: Optional[tuple[int, str]],
+        page_size: int,
+        status: Optional[str] = None,
+        job_type: Optional[str] = None,
+    ) -> tuple[list[tuple[str, int]], int]:
+        now = time.time()
+
+        def matches(job_id: str) -> bool:
+            job = self._jobs.get(job_id)
+            if job is None or self._expires.get(job_id, now + 1) <= now:
+                return False
+            return (not status or job["status"] == status) and (not job_type or job["job_type"] == job_type)
+
+        total = sum(1 for _, job_id in self._index if matches(job_id))
+
+        # Entries sort by (score, ID), so a cursor resumes at its position
+        # whether or not its job is still there
+        end = len(self._index)
+        if cursor:
+            end = bisect.bisect_left(self._index, cursor)
+
+        entries = []
+        for score, job_id in reversed(self._index[:end]):
+            if matches(job_id):
+                entries.append((job_id, score))
+                if len(entries) == page_size:
+                    break
+        return entries, total
+
+    async def sweep_jobs(self, max_retained: int) -> int:
+        removed = 0
+        kept = 0
+        now = time.time()
+
+        # Newest first: everything past the cap that has finished goes
+        for _, job_id in reversed(list(self._index)):
+            job = self._jobs[job_id]
+            if self._expires.get(job_id, now + 1) <= now:
+                self._remove(job_id)
+            elif kept >= max_retained and job["status"] in FINISHED_STATUSES:
+                self._remove(job_id)
+            else:
+                kept += 1
+                continue
+            removed += 1
+
+        for batch_id in list(self._batches):
+            self._batch(batch_id)
+        return removed
+
+    async def storage_stats(self) -> dict[str, Any]:
+        return {
+            "job_count": len(self._index),
+            "queued": {lane: self._waiting(lane) for lane in self._queues},
+        }
+
+    def _waiting(self, lane: str) -> int:
+        return sum(len(queue) for queue in self._queues[lane].values())
+
+    async def queue_depths(self) -> dict[str, tuple[int, int]]:
+        in_progress = {lane.value: 0 for lane in JobLane}
+        for delivery in self._in_flight.values():
+            in_progress[delivery.lane] += 1
+        return {lane: (self._waiting(lane), in_progress[lane]) for lane in self._queues}
+
+    async def queued_work(self) -> dict[str, float]:
+        return {lane: max(0.0, seconds) for lane, seconds in self._lane_work.items()}
+
+    async def learn_job_rate(self, job_type: str, seconds: float, size: Optional[float], smoothing: float):
+        rate = self._rates.setdefault(job_type, {"samples": 0})
+        for field, value in (("seconds", seconds), ("bytes", size)):
+            if value is not None:
+                old = rate.get(field)
+                rate[field] = value if old is None else old + smoothing * (value - old)
+        rate["samples"] += 1
+
+    async def publish_cancel(self, job_id: str):
+        for queue in self._cancel_listeners:
+            queue.put_nowait(job_id)
+
+    @contextlib.asynccontextmanager
+    async def _listen(self, listeners: set[asyncio.Queue]) -> AsyncIterator[AsyncIterator[Any]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        listeners.add(queue)
+
+        async def receive():
+            while True:
+                yield await queue.get()
+
+        try:
+            yield receive()
+        finally:
+            listeners.discard(queue)
+
+    def subscribe_cancels(self):
+        return self._listen(self._cancel_listeners)
+
+    def subscribe_updates(self):
+        return self._listen(self._update_listeners)
+
+    async def prepare_dispatch(self):
+        if self._work_available is None:
+            self._work_available = asyncio.Condition()
+
+    def _pop_next(self) -> Optional[Delivery]:
+        now = time.time()
+        waited = {
+            JobLane(lane): now - min(queue[0][0] for queue in clients.values())
+            for lane, clients in self._queues.items() if clients
+        }
+        if not waited:
+            return None
+
+        for lane in lane_poll_order(waited, self.settings):
+            delivery = self._pop_fair(lane.value)
+            if delivery:
+                self._in_flight[delivery.entry_id] = delivery
+                self._lane_dequeued[delivery.lane] += 1
+                self._lane_work[delivery.lane] -= float(delivery.fields["estimated_seconds"])
+                if not self._queues[delivery.lane]:
+                    # Restart from zero so rounding cannot make the estimate drift
+                    self._lane_work[delivery.lane] = 0.0
+                client = delivery.fields["client"]
+                self._client_active[client] = self._client_active.get(client, 0) + 1
+                return delivery
+        return None
+
+    def _pop_fair(self, lane: str) -> Optional[Delivery]:
+        """Head of the queue of the client furthest behind in the lane, skipping capped clients."""
+        cap = self.settings.client_max_active_jobs
+        vtimes = self._client_vtimes[lane]
+        for client in sorted(vtimes, key=vtimes.get):
+            if cap > 0 and self._client_active.get(client, 0) >= cap:
+                continue
+
+            queue = self._queues[lane][client]
+            _, delivery = queue.popleft()
+            # A client that was idle starts at the lane's virtual time
+            start = max(vtimes[client], self._lane_vtime[lane])
+            self._lane_vtime[lane] = start
+            if queue:
+                weight = self.settings.client_weights.get(client, 1) or 1
+                vtimes[client] = start + float(delivery.fields["estimated_seconds"]) / weight
+            else:
+                del self._queues[lane][client]
+                del vtimes[client]
+            return delivery
+        return None
+
+    async def next_delivery(self, consumer: str) -> Optional[Delivery]:
+        await self.prepare_dispatch()
+        async with self._work_available:
+            delivery = self._pop_next()
+            if delivery is None:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._work_available.wait(), 1)
+                delivery = self._pop_next()
+        return delivery
+
+    async def ack(self, delivery: Delivery):
+        if self._in_flight.pop(delivery.entry_id, None) is None:
+            return
+
+        client = delivery.fields["client"]
+        self._client_active[client] -= 1
+        if not self._client_active[client]:
+            del self._client_active[client]
+        # A consumer may have skipped the client while it was at its cap
+        if self._work_available and self.settings.client_max_active_jobs > 0:
+            async with self._work_available:
+                self._work_available.notify()
@@ -0,0 +1,212 @@
+"""Prometheus-style metrics shared by the API and worker processes.
+
+Observations are buffered in memory and periodically added to Redis hashes,
+so ``/metrics`` on any API instance reports totals across every worker
+process. With the in-memory queue backend everything runs in one process
+and the totals are kept locally instead. Gauges such as queue depth are read
+live when scraped.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+import redis.asyncio as redis
+
+from config import get_settings
+
+
+# Histograms: name -> (help, bucket upper bounds)
+HISTOGRAMS = {
+    "ezclip_job_wait_seconds": (
+        "Time jobs wait in the queue before processing starts",
+        (0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600),
+    ),
+    "ezclip_job_duration_seconds": (
+        "Handler run time by job type and outcome",
+        (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+    ),
+    "ezclip_ffmpeg_speed_ratio": (
+        "ffmpeg processing speed relative to real time (the speed= ratio) per run",
+        (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64),
+    ),
+    "ezclip_rembg_inference_seconds": (
+        "Background removal model inference time",
+        (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60),
+    ),
+    "ezclip_upload_seconds": (
+        "Time to hash and store an upload once received",
+        (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+    ),
+    "ezclip_redis_roundtrip_seconds": (
+        "Latency of Redis round trips made to flush metrics",
+        (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+    ),
+}
+
+# Counters: name -> help
+COUNTERS = {
+    "ezclip_uploads_total": "Uploads stored, by whether they reused existing content",
+    "ezclip_upload_bytes_total": "Bytes received by uploads",
+    "ezclip_jobs_rejected_total": "Job submissions refused by admission control, per lane",
+}
+
+# Job type of the job running in the current task, for metrics recorded
+# deep inside handlers (ffmpeg, rembg)
+current_job_type: ContextVar[str] = ContextVar("current_job_type", default="")
+
+
+def _label_string(labels: Optional[dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    return ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+class Metrics:
+    """Buffers counter increments and histogram observations for Redis.
+
+    ``observe`` and ``inc`` are cheap and thread-safe, so they can be called
+    from the event loop or from pool threads.
+    """
+
+    FLUSH_SECONDS = 5
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.redis: Optional[redis.Redis] = None
+        self._lock = threading.Lock()
+        # (metric name, Redis hash field) -> amount to add
+        self._pending: dict[tuple[str, str], float] = {}
+        # Metric name -> {hash field: total} when there is no Redis to add to
+        self._totals: Optional[dict[str, dict[str, float]]] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def inc(self, name: str, value: float = 1, labels: Optional[dict[str, str]] = None):
+        with self._lock:
+            key = (name, _label_string(labels))
+            self._pending[key] = self._pending.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[dict[str, str]] = None):
+        buckets = HISTOGRAMS[name][1]
+        label_string = _label_string(labels)
+        with self._lock:
+            # Buckets are cumulative: the value counts towards every bound it fits under
+            for bound in buckets[bisect.bisect_left(buckets, value):]:
+                key = (name, f"{label_string}|{bound}")
+                self._pending[key] = self._pending.get(key, 0) + 1
+            for field, amount in (("+Inf", 1), ("count", 1), ("sum", value)):
+                key = (name, f"{label_string}|{field}")
+                self._pending[key] = self._pending.get(key, 0) + amount
+
+    async def start(self):
+        if self.settings.queue_backend == "memory":
+            self._totals = self._totals or {}
+        elif self.redis is None:
+            self.redis = redis.Redis(
+                host=self.settings.redis_host,
+                port=self.settings.redis_port,
+                decode_responses=True,
+            )
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self.redis:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Metrics flush error: {e}")
+            await self.redis.aclose()
+            self.redis = None
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Metrics flush error: {e}")
+
+    async def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        if self._totals is not None:
+            for (name, field), amount in pending.items():
+                totals = self._totals.setdefault(name, {})
+                totals[field] = totals.get(field, 0) + amount
+            return
+
+        started = time.monotonic()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for (name, field), amount in pending.items():
+                    if isinstance(amount, int):
+                        pipe.hincrby(f"metrics:{name}", field, amount)
+                    else:
+                        pipe.hincrbyfloat(f"metrics:{name}", field, amount)
+                await pipe.execute()
+        except BaseException:
+            # Keep the observations for the next attempt (or the final flush)
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            raise
+        self.observe("ezclip_redis_roundtrip_seconds", time.monotonic() - started)
+
+    async def render(self, gauges: list[tuple[str, str, dict[str, float]]]) -> str:
+        """Render stored counters and histograms plus live gauges.
+
+        ``gauges`` holds (name, help, {label string: value}) entries.
+        """
+        if self._totals is not None:
+            await self.flush()
+            stored = {name: dict(self._totals.get(name, {})) for name in [*COUNTERS, *HISTOGRAMS]}
+        else:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name in [*COUNTERS, *HISTOGRAMS]:
+                    pipe.hgetall(f"metrics:{name}")
+                stored = dict(zip([*COUNTERS, *HISTOGRAMS], await pipe.execute()))
+
+        lines = []
+        for name, help_text, values in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            lines += [f"{name}{{{labels}}} {value}" if labels else f"{name} {value}" for labels, value in values.items()]
+
+        for name, help_text in COUNTERS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for labels, value in sorted(stored[name].items()):
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+
+        for name, (help_text, buckets) in HISTOGRAMS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            series: dict[str, dict[str, str]] = {}
+            for field, value in stored[name].items():
+                labels, _, part = field.rpartition("|")
+                series.setdefault(labels, {})[part] = value
+            for labels, parts in sorted(series.items()):
+                prefix = f"{labels}," if labels else ""
+                for bound in [*map(str, buckets), "+Inf"]:
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {parts.get(bound, 0)}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {parts.get('sum', 0)}")
+                lines.append(f"{name}_count{suffix} {parts.get('count', 0)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+metrics = Metrics()
@@ -0,0 +1,224 @@
+"""Shared cache of ffprobe metadata.
+
+A file is probed once for its full format and stream info; the result is
+kept as a JSON sidecar in ``probe_dir`` keyed by the file's path, size and
+modification time, so the API and every worker reuse it until the file
+changes. Recently used entries are also held in memory, and concurrent
+requests for the same file share a single ffprobe run. Uploads are probed
+in the background as they arrive (``warm``), so the queue can measure job
+inputs with ``peek`` without waiting for ffprobe.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from config import get_settings
+from services.executor_service import executor_service, PoolType
+
+
+# Entries held in memory per process
+MEMORY_ENTRIES = 256
+
+# Sidecar writes between scans that trim probe_dir to its entry limit
+PRUNE_INTERVAL = 100
+
+
+def probe_duration(probe: dict) -> float:
+    """Container duration in seconds, 0 if unknown."""
+    try:
+        return float(probe.get("format", {}).get("duration") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def probe_stream(probe: dict, codec_type: str) -> dict:
+    """First stream of ``codec_type`` ("video" or "audio"), or {}."""
+    return next((s for s in probe.get("streams", []) if s.get("codec_type") == codec_type), {})
+
+
+def probe_frame_rate(stream: dict) -> Optional[float]:
+    """Frames per second from a stream's ``r_frame_rate`` ("30000/1001")."""
+    try:
+        num, den = stream["r_frame_rate"].split("/")
+        return int(num) / int(den) if int(den) else None
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+
+class ProbeCache:
+    """ffprobe results by (path, size, mtime), on disk and in memory."""
+
+    def __init__(self):
+        self.settings = get_settings()
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._warming: set[asyncio.Task] = set()
+        self._writes = 0
+
+    def _key(self, file_path: str) -> Optional[str]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return hashlib.sha1(
+            f"{os.path.realpath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        ).hexdigest()
+
+    async def get(self, file_path: str) -> dict:
+        """ffprobe's ``-show_format -show_streams`` JSON for a file; {} if it cannot be probed."""
+        key = self._key(file_path)
+        if key is None:
+            return {}
+
+        probe = self._memory.get(key)
+        if probe is not None:
+            self._memory.move_to_end(key)
+            return probe
+
+        # Someone is already probing this file
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            probe = await executor_service.run(PoolType.THREAD, self._read, key)
+            if probe is None:
+                probe = await self._probe(file_path)
+                if probe:
+                    await executor_service.run(PoolType.THREAD, self._write, key, probe)
+            if probe:
+                self._remember(key, probe)
+            future.set_result(probe)
+            return probe
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting; keep the exception from being reported as unretrieved
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def peek(self, file_path: str) -> dict:
+        """The cached probe of a file, or {} if it has not been probed yet; never runs ffprobe."""
+        key = self._key(file_path)
+        if key is None:
+            return {}
+        probe = self._memory.get(key)
+        if probe is not None:
+            self._memory.move_to_end(key)
+            return probe
+        probe = await executor_service.run(PoolType.THREAD, self._read, key)
+        if not probe:
+            return {}
+        self._remember(key, probe)
+        return probe
+
+    def warm(self, file_path: str):
+        """Probe a file in the background so later ``peek`` calls find it."""
+        task = asyncio.create_task(self.get(file_path))
+        self._warming.add(task)
+        task.add_done_callback(self._warmed)
+
+    def _warmed(self, task: asyncio.Task):
+        self._warming.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"Probe cache warm-up failed: {task.exception()}")
+
+    async def _probe(self, file_path: str) -> dict:
+        cmd = [
+            "ffprobe",
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_format",
+            "-show_streams",
+            file_path
+        ]
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, _ = await process.communicate()
+        except OSError:
+            return {}
+
+        if process.returncode != 0:
+            return {}
+        try:
+            return json.loads(stdout.decode())
+        except ValueError:
+            return {}
+
+    def _remember(self, key: str, probe: dict):
+        self._memory[key] = probe
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+    def _sidecar_path(self, key: str) -> str:
+        return os.path.join(self.settings.probe_dir, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[dict]:
+        path = self._sidecar_path(key)
+        try:
+            with open(path) as f:
+                probe = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            # Mark the entry as recently used for pruning
+            os.utime(path)
+        except OSError:
+            pass
+        return probe
+
+    def _write(self, key: str, probe: dict):
+        path = self._sidecar_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.settings.probe_dir, exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump(probe, f)
+            # Atomic, so other processes never read a partial sidecar
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Probe cache write failed: {e}")
+            return
+
+        self._writes += 1
+        if self._writes % PRUNE_INTERVAL == 0:
+            self._prune()
+
+    def _prune(self):
+        """Delete the least recently used sidecars beyond ``probe_cache_max_entries``."""
+        entries = []
+        try:
+            with os.scandir(self.settings.probe_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except OSError:
+            return
+
+        excess = len(entries) - self.settings.probe_cache_max_entries
+        if excess <= 0:
+            return
+        entries.sort()
+        for _, path in entries[:excess]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# Global instance
+probe_cache = ProbeCache()
@@ -0,0 +1,275 @@
+"""Storage and dispatch behind ``JobQueue``.
+
+``JobQueue`` keeps the job lifecycle (progress coalescing, timeouts, cancel
+handling, metrics); a backend stores the job records and moves them between
+the API and the workers. ``RedisQueueBackend`` serves any number of API and
+worker processes. ``MemoryQueueBackend`` keeps everything inside a single
+process for installs that run the worker embedded in the API.
+"""
+
+import random
+from abc import ABC, abstractmethod
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional
+
+from models.job import JobLane
+
+
+@dataclass
+class Delivery:
+    """A queued job handed to one consumer until it is acknowledged."""
+    lane: str
+    entry_id: str
+    # job_id, job_type, lane, queue_seq, estimated_seconds and client
+    fields: dict[str, str]
+
+
+class LaneFullError(Exception):
+    """``add_jobs`` refused the jobs: they would take ``lane`` past its admission limits."""
+
+    def __init__(self, lane: str, waiting: int, seconds: float, jobs: int, work: float):
+        super().__init__(f"The {lane} lane is full")
+        self.lane = lane
+        self.waiting = waiting
+        self.seconds = seconds
+        # The refused jobs of the lane and their estimated seconds
+        self.jobs = jobs
+        self.work = work
+
+
+def work_ms(estimated_seconds: str) -> int:
+    """A job's estimated seconds in whole ms, as counted in its lane's queued work."""
+    return int(float(estimated_seconds) * 1000 + 0.5)
+
+
+def lane_admits(settings, lane: str, waiting: int, seconds: float, jobs: int, work: float) -> bool:
+    """Whether ``jobs`` more jobs of ``work`` estimated seconds fit in a lane.
+
+    The work limit does not apply to a lane with nothing waiting, so a
+    single job estimated above it is not refused forever.
+    """
+    max_jobs = settings.lane_max_queued_jobs.get(lane, 0)
+    max_seconds = settings.lane_max_queued_seconds.get(lane, 0)
+    if max_jobs and waiting + jobs > max_jobs:
+        return False
+    return not (waiting and max_seconds and seconds + work > max_seconds)
+
+
+def job_estimate(settings, job_type: str, units: Optional[float], rate: dict[str, float]) -> dict[str, str]:
+    """Job record fields holding the estimate for a job of ``units`` work units.
+
+    ``rate`` is what the type's finished jobs taught (seconds and output
+    bytes per unit, and the number of samples); until there are
+    ``job_estimate_min_samples`` of them, or if the input could not be
+    measured, the configured ``job_cost_seconds`` is used.
+    """
+    if units is not None and "seconds" in rate and rate.get("samples", 0) >= settings.job_estimate_min_samples:
+        fields = {"estimate_learned": "1", "estimated_seconds": f"{units * rate['seconds']:.3f}"}
+        if "bytes" in rate:
+            fields["estimated_output_size"] = str(int(units * rate["bytes"]))
+        return fields
+    return {"estimate_learned": "0", "estimated_seconds": str(settings.job_cost_seconds.get(job_type, 10))}
+
+
+def index_score(created_at: str) -> int:
+    """Listing score of a job: its creation time (naive UTC ISO) in ms."""
+    return int(datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def lane_poll_order(waited: dict[JobLane, float], settings) -> list[JobLane]:
+    """Pick the order in which lanes are polled for the next dequeue.
+
+    ``waited`` holds how long the oldest undelivered job of each non-empty
+    lane has been queued. A lane is drawn by weight to go first, with the
+    rest following in priority order. Lanes whose oldest job has waited past
+    the starvation threshold are polled before anything else.
+    """
+    lanes = list(JobLane)
+
+    starving = sorted(
+        ((seconds, lane) for lane, seconds in waited.items() if seconds > settings.lane_starvation_seconds),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+    weights = [max(0, settings.lane_weights.get(lane.value, 1)) for lane in lanes]
+    preferred = random.choices(lanes, weights=weights)[0] if any(weights) else lanes[0]
+
+    order = [lane for _, lane in starving] + [preferred] + lanes
+    return list(dict.fromkeys(order))
+
+
+class QueueBackend(ABC):
+    """Job records, listing indexes, lane queues and update fan-out.
+
+    Job records are flat ``dict[str, str]`` hashes. Status-changing updates
+    are applied atomically together with their batch counters, listing
+    indexes and retention TTL, and are refused once a job is cancelled.
+    """
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    # Jobs
+
+    @abstractmethod
+    async def add_jobs(
+        self, jobs: list[dict[str, str]], batch: Optional[dict[str, str]] = None, admit: bool = True
+    ):
+        """Admit, store, list and queue new jobs, all or none of them.
+
+        Each job is first estimated (``job_estimate``) from its
+        ``work_units``, if measured, and the rates learned for its type, in
+        the same step as the rest. The jobs are then checked against each lane's admission limits
+        (``lane_admits``) together with the jobs already waiting, atomically
+        with storing them; ``LaneFullError`` is raised if any lane cannot
+        take them. Each stored record is given the next ``queue_seq`` of its
+        lane, and its ``estimated_seconds`` are added to the lane's queued
+        work. Jobs wait in a queue of their lane per ``client``.
+        ``batch`` holds the batch record when the jobs form one. With
+        ``admit`` False the limits are skipped, for jobs that were accepted
+        earlier and are only being queued again.
+        """
+
+    @abstractmethod
+    async def get_jobs(
+        self, job_ids: list[str], fields: Optional[tuple[str, ...]] = None
+    ) -> tuple[list[Optional[dict[str, str]]], dict[str, int]]:
+        """Job records (or only ``fields`` of them) plus the number of jobs dequeued per lane."""
+
+    @abstractmethod
+    async def get_job_field(self, job_id: str, field: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def increment_job_field(self, job_id: str, field: str, amount: int = 1) -> int:
+        pass
+
+    @abstractmethod
+    async def write_update(self, job_id: str, updates: dict[str, str], event: str, ttl: int) -> bool:
+        """Store job fields and publish ``event`` to update subscribers.
+
+        With a status in ``updates`` the job also moves between its batch
+        counters and status index, and ``ttl`` > 0 starts its retention
+        countdown. Returns False if nothing changed: the job has already
+        finished (completed, failed or cancelled), or, for an update without
+        a status, it is gone.
+        """
+
+    @abstractmethod
+    async def get_batch(self, batch_id: str) -> Optional[dict[str, str]]:
+        pass
+
+    @abstractmethod
+    async def get_batch_job_ids(self, batch_id: str, offset: int = 0, limit: int = -1) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def list_job_ids(
+        self,
+        cursor: Optional[tuple[int, str]],
+        page_size: int,
+        status: Optional[str] = None,
+        job_type: Optional[str] = None,
+    ) -> tuple[list[tuple[str, int]], int]:
+        """A page of (job ID, creation score) newest first, and the filtered total.
+
+        ``cursor`` is the (score, job ID) of the last entry of the previous page.
+        """
+
+    @abstractmethod
+    async def sweep_jobs(self, max_retained: int) -> int:
+        """Drop expired jobs and the oldest finished ones beyond ``max_retained``."""
+
+    async def try_lock(self, name: str, seconds: int) -> bool:
+        """Take a lock shared by every process using the backend until it expires."""
+        return True
+
+    async def migrate_job_list(self) -> int:
+        return 0
+
+    async def legacy_queued_jobs(self) -> list[dict[str, str]]:
+        """Pending jobs left in the legacy ``job_queue`` list, oldest first."""
+        return []
+
+    async def drop_legacy_queue(self):
+        """Delete the legacy list once its jobs have been queued again."""
+
+    @abstractmethod
+    async def storage_stats(self) -> dict[str, Any]:
+        pass
+
+    @abstractmethod
+    async def queue_depths(self) -> dict[str, tuple[int, int]]:
+        """Jobs waiting and jobs delivered but not acknowledged, per lane."""
+
+    @abstractmethod
+    async def queued_work(self) -> dict[str, float]:
+        """Estimated seconds of processing waiting in each lane."""
+
+    # Estimates
+
+    @abstractmethod
+    async def learn_job_rate(self, job_type: str, seconds: float, size: Optional[float], smoothing: float):
+        """Blend one finished job's seconds and output bytes per work unit into its type's rates.
+
+        Each rate is an exponentially weighted average: a new sample moves it
+        ``smoothing`` of the way. The first sample of a type sets it outright.
+        """
+
+    # Notifications
+
+    @abstractmethod
+    async def publish_cancel(self, job_id: str):
+        pass
+
+    @abstractmethod
+    def subscribe_cancels(self) -> AbstractAsyncContextManager[AsyncIterator[str]]:
+        """Job IDs cancelled anywhere, while the context is open."""
+
+    @abstractmethod
+    def subscribe_updates(self) -> AbstractAsyncContextManager[AsyncIterator[tuple[str, str]]]:
+        """Every job's (job ID, event JSON), while the context is open.
+
+        The subscription is active once the context has been entered.
+        """
+
+    # Dispatch
+
+    async def prepare_dispatch(self):
+        pass
+
+    @abstractmethod
+    async def next_delivery(self, consumer: str) -> Optional[Delivery]:
+        """Claim the next queued job, or None if nothing arrived within about a second.
+
+        Lanes are polled in ``lane_poll_order``. Within a lane, clients share
+        the workers by start-time fair queuing: each client's queue carries a
+        virtual time that advances by the estimated seconds of every job it
+        is served, divided by the client's weight, and the client furthest
+        behind goes next. Clients with ``client_max_active_jobs`` jobs
+        unacknowledged are skipped. Claiming a job counts it as dequeued and
+        takes its estimate off the lane's queued work.
+        """
+
+    async def renew_delivery(self, delivery: Delivery, consumer: str):
+        """Keep a long-running delivery from being handed to another consumer."""
+
+    @abstractmethod
+    async def ack(self, delivery: Delivery):
+        """Finish a delivery; unacknowledged ones may be delivered again."""
+
+
+def create_backend(settings) -> QueueBackend:
+    if settings.queue_backend == "memory":
+        from services.memory_backend import MemoryQueueBackend
+        return MemoryQueueBackend(settings)
+    if settings.queue_backend == "redis":
+        from services.redis_backend import RedisQueueBackend
+        return RedisQueueBackend(settings)
+    raise ValueError(f"Unknown queue backend: {settings.queue_backend}")
@@ -1,92 +1,327 @@
 import asyncio
+import contextlib
 import json
+import math
+import os
+import socket
+import time
 import uuid
-from datetime import datetime
-from typing import Any, Callable, Optional
-import redis.asyncio as redis
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 from config import get_settings
-from models.job import JobStatus, JobType, JobDetailResponse
+from constants import JOB_TYPE_LANES
+from models.job import JobStatus, JobType, JobLane, JobSummary, JobDetailResponse
+from services.executor_service import executor_service, PoolType
+from services.estimate_service import job_estimator
+from services.metrics_service import metrics, current_job_type
+from services.queue_backend import QueueBackend, Delivery, LaneFullError, create_backend, lane_admits
+from services.trace_service import JobTrace, job_trace, span, append_trace
+
+
+TERMINAL_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+# Hash fields returned by listings (everything except the request data and the
+# client a job was queued for, which is kept internal)
+SUMMARY_FIELDS = (
+    "job_id", "job_type", "status", "progress", "message", "output_file", "file_size",
+    "created_at", "updated_at", "error", "lane", "queue_seq", "batch_id",
+)
+
+# Client a job belongs to when the submitter is not identified
+DEFAULT_CLIENT = "anonymous"
+
+# Output files created by the job running in the current task, so they can
+# be removed if it is cancelled or fails partway
+_job_outputs: ContextVar[Optional[list[str]]] = ContextVar("job_outputs", default=None)
+
+# Identity of the client whose request is being handled; jobs it submits
+# share the workers fairly with other clients' jobs
+current_client: ContextVar[Optional[str]] = ContextVar("current_client", default=None)
+
+
+def track_output(path: str):
+    """Record a file the current job writes; it is deleted unless the job completes."""
+    outputs = _job_outputs.get()
+    if outputs is not None:
+        outputs.append(path)
+
+
+class QueueFullError(Exception):
+    """A lane is at its admission limits; the client should retry later."""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"The {lane} queue is full ({reason}); retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+@dataclass
+class ProgressState:
+    """Last published progress for a job and any value waiting to be flushed."""
+    sent: dict[str, str] = field(default_factory=dict)
+    sent_at: float = 0.0
+    pending: dict[str, str] = field(default_factory=dict)
+    flush: Optional[asyncio.Task] = None
 
 
 class JobQueue:
     def __init__(self):
         self.settings = get_settings()
-        self.redis: Optional[redis.Redis] = None
-        self.worker_task: Optional[asyncio.Task] = None
+        # Job storage and dispatch: Redis, or in-process for single-node installs
+        self.backend: QueueBackend = create_backend(self.settings)
+        self.worker_tasks: list[asyncio.Task] = []
         self.handlers: dict[str, Callable] = {}
+        # Returns the seconds a job may run (None = unlimited); raising rejects the job
+        self.timeout_policy: Optional[Callable[[str, dict], Awaitable[Optional[float]]]] = None
+        self._type_slots: dict[str, asyncio.Semaphore] = {}
+        # Shared by all capped job types, so they always leave a consumer for the others
+        self._capped_slots: Optional[asyncio.Semaphore] = None
+        # Claimed jobs whose type was at its cap, with their lease renewals,
+        # waiting for a slot without holding a consumer
+        self._parked: dict[str, deque[tuple[Delivery, asyncio.Task]]] = {}
+        self._slot_freed = asyncio.Event()
+        self._progress: dict[str, ProgressState] = {}
+        self._active_jobs: dict[str, asyncio.Task] = {}
         self._running = False
 
+    @property
+    def redis(self):
+        """The Redis client shared with the result cache and blob store; None without Redis."""
+        return getattr(self.backend, "redis", None)
+
     async def connect(self):
-        if self.redis is None:
-            self.redis = redis.Redis(
-                host=self.settings.redis_host,
-                port=self.settings.redis_port,
-                decode_responses=True,
-            )
+        await self.backend.connect()
 
     async def disconnect(self):
-        if self.redis:
-            await self.redis.close()
-            self.redis = None
+        await self.backend.close()
 
     def register_handler(self, job_type: str, handler: Callable):
         self.handlers[job_type] = handler
 
-    async def enqueue(self, job_type: str, data: dict[str, Any]) -> str:
+    def _default_lane(self, job_type: str) -> JobLane:
+        return JobLane(JOB_TYPE_LANES.get(job_type, JobLane.NORMAL.value))
+
+    def _client_id(self, client: Optional[str]) -> str:
+        client = (client or current_client.get() or "").strip()
+        return client[:64] or DEFAULT_CLIENT
+
+    async def enqueue(
+        self,
+        job_type: str,
+        data: dict[str, Any],
+        lane: Optional[JobLane] = None,
+        client: Optional[str] = None,
+    ) -> str:
+        job_ids = await self.enqueue_many([(job_type, data)], lane, client=client)
+        return job_ids[0]
+
+    async def enqueue_many(
+        self,
+        items: list[tuple[str, dict[str, Any]]],
+        lane: Optional[JobLane] = None,
+        batch_id: Optional[str] = None,
+        client: Optional[str] = None,
+    ) -> list[str]:
+        """Store, queue and list several jobs at once.
+
+        Each job gets a per-lane sequence number used to report its queue
+        position. The jobs are queued for ``client`` (by default the client
+        of the current request), which shares each lane's workers fairly
+        with other clients. With a ``batch_id`` the jobs are also recorded as a batch
+        whose status counters are kept up to date by ``update_job``. Jobs'
+        inputs are measured from cached metadata; the backend estimates,
+        admits and stores them together and ``QueueFullError`` is raised
+        (storing nothing) if they would take any lane past its limits.
+        """
         await self.connect()
 
-        job_id = str(uuid.uuid4())
-        job = {
-            "job_id": job_id,
-            "job_type": job_type,
-            "status": JobStatus.PENDING.value,
-            "progress": 0,
-            "data": data,
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-        }
+        lanes = [(lane or self._default_lane(job_type)).value for job_type, _ in items]
+
+        units = await asyncio.gather(*(job_estimator.work_units(job_type, data) for job_type, data in items))
+
+        client = self._client_id(client)
+        now = datetime.utcnow().isoformat()
+        jobs = [
+            {
+                "job_id": str(uuid.uuid4()),
+                "job_type": job_type,
+                "status": JobStatus.PENDING.value,
+                "progress": "0",
+                "data": json.dumps(data),
+                "created_at": now,
+                "updated_at": now,
+                "lane": job_lane,
+                "client": client,
+                **({"work_units": repr(round(job_units, 6))} if job_units is not None else {}),
+                **({"batch_id": batch_id} if batch_id else {}),
+            }
+            for (job_type, data), job_lane, job_units in zip(items, lanes, units)
+        ]
+
+        batch = None
+        if batch_id:
+            batch = {
+                "batch_id": batch_id,
+                "total": str(len(jobs)),
+                "created_at": now,
+                **{status.value: "0" for status in JobStatus},
+                JobStatus.PENDING.value: str(len(jobs)),
+            }
+
+        try:
+            await self.backend.add_jobs(jobs, batch)
+        except LaneFullError as e:
+            reason, retry_after = self._refusal(e.lane, e.waiting, e.seconds, e.jobs, e.work) or ("full", 1)
+            metrics.inc("ezclip_jobs_rejected_total", labels={"lane": e.lane})
+            raise QueueFullError(e.lane, reason, retry_after) from None
+        return [job["job_id"] for job in jobs]
+
+    def _refusal(
+        self, lane: str, waiting: int, seconds: float, jobs: int = 1, work: float = 0.0
+    ) -> Optional[tuple[str, int]]:
+        """Why a lane cannot take ``jobs`` more jobs of ``work`` seconds, and when to retry.
+
+        None if it can; mirrors ``lane_admits``, which the backends apply.
+        """
+        if lane_admits(self.settings, lane, waiting, seconds, jobs, work):
+            return None
+        max_jobs = self.settings.lane_max_queued_jobs.get(lane, 0)
+        max_seconds = self.settings.lane_max_queued_seconds.get(lane, 0)
+        submitted = f" + {jobs} submitted" if jobs > 1 else ""
+
+        reason = None
+        excess_seconds = 0.0
+        if max_jobs and waiting + jobs > max_jobs:
+            reason = f"{waiting} jobs waiting{submitted}, limit {max_jobs}"
+            per_job = seconds / waiting if waiting else work / jobs
+            excess_seconds = (waiting + jobs - max_jobs) * per_job
+        if waiting and max_seconds and seconds + work > max_seconds:
+            reason = reason or f"{seconds:.0f}s of work waiting{submitted}, limit {max_seconds}s"
+            excess_seconds = max(excess_seconds, seconds + work - max_seconds)
+
+        workers = max(1, self.settings.worker_concurrency)
+        return reason, min(3600, max(1, math.ceil(excess_seconds / workers)))
+
+    async def get_pressure(self) -> dict[str, dict[str, Any]]:
+        """Load of each lane against its admission limits.
+
+        ``pressure`` is the fuller of the two limits as a fraction;
+        ``accepting`` tells whether one more job would be admitted.
+        ``retry_after`` roughly estimates how long the workers need to bring
+        the lane back under its limits.
+        """
+        await self.connect()
 
-        # Store job details
-        await self.redis.hset(f"job:{job_id}", mapping={
-            "job_id": job_id,
-            "job_type": job_type,
-            "status": JobStatus.PENDING.value,
-            "progress": "0",
-            "data": json.dumps(data),
-            "created_at": job["created_at"],
-            "updated_at": job["updated_at"],
-        })
+        depths = await self.backend.queue_depths()
+        work = await self.backend.queued_work()
+
+        lanes = {}
+        for lane, (waiting, in_progress) in depths.items():
+            # The estimate can drift from rounding or lost workers; an empty lane has no work
+            seconds = work.get(lane, 0.0) if waiting else 0.0
+            max_jobs = self.settings.lane_max_queued_jobs.get(lane, 0)
+            max_seconds = self.settings.lane_max_queued_seconds.get(lane, 0)
+
+            job_ratio = waiting / max_jobs if max_jobs else 0.0
+            work_ratio = seconds / max_seconds if max_seconds else 0.0
+            reason, retry_after = self._refusal(lane, waiting, seconds) or (None, None)
+
+            lanes[lane] = {
+                "waiting": waiting,
+                "in_progress": in_progress,
+                "estimated_seconds": round(seconds, 1),
+                "max_waiting": max_jobs or None,
+                "max_estimated_seconds": max_seconds or None,
+                "pressure": round(max(job_ratio, work_ratio), 3),
+                "accepting": reason is None,
+                "reason": reason,
+                "retry_after": retry_after,
+            }
+        return lanes
+
+    async def get_batch(self, batch_id: str) -> Optional[dict[str, Any]]:
+        """Get a batch's totals and per-status counters without touching its jobs."""
+        await self.connect()
 
-        # Add to queue
-        await self.redis.lpush("job_queue", json.dumps({"job_id": job_id, "job_type": job_type}))
+        batch_data = await self.backend.get_batch(batch_id)
+        if not batch_data:
+            return None
 
-        # Add to job list (for listing)
-        await self.redis.lpush("job_list", job_id)
-        await self.redis.ltrim("job_list", 0, 99)  # Keep last 100 jobs
+        return {
+            "batch_id": batch_data["batch_id"],
+            "total": int(batch_data["total"]),
+            "created_at": datetime.fromisoformat(batch_data["created_at"]),
+            **{status.value: int(batch_data.get(status.value, 0)) for status in JobStatus},
+        }
 
-        return job_id
+    async def get_batch_job_ids(self, batch_id: str, offset: int = 0, limit: int = -1) -> list[str]:
+        await self.connect()
+        return await self.backend.get_batch_job_ids(batch_id, offset, limit)
 
     async def get_job(self, job_id: str) -> Optional[JobDetailResponse]:
+        jobs = await self.get_jobs([job_id])
+        return jobs[0]
+
+    async def get_jobs(self, job_ids: list[str]) -> list[Optional[JobDetailResponse]]:
+        """Fetch several jobs in one round trip, keeping order (None for unknown IDs)."""
         await self.connect()
 
-        job_data = await self.redis.hgetall(f"job:{job_id}")
-        if not job_data:
-            return None
+        records, dequeued_seqs = await self.backend.get_jobs(job_ids)
+        return [
+            self._to_response(job_data, dequeued_seqs) if job_data else None
+            for job_data in records
+        ]
+
+    async def get_job_summaries(self, job_ids: list[str]) -> list[Optional[JobSummary]]:
+        """Like ``get_jobs`` but reads only the listing fields of each job."""
+        await self.connect()
+
+        records, dequeued_seqs = await self.backend.get_jobs(job_ids, SUMMARY_FIELDS)
+        return [
+            JobSummary(**self._summary_fields(job_data, dequeued_seqs)) if job_data else None
+            for job_data in records
+        ]
+
+    def _summary_fields(self, job_data: dict[str, str], dequeued_seqs: dict[str, int]) -> dict[str, Any]:
+        # Approximate position from the lane's enqueue sequence number and dequeue count
+        queue_position = None
+        if job_data["status"] == JobStatus.PENDING.value and "queue_seq" in job_data:
+            dequeued_seq = dequeued_seqs.get(job_data["lane"], 0)
+            queue_position = max(0, int(job_data["queue_seq"]) - dequeued_seq - 1)
+
+        return {
+            "job_id": job_data["job_id"],
+            "job_type": JobType(job_data["job_type"]),
+            "status": JobStatus(job_data["status"]),
+            "progress": int(job_data.get("progress", 0)),
+            "message": job_data.get("message"),
+            "output_file": job_data.get("output_file"),
+            "file_size": int(job_data["file_size"]) if job_data.get("file_size") else None,
+            "created_at": datetime.fromisoformat(job_data["created_at"]),
+            "updated_at": datetime.fromisoformat(job_data["updated_at"]),
+            "error": job_data.get("error"),
+            "lane": JobLane(job_data["lane"]) if job_data.get("lane") else None,
+            "queue_position": queue_position,
+            "batch_id": job_data.get("batch_id"),
+        }
+
+    def _to_response(self, job_data: dict[str, str], dequeued_seqs: dict[str, int]) -> JobDetailResponse:
+        elapsed = None
+        if job_data["status"] == JobStatus.PENDING.value:
+            elapsed = 0.0
+        elif job_data["status"] == JobStatus.PROCESSING.value and "started_at" in job_data:
+            elapsed = (datetime.utcnow() - datetime.fromisoformat(job_data["started_at"])).total_seconds()
 
         return JobDetailResponse(
-            job_id=job_data["job_id"],
-            job_type=JobType(job_data["job_type"]),
-            status=JobStatus(job_data["status"]),
-            progress=int(job_data.get("progress", 0)),
-            message=job_data.get("message"),
+            **self._summary_fields(job_data, dequeued_seqs),
             input_file=job_data.get("input_file"),
-            output_file=job_data.get("output_file"),
-            file_size=int(job_data["file_size"]) if job_data.get("file_size") else None,
-            created_at=datetime.fromisoformat(job_data["created_at"]),
-            updated_at=datetime.fromisoformat(job_data["updated_at"]),
-            error=job_data.get("error"),
             metadata=json.loads(job_data["data"]) if "data" in job_data else None,
+            timings=json.loads(job_data["timings"]) if "timings" in job_data else None,
+            estimate=job_estimator.to_response(job_data, elapsed),
         )
 
     async def update_job(
@@ -98,10 +333,21 @@ class JobQueue:
         output_file: Optional[str] = None,
         error: Optional[str] = None,
         file_size: Optional[int] = None,
-    ):
+        timings: Optional[dict[str, Any]] = None,
+        started_at: Optional[datetime] = None,
+    ) -> bool:
+        """Update a job and notify subscribers.
+
+        Progress-only updates are coalesced: unchanged values are dropped and
+        each job publishes at most ``progress_updates_per_second`` of them,
+        with the latest value flushed once the interval passes. Any update that
+        touches status, output or error is written immediately and supersedes
+        a pending progress flush. Returns False if the update was refused
+        because the job has already finished.
+        """
         await self.connect()
 
-        updates = {"updated_at": datetime.utcnow().isoformat()}
+        updates = {}
 
         if status is not None:
             updates["status"] = status.value
@@ -115,11 +361,75 @@ class JobQueue:
             updates["error"] = error
         if file_size is not None:
             updates["file_size"] = str(file_size)
+        if timings is not None:
+            updates["timings"] = json.dumps(timings)
+        if started_at is not None:
+            updates["started_at"] = started_at.isoformat()
+
+        if set(updates) <= {"progress", "message"}:
+            await self._report_progress(job_id, updates)
+            return True
+
+        self._drop_progress(job_id)
+        if status is not None and status not in TERMINAL_STATUSES:
+            # Keep tracking progress for jobs still running
+            self._progress[job_id] = ProgressState(
+                sent={k: v for k, v in updates.items() if k in ("progress", "message")},
+                sent_at=time.monotonic(),
+            )
 
-        await self.redis.hset(f"job:{job_id}", mapping=updates)
-
-        # Publish update for SSE
-        await self.redis.publish(f"job_updates:{job_id}", json.dumps({
+        return await self._write_update(job_id, updates)
+
+    def _drop_progress(self, job_id: str):
+        # A pending flush would otherwise write to the job after it finished
+        state = self._progress.pop(job_id, None)
+        if state and state.flush:
+            state.flush.cancel()
+
+    async def _report_progress(self, job_id: str, updates: dict[str, str]):
+        state = self._progress.setdefault(job_id, ProgressState())
+
+        # Drop values that match what subscribers already have
+        changed = {k: v for k, v in updates.items() if state.sent.get(k) != v}
+        if not changed:
+            for key in updates:
+                state.pending.pop(key, None)
+            return
+
+        interval = 1 / self.settings.progress_updates_per_second
+        elapsed = time.monotonic() - state.sent_at
+        if state.flush is None and elapsed >= interval:
+            state.sent.update(changed)
+            state.sent_at = time.monotonic()
+            await self._write_update(job_id, changed)
+            return
+
+        # Too soon; remember the latest value and publish it when the interval ends
+        state.pending.update(changed)
+        if state.flush is None:
+            state.flush = asyncio.create_task(self._flush_progress(job_id, state, interval - elapsed))
+
+    async def _flush_progress(self, job_id: str, state: "ProgressState", delay: float):
+        await asyncio.sleep(max(0.0, delay))
+
+        state.flush = None
+        pending = {k: v for k, v in state.pending.items() if state.sent.get(k) != v}
+        state.pending.clear()
+        if pending:
+            state.sent.update(pending)
+            state.sent_at = time.monotonic()
+            await self._write_update(job_id, pending)
+
+    async def _write_update(self, job_id: str, updates: dict[str, str]) -> bool:
+        """Store job fields and publish them to SSE subscribers in one round trip."""
+        with span("queue_update"):
+            return await self._store_update(job_id, updates)
+
+    async def _store_update(self, job_id: str, updates: dict[str, str]) -> bool:
+        updates = {**updates, "updated_at": datetime.utcnow().isoformat()}
+
+        # Update for SSE subscribers
+        message = json.dumps({
             "job_id": job_id,
             "status": updates.get("status"),
             "progress": int(updates["progress"]) if "progress" in updates else None,
@@ -127,118 +437,283 @@ class JobQueue:
             "output_file": updates.get("output_file"),
             "error": updates.get("error"),
             "file_size": int(updates["file_size"]) if "file_size" in updates else None,
-        }))
+            "updated_at": updates["updated_at"],
+        })
+
+        # Status changes also move the job between its batch's counters
+        # and start the retention countdown for final states
+        ttl = self._retention_ttl(updates["status"]) if "status" in updates else 0
+        return await self.backend.write_update(job_id, updates, message, ttl)
 
     async def cancel_job(self, job_id: str) -> bool:
         await self.connect()
 
-        job_data = await self.redis.hgetall(f"job:{job_id}")
-        if not job_data:
+        if await self.backend.get_job_field(job_id, "status") is None:
             return False
 
-        if job_data["status"] in [JobStatus.COMPLETED.value, JobStatus.FAILED.value]:
+        # Refused atomically if the job completed or failed in the meantime
+        if not await self.update_job(job_id, status=JobStatus.CANCELLED, message="Job cancelled by user"):
             return False
-
-        await self.update_job(job_id, status=JobStatus.CANCELLED, message="Job cancelled by user")
+        # Stop it on whichever worker is running it
+        await self.backend.publish_cancel(job_id)
         return True
 
-    async def list_jobs(self, page: int = 1, page_size: int = 20) -> tuple[list[JobDetailResponse], int]:
+    def _retention_ttl(self, status: str) -> int:
+        """Seconds a job is kept once it reaches the given status (0 = no expiry)."""
+        if status == JobStatus.COMPLETED.value:
+            return self.settings.completed_job_ttl_seconds
+        if status in (JobStatus.FAILED.value, JobStatus.CANCELLED.value):
+            return self.settings.failed_job_ttl_seconds
+        return 0
+
+    async def sweep_jobs(self) -> int:
+        """Drop expired jobs from the indexes and enforce ``max_retained_jobs``.
+
+        Only finished jobs are deleted to make room; pending and processing
+        jobs are always kept. Returns the number of entries removed.
+        """
+        await self.connect()
+        return await self.backend.sweep_jobs(self.settings.max_retained_jobs)
+
+    async def migrate_job_list(self) -> int:
+        """Move jobs from the legacy ``job_list`` into the listing indexes."""
+        await self.connect()
+        return await self.backend.migrate_job_list()
+
+    async def migrate_job_queue(self) -> int:
+        """Queue jobs still waiting in the legacy ``job_queue`` list on their lanes.
+
+        They keep their IDs and are queued in their original order for the
+        default client, without the admission limits (they were accepted
+        before the upgrade). Returns the number of jobs queued.
+        """
+        await self.connect()
+        records = await self.backend.legacy_queued_jobs()
+
+        chunk_size = 500
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            units = await asyncio.gather(*(
+                job_estimator.work_units(job["job_type"], json.loads(job["data"])) for job in chunk
+            ))
+            jobs = [
+                {
+                    **job,
+                    "lane": self._default_lane(job["job_type"]).value,
+                    "client": DEFAULT_CLIENT,
+                    **({"work_units": repr(round(job_units, 6))} if job_units is not None else {}),
+                }
+                for job, job_units in zip(chunk, units)
+            ]
+            await self.backend.add_jobs(jobs, admit=False)
+
+        await self.backend.drop_legacy_queue()
+        return len(records)
+
+    async def _sweep_loop(self):
+        while self._running:
+            try:
+                # One sweeper per interval across all worker processes
+                if await self.backend.try_lock("job_sweep_lock", self.settings.job_sweep_interval_seconds):
+                    removed = await self.sweep_jobs()
+                    if removed:
+                        print(f"Job sweeper removed {removed} jobs")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Job sweeper error: {e}")
+            await asyncio.sleep(self.settings.job_sweep_interval_seconds)
+
+    async def get_storage_stats(self) -> dict[str, Any]:
+        """Report retained job count and backend memory use for capacity planning."""
+        await self.connect()
+
+        stats = await self.backend.storage_stats()
+        return {
+            "backend": self.settings.queue_backend,
+            "job_count": stats.pop("job_count"),
+            "max_retained_jobs": self.settings.max_retained_jobs,
+            **stats,
+        }
+
+    async def get_queue_depths(self) -> dict[str, tuple[int, int]]:
+        """Jobs waiting and jobs being processed, per lane."""
         await self.connect()
+        return await self.backend.queue_depths()
 
-        job_ids = await self.redis.lrange("job_list", 0, -1)
-        total = len(job_ids)
+    async def list_jobs(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        status: Optional[JobStatus] = None,
+        job_type: Optional[JobType] = None,
+    ) -> tuple[list[JobSummary], int, Optional[str]]:
+        """List job summaries newest first from the creation-time indexes.
+
+        ``cursor`` is the ``next_cursor`` of the previous page. It names the
+        last job returned, so pages stay stable while new jobs arrive; if that
+        job has since left the index, listing resumes from its timestamp.
+        Raises ``ValueError`` for a cursor that is not "<score>:<job ID>".
+        """
+        await self.connect()
 
-        start = (page - 1) * page_size
-        end = start + page_size
-        page_job_ids = job_ids[start:end]
+        position = None
+        if cursor:
+            score, _, job_id = cursor.partition(":")
+            if not score.isdigit() or not job_id:
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+            position = (int(score), job_id)
+
+        entries, total = await self.backend.list_job_ids(
+            position,
+            page_size,
+            status.value if status else None,
+            job_type.value if job_type else None,
+        )
+        jobs = [job for job in await self.get_job_summaries([job_id for job_id, _ in entries]) if job]
 
-        jobs = []
-        for job_id in page_job_ids:
-            job = await self.get_job(job_id)
-            if job:
-                jobs.append(job)
+        next_cursor = None
+        if len(entries) == page_size:
+            last_id, last_score = entries[-1]
+            next_cursor = f"{last_score}:{last_id}"
 
-        return jobs, total
+        return jobs, total, next_cursor
+
+    @contextlib.asynccontextmanager
+    async def subscribe_updates(self) -> AsyncIterator[AsyncIterator[tuple[str, str]]]:
+        """Every job's (job ID, update JSON) as published by ``update_job``."""
+        await self.connect()
+        async with self.backend.subscribe_updates() as updates:
+            yield updates
+
+    def _get_type_slot(self, job_type: str) -> Optional[asyncio.Semaphore]:
+        """Get the semaphore capping concurrent jobs of a type, if one is configured."""
+        limit = self.settings.job_type_concurrency.get(job_type)
+        if not limit:
+            return None
+
+        if job_type not in self._type_slots:
+            self._type_slots[job_type] = asyncio.Semaphore(limit)
+        return self._type_slots[job_type]
+
+    def _get_slots(self, job_type: str) -> list[asyncio.Semaphore]:
+        """Semaphores a job must hold to run: its type's cap and the capped types' share."""
+        slot = self._get_type_slot(job_type)
+        if slot is None:
+            return []
+        if self._capped_slots is None:
+            self._capped_slots = asyncio.Semaphore(max(1, self.settings.worker_concurrency - 1))
+        return [slot, self._capped_slots]
+
+    def _parked_count(self) -> int:
+        return sum(len(queue) for queue in self._parked.values())
+
+    def _unpark(self) -> Optional[tuple[Delivery, asyncio.Task]]:
+        """The oldest parked job whose type has a free slot again, if any."""
+        for job_type, queue in self._parked.items():
+            if queue and not any(slot.locked() for slot in self._get_slots(job_type)):
+                return queue.popleft()
+        return None
+
+    def _check_type_caps(self):
+        """Warn about per type caps above what the capped types may share."""
+        share = max(1, self.settings.worker_concurrency - 1)
+        for job_type, limit in self.settings.job_type_concurrency.items():
+            if limit and limit > share:
+                print(
+                    f"job_type_concurrency for {job_type} ({limit}) is above the {share} consumers "
+                    f"capped job types share with worker_concurrency={self.settings.worker_concurrency}"
+                )
 
     async def start_worker(self):
+        await self.connect()
+        await self.backend.prepare_dispatch()
+        self._check_type_caps()
+
         self._running = True
-        self.worker_task = asyncio.create_task(self._worker_loop())
+        consumer_prefix = self.settings.worker_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.worker_tasks = [
+            asyncio.create_task(self._worker_loop(f"{consumer_prefix}-{index}"))
+            for index in range(max(1, self.settings.worker_concurrency))
+        ]
+        self.worker_tasks.append(asyncio.create_task(self._sweep_loop()))
+        self.worker_tasks.append(asyncio.create_task(self._cancel_listener()))
 
     async def stop_worker(self):
         self._running = False
-        if self.worker_task:
-            self.worker_task.cancel()
+        for task in self.worker_tasks:
+            task.cancel()
+        for task in self.worker_tasks:
             try:
-                await self.worker_task
+                await task
             except asyncio.CancelledError:
                 pass
+        self.worker_tasks = []
+        # Parked jobs are left unacknowledged for another worker to reclaim
+        for queue in self._parked.values():
+            for _, lease in queue:
+                lease.cancel()
+        self._parked.clear()
         await self.disconnect()
 
-    async def _worker_loop(self):
+    async def _cancel_listener(self):
+        """Cancel handler tasks of jobs that are cancelled while running here."""
+        while self._running:
+            try:
+                async with self.backend.subscribe_cancels() as cancelled:
+                    async for job_id in cancelled:
+                        task = self._active_jobs.get(job_id)
+                        if task:
+                            task.cancel()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Cancel listener error: {e}")
+                await asyncio.sleep(1)
+
+    async def _renew_lease(self, delivery: Delivery, consumer: str):
+        """Keep a long-running job from being reclaimed by another worker."""
+        while True:
+            await asyncio.sleep(self.settings.job_lease_seconds / 3)
+            try:
+                await self.backend.renew_delivery(delivery, consumer)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                # Keep renewing; a lapsed lease would hand the job to another worker
+                print(f"Lease renewal error for job {delivery.fields['job_id']}: {e}")
+
+    async def _worker_loop(self, consumer: str):
         await self.connect()
 
         while self._running:
             try:
-                # Block for job from queue
-                result = await self.redis.brpop("job_queue", timeout=1)
-                if result is None:
+                # Parked jobs were claimed first, so they go before new ones
+                parked = self._unpark()
+                if parked:
+                    await self._run_delivery(*parked)
                     continue
 
-                _, job_json = result
-                job_info = json.loads(job_json)
-                job_id = job_info["job_id"]
-                job_type = job_info["job_type"]
-
-                # Get job data
-                job_data = await self.redis.hgetall(f"job:{job_id}")
-                if not job_data:
+                if self._parked_count() >= max(1, self.settings.worker_concurrency):
+                    # Enough jobs are waiting for busy types; claim more once a slot frees up
+                    self._slot_freed.clear()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._slot_freed.wait(), 1)
                     continue
 
-                # Check if cancelled
-                if job_data["status"] == JobStatus.CANCELLED.value:
+                delivery = await self.backend.next_delivery(consumer)
+                if delivery is None:
                     continue
 
-                # Find handler
-                handler = self.handlers.get(job_type)
-                if not handler:
-                    await self.update_job(
-                        job_id,
-                        status=JobStatus.FAILED,
-                        error=f"No handler for job type: {job_type}"
-                    )
+                lease = asyncio.create_task(self._renew_lease(delivery, consumer))
+                job_type = delivery.fields["job_type"]
+                if any(slot.locked() for slot in self._get_slots(job_type)):
+                    # The type is at its cap here: park the job rather than
+                    # hold this consumer, which may claim a job of another type
+                    self._parked.setdefault(job_type, deque()).append((delivery, lease))
                     continue
 
-                # Update status to processing
-                await self.update_job(job_id, status=JobStatus.PROCESSING, progress=0)
-
-                # Execute handler
-                try:
-                    import os
-                    data = json.loads(job_data["data"])
-                    result = await handler(job_id, data)
-
-                    # Calculate output file size
-                    output_file = result.get("output_file")
-                    file_size = None
-                    if output_file:
-                        output_path = os.path.join(self.settings.processed_dir, output_file)
-                        if os.path.exists(output_path):
-                            file_size = os.path.getsize(output_path)
-
-                    await self.update_job(
-                        job_id,
-                        status=JobStatus.COMPLETED,
-                        progress=100,
-                        output_file=output_file,
-                        file_size=file_size,
-                        message="Processing completed"
-                    )
-                except Exception as e:
-                    await self.update_job(
-                        job_id,
-                        status=JobStatus.FAILED,
-                        error=str(e)
-                    )
+                await self._run_delivery(delivery, lease)
 
             except asyncio.CancelledError:
                 break
@@ -246,6 +721,209 @@ class JobQueue:
                 print(f"Worker error: {e}")
                 await asyncio.sleep(1)
 
+    async def _run_delivery(self, delivery: Delivery, lease: asyncio.Task):
+        job_info = delivery.fields
+        try:
+            async with contextlib.AsyncExitStack() as slots:
+                for slot in self._get_slots(job_info["job_type"]):
+                    await slots.enter_async_context(slot)
+                await self._process_job(job_info["job_id"], job_info["job_type"])
+        finally:
+            lease.cancel()
+            self._slot_freed.set()
+
+        # Only acknowledge finished jobs; interrupted ones are reclaimed after the lease expires
+        await self.backend.ack(delivery)
+
+    async def _process_job(self, job_id: str, job_type: str):
+        # Get job data
+        records, _ = await self.backend.get_jobs([job_id])
+        job_data = records[0]
+        if not job_data:
+            return
+
+        # Skip cancelled jobs, and finished ones redelivered after a worker died before acking
+        if job_data["status"] in [JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value]:
+            return
+
+        # Give up on jobs that keep taking their worker down
+        attempts = await self.backend.increment_job_field(job_id, "attempts")
+        if attempts > self.settings.job_max_attempts:
+            await self.update_job(
+                job_id,
+                status=JobStatus.FAILED,
+                error=f"Job abandoned after {attempts - 1} attempts (worker stopped responding)"
+            )
+            return
+
+        # Find handler
+        handler = self.handlers.get(job_type)
+        if not handler:
+            await self.update_job(
+                job_id,
+                status=JobStatus.FAILED,
+                error=f"No handler for job type: {job_type}"
+            )
+            return
+
+        # Update status to processing (refused if it was cancelled meanwhile)
+        if not await self.update_job(
+            job_id, status=JobStatus.PROCESSING, progress=0, started_at=datetime.utcnow()
+        ):
+            self._drop_progress(job_id)
+            return
+
+        lane = job_data.get("lane", JobLane.NORMAL.value)
+        waited = (datetime.utcnow() - datetime.fromisoformat(job_data["created_at"])).total_seconds()
+        metrics.observe("ezclip_job_wait_seconds", waited, {"lane": lane, "job_type": job_type})
+
+        data = json.loads(job_data["data"])
+
+        # The trace starts here, so probing the input for its time limit is included
+        trace = JobTrace()
+        trace_token = job_trace.set(trace)
+        try:
+            timeout = await self.timeout_policy(job_type, data) if self.timeout_policy else None
+        except Exception as e:
+            job_trace.reset(trace_token)
+            await self.update_job(job_id, status=JobStatus.FAILED, error=str(e))
+            return
+
+        # Execute handler in its own task so a cancel request or timeout can interrupt it
+        outputs: list[str] = []
+        outputs_token = _job_outputs.set(outputs)
+        job_type_token = current_job_type.set(job_type)
+        handler_task = asyncio.create_task(handler(job_id, data))
+        _job_outputs.reset(outputs_token)
+        current_job_type.reset(job_type_token)
+        job_trace.reset(trace_token)
+        self._active_jobs[job_id] = handler_task
+        started = time.monotonic()
+        outcome: Optional[JobStatus] = JobStatus.FAILED
+        timings: Optional[dict[str, Any]] = None
+
+        try:
+            # A cancel published before the task was registered is caught here
+            if await self.backend.get_job_field(job_id, "status") == JobStatus.CANCELLED.value:
+                handler_task.cancel()
+
+            try:
+                result = await asyncio.wait_for(handler_task, timeout)
+            except asyncio.CancelledError:
+                if not handler_task.cancelled() or asyncio.current_task().cancelling():
+                    outcome = None
+                    raise  # The worker itself is stopping
+                self._remove_outputs(outputs)
+                outcome = JobStatus.CANCELLED
+                return
+            except asyncio.TimeoutError:
+                # wait_for has already cancelled the handler and stopped its subprocesses
+                self._remove_outputs(outputs)
+                timings = trace.to_dict()
+                await self.update_job(
+                    job_id,
+                    status=JobStatus.FAILED,
+                    error=f"Job exceeded its time limit of {timeout:.0f} seconds",
+                    timings=timings,
+                )
+                return
+
+            # Calculate output file size
+            output_file = result.get("output_file")
+            file_size = None
+            if output_file:
+                output_path = os.path.join(self.settings.processed_dir, output_file)
+                if os.path.exists(output_path):
+                    file_size = os.path.getsize(output_path)
+
+            timings = trace.to_dict()
+            completed = await self.update_job(
+                job_id,
+                status=JobStatus.COMPLETED,
+                progress=100,
+                output_file=output_file,
+                file_size=file_size,
+                message="Processing completed",
+                timings=timings,
+            )
+            if completed:
+                outcome = JobStatus.COMPLETED
+                await self._learn_estimate(job_type, job_data, time.monotonic() - started, file_size, timings)
+            else:
+                # Cancelled just as it finished
+                self._remove_outputs(outputs)
+                outcome = JobStatus.CANCELLED
+        except Exception as e:
+            self._remove_outputs(outputs)
+            timings = trace.to_dict()
+            await self.update_job(
+                job_id,
+                status=JobStatus.FAILED,
+                error=str(e),
+                timings=timings,
+            )
+        finally:
+            self._active_jobs.pop(job_id, None)
+            # Cancelled jobs return without a final update, which would have done this
+            self._drop_progress(job_id)
+            if outcome:
+                metrics.observe(
+                    "ezclip_job_duration_seconds",
+                    time.monotonic() - started,
+                    {"job_type": job_type, "status": outcome.value},
+                )
+                if self.settings.job_trace_file:
+                    await self._export_trace(job_id, job_type, outcome, trace, timings)
+
+    async def _learn_estimate(
+        self,
+        job_type: str,
+        job_data: dict[str, str],
+        seconds: float,
+        file_size: Optional[int],
+        timings: dict[str, Any],
+    ):
+        """Teach the estimator from a completed job, unless its result came from the cache."""
+        if "cache_hit" in timings["stages"]:
+            return
+        sample = job_estimator.sample(job_data, seconds, file_size)
+        if sample is None:
+            return
+        try:
+            await self.backend.learn_job_rate(job_type, *sample, self.settings.job_estimate_smoothing)
+        except Exception as e:
+            print(f"Failed to update job estimates: {e}")
+
+    async def _export_trace(
+        self,
+        job_id: str,
+        job_type: str,
+        outcome: JobStatus,
+        trace: JobTrace,
+        timings: Optional[dict[str, Any]],
+    ):
+        """Append the job's spans to ``job_trace_file`` as one JSON line."""
+        record = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": outcome.value,
+            "started_at": datetime.fromtimestamp(trace.started_at, timezone.utc).isoformat(),
+            **(timings or trace.to_dict()),
+        }
+        try:
+            await executor_service.run(PoolType.THREAD, append_trace, self.settings.job_trace_file, record)
+        except OSError as e:
+            print(f"Failed to write job trace: {e}")
+
+    def _remove_outputs(self, paths: list[str]):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Failed to remove partial output {path}: {e}")
+
 
 # Global job queue instance
 job_queue = JobQueue()
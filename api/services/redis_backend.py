@@ -0,0 +1,844 @@
+"""Queue backend on Redis: hashes, sorted-set indexes and Streams consumer groups."""
+
+import contextlib
+import json
+import time
+from typing import Any, AsyncIterator, Optional
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from models.job import JobStatus, JobType, JobLane
+from services.queue_backend import QueueBackend, Delivery, LaneFullError, index_score, lane_poll_order, work_ms
+
+
+# Redis Streams consumer group shared by every worker process
+CONSUMER_GROUP = "workers"
+
+# Pub/sub channel telling workers to stop a running job (message = job ID)
+CANCEL_CHANNEL = "job_cancel"
+
+# Sorted sets of job IDs scored by creation time (ms) used for listing: every
+# job, plus one per status ("job_index:status:<status>") and per job type
+# ("job_index:type:<job_type>")
+JOB_INDEX = "job_index"
+
+FINISHED_STATUSES = (JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value)
+
+# Applies a status-changing update, moves the job between its batch's
+# counters and status indexes, sets the retention TTL for final states, and
+# publishes the update, all atomically. Finished (completed, failed or
+# cancelled) jobs keep their state: later status updates are refused and the
+# script returns 0, so a cancel cannot overturn a job that just completed.
+# KEYS[1] = job hash, ARGV[1] = channel, ARGV[2] = message,
+# ARGV[3] = TTL in seconds (0 keeps the job), ARGV[4..] = field/value pairs
+STATUS_UPDATE_SCRIPT = """
+local ttl = tonumber(ARGV[3])
+local old = redis.call('HGET', KEYS[1], 'status')
+if old == 'completed' or old == 'failed' or old == 'cancelled' then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+local new = redis.call('HGET', KEYS[1], 'status')
+local batch_id = redis.call('HGET', KEYS[1], 'batch_id')
+if old ~= new and batch_id then
+    local batch_key = 'batch:' .. batch_id
+    if old then
+        redis.call('HINCRBY', batch_key, old, -1)
+    end
+    redis.call('HINCRBY', batch_key, new, 1)
+end
+if old ~= new then
+    local job_id = redis.call('HGET', KEYS[1], 'job_id')
+    local score = job_id and redis.call('ZSCORE', 'job_index', job_id)
+    if score then
+        if old then
+            redis.call('ZREM', 'job_index:status:' .. old, job_id)
+        end
+        redis.call('ZADD', 'job_index:status:' .. new, score, job_id)
+    end
+end
+if ttl > 0 then
+    redis.call('EXPIRE', KEYS[1], ttl)
+    if batch_id then
+        -- A batch lives as long as its longest-retained job
+        local batch_key = 'batch:' .. batch_id
+        if redis.call('TTL', batch_key) < ttl then
+            redis.call('EXPIRE', batch_key, ttl)
+            redis.call('EXPIRE', batch_key .. ':jobs', ttl)
+        end
+    end
+end
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return 1
+"""
+
+# Applies a progress-only update unless the job has finished or is gone, so a
+# late progress write never recreates an expired job or changes a final one.
+# KEYS[1] = job hash, ARGV[1] = channel, ARGV[2] = message, ARGV[3..] = field/value pairs
+PROGRESS_UPDATE_SCRIPT = """
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status or status == 'completed' or status == 'failed' or status == 'cancelled' then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return 1
+"""
+
+# Estimates, admits, stores, lists and queues new jobs in one step, so
+# concurrent submissions cannot both squeeze under a lane's limits. Each job
+# is estimated from its work units and its type's learned rates
+# (JOB_RATES) as in ``job_estimate``. Each lane's check then counts the jobs
+# already waiting ("lane_pending:<lane>") and their queued work
+# ("lane_work_ms:<lane>", whole ms so scripts can use INCRBY; some Redis 6.2
+# builds crash on INCRBYFLOAT in scripts) plus the incoming ones, as in
+# ``lane_admits``. Returns {lane, waiting, work ms, incoming jobs, incoming
+# work ms} of the first lane that refuses the jobs, with nothing stored, or
+# an empty table once they are queued.
+# KEYS[1] = JOB_RATES, ARGV[1] = enqueue time (ms), ARGV[2] = READY_TOKENS,
+# ARGV[3] = job_estimate_min_samples, ARGV[4] = lane count,
+# then per lane: lane, max jobs, max work ms (0 = unlimited);
+# then the batch ID ('' = none), its field count and field/value pairs;
+# then per job: job ID, listing score, lane, client, job type, status, work
+# units ('' = unknown), configured seconds, field count and field/value pairs
+ENQUEUE_SCRIPT = """
+local now = ARGV[1]
+local min_samples = tonumber(ARGV[3])
+local i = 5
+local lanes = {}
+for n = 1, tonumber(ARGV[4]) do
+    lanes[n] = {ARGV[i], tonumber(ARGV[i + 1]), tonumber(ARGV[i + 2])}
+    i = i + 3
+end
+local batch_at = i
+i = i + 2 + tonumber(ARGV[i + 1]) * 2
+local jobs_at = i
+
+local rates = {}
+local estimates = {}
+local lane_jobs = {}
+local lane_work = {}
+while i <= #ARGV do
+    local lane, job_type, units = ARGV[i + 2], ARGV[i + 4], tonumber(ARGV[i + 6])
+    local rate = rates[job_type]
+    if not rate then
+        rate = redis.call('HMGET', KEYS[1], job_type .. ':seconds', job_type .. ':bytes', job_type .. ':samples')
+        rates[job_type] = rate
+    end
+    local seconds, estimate
+    if units and rate[1] and (tonumber(rate[3]) or 0) >= min_samples then
+        seconds = units * tonumber(rate[1])
+        estimate = {'estimate_learned', '1', 'estimated_seconds', string.format('%.3f', seconds)}
+        if rate[2] then
+            table.insert(estimate, 'estimated_output_size')
+            table.insert(estimate, string.format('%d', math.floor(units * tonumber(rate[2]))))
+        end
+    else
+        seconds = tonumber(ARGV[i + 7])
+        estimate = {'estimate_learned', '0', 'estimated_seconds', ARGV[i + 7]}
+    end
+    table.insert(estimates, estimate)
+    lane_jobs[lane] = (lane_jobs[lane] or 0) + 1
+    lane_work[lane] = (lane_work[lane] or 0) + math.floor(seconds * 1000 + 0.5)
+    i = i + 9 + tonumber(ARGV[i + 8]) * 2
+end
+
+for _, limits in ipairs(lanes) do
+    local lane, max_jobs, max_work = limits[1], limits[2], limits[3]
+    local jobs, work = lane_jobs[lane], lane_work[lane]
+    local waiting = redis.call('ZCARD', 'lane_pending:' .. lane)
+    local queued = 0
+    if waiting > 0 then
+        queued = math.max(0, tonumber(redis.call('GET', 'lane_work_ms:' .. lane) or '0'))
+    end
+    if (max_jobs > 0 and waiting + jobs > max_jobs)
+        or (waiting > 0 and max_work > 0 and queued + work > max_work) then
+        return {lane, waiting, queued, jobs, work}
+    end
+end
+
+local next_seq = {}
+for _, limits in ipairs(lanes) do
+    local lane = limits[1]
+    next_seq[lane] = redis.call('INCRBY', 'lane_seq:' .. lane, lane_jobs[lane]) - lane_jobs[lane] + 1
+    redis.call('INCRBY', 'lane_work_ms:' .. lane, lane_work[lane])
+end
+
+local batch_id = ARGV[batch_at]
+local batch_fields = tonumber(ARGV[batch_at + 1])
+if batch_fields > 0 then
+    redis.call('HSET', 'batch:' .. batch_id, unpack(ARGV, batch_at + 2, batch_at + 1 + batch_fields * 2))
+end
+
+i = jobs_at
+local count = 0
+while i <= #ARGV do
+    local job_id, score, lane, client = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3]
+    local job_type, status, fields = ARGV[i + 4], ARGV[i + 5], tonumber(ARGV[i + 8])
+    local key = 'job:' .. job_id
+    count = count + 1
+    redis.call('HSET', key, unpack(ARGV, i + 9, i + 8 + fields * 2))
+    redis.call('HSET', key, 'queue_seq', next_seq[lane], unpack(estimates[count]))
+    next_seq[lane] = next_seq[lane] + 1
+
+    -- Queue with the client's other jobs; it enters the lane's stream
+    -- when a consumer picks the client
+    redis.call('RPUSH', 'fair_queue:' .. lane .. ':' .. client, job_id)
+    redis.call('ZADD', 'fair_clients:' .. lane, 'NX', 0, client)
+    redis.call('ZADD', 'lane_pending:' .. lane, now, job_id)
+
+    -- Index for listing, newest first
+    redis.call('ZADD', 'job_index', score, job_id)
+    redis.call('ZADD', 'job_index:status:' .. status, score, job_id)
+    redis.call('ZADD', 'job_index:type:' .. job_type, score, job_id)
+
+    if batch_id ~= '' then
+        redis.call('RPUSH', 'batch:' .. batch_id .. ':jobs', job_id)
+    end
+    i = i + 9 + fields * 2
+end
+
+for n = 1, math.min(count, tonumber(ARGV[2])) do
+    redis.call('LPUSH', 'job_ready', '1')
+end
+redis.call('LTRIM', 'job_ready', 0, tonumber(ARGV[2]) - 1)
+return {}
+"""
+
+# Per lane: the queue of each client waiting for a worker
+# ("fair_queue:<lane>:<client>", a list of job IDs), the
+# clients with jobs waiting scored by their virtual time ("fair_clients:<lane>"),
+# the lane's virtual time ("fair_vtime:<lane>"), and every waiting job scored
+# by its enqueue time in ms ("lane_pending:<lane>")
+FAIR_QUEUE = "fair_queue"
+
+# Jobs each client has delivered but not acknowledged, across lanes
+CLIENT_ACTIVE = "client_active"
+
+# Tokens pushed when work may be available; idle consumers block on it
+JOB_READY = "job_ready"
+READY_TOKENS = 64
+
+# Moves the next job of a lane from its client's queue into the lane's
+# stream, where a consumer claims it: the client with the lowest virtual
+# time that is under the active-job cap goes first. The job is counted as
+# dequeued and against its client, and its estimate leaves the lane's queued
+# work, which restarts from zero whenever the lane empties so rounding and
+# expired jobs cannot make it drift. Returns false if no client has a job
+# to release.
+# KEYS[1] = stream, KEYS[2] = fair_clients, KEYS[3] = fair_vtime,
+# KEYS[4] = lane_pending, KEYS[5] = lane_dequeued,
+# KEYS[6] = CLIENT_ACTIVE, KEYS[7] = lane_work_ms,
+# ARGV[1] = active-job cap (0 = none), ARGV[2] = client queue key prefix,
+# ARGV[3..] = client/weight pairs
+RELEASE_JOB_SCRIPT = """
+local cap = tonumber(ARGV[1])
+local weights = {}
+for i = 3, #ARGV, 2 do
+    weights[ARGV[i]] = tonumber(ARGV[i + 1])
+end
+local vtime = tonumber(redis.call('GET', KEYS[3]) or '0')
+local clients = redis.call('ZRANGE', KEYS[2], 0, -1, 'WITHSCORES')
+for i = 1, #clients, 2 do
+    local client = clients[i]
+    local queue = ARGV[2] .. client
+    if cap <= 0 or tonumber(redis.call('HGET', KEYS[6], client) or '0') < cap then
+        local job_id = redis.call('LPOP', queue)
+        if job_id then
+            local job = redis.call('HMGET', 'job:' .. job_id, 'job_type', 'lane', 'queue_seq', 'estimated_seconds')
+            local cost = tonumber(job[4]) or 0
+            -- A client that was idle starts at the lane's virtual time
+            local start = math.max(tonumber(clients[i + 1]), vtime)
+            redis.call('SET', KEYS[3], tostring(start))
+            if redis.call('LLEN', queue) > 0 then
+                redis.call('ZADD', KEYS[2], start + math.max(cost, 0.001) / (weights[client] or 1), client)
+            else
+                redis.call('ZREM', KEYS[2], client)
+            end
+            redis.call('ZREM', KEYS[4], job_id)
+            redis.call('INCR', KEYS[5])
+            if redis.call('ZCARD', KEYS[4]) == 0 then
+                redis.call('SET', KEYS[7], 0)
+            elseif job[4] then
+                redis.call('INCRBY', KEYS[7], -math.floor(cost * 1000 + 0.5))
+            end
+
+            -- Jobs cancelled while waiting can expire before their turn
+            if job[1] then
+                redis.call(
+                    'XADD', KEYS[1], '*',
+                    'job_id', job_id,
+                    'job_type', job[1],
+                    'lane', job[2],
+                    'queue_seq', job[3],
+                    'estimated_seconds', job[4],
+                    'client', client
+                )
+                redis.call('HINCRBY', KEYS[6], client, 1)
+                return 1
+            end
+        else
+            redis.call('ZREM', KEYS[2], client)
+        end
+    end
+end
+return false
+"""
+
+# Frees an acknowledged job's slot with its client and wakes a consumer,
+# which may have skipped the client while it was at its cap.
+# KEYS[1] = CLIENT_ACTIVE, KEYS[2] = JOB_READY, ARGV[1] = client,
+# ARGV[2] = READY_TOKENS
+RELEASE_CLIENT_SCRIPT = """
+if redis.call('HINCRBY', KEYS[1], ARGV[1], -1) <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+redis.call('LPUSH', KEYS[2], '1')
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[2]) - 1)
+return 1
+"""
+
+# Learned cost per work unit of each job type, as "<job_type>:seconds",
+# "<job_type>:bytes" and "<job_type>:samples" fields
+JOB_RATES = "job_rates"
+
+# Blends one finished job into its type's rates (exponentially weighted).
+# KEYS[1] = JOB_RATES, ARGV[1] = job type, ARGV[2] = smoothing,
+# ARGV[3] = seconds per unit, ARGV[4] = bytes per unit ('' = no output)
+LEARN_RATE_SCRIPT = """
+local smoothing = tonumber(ARGV[2])
+local function blend(field, value)
+    local key = ARGV[1] .. ':' .. field
+    local old = tonumber(redis.call('HGET', KEYS[1], key))
+    if old then
+        value = old + smoothing * (value - old)
+    end
+    redis.call('HSET', KEYS[1], key, tostring(value))
+end
+blend('seconds', tonumber(ARGV[3]))
+if ARGV[4] ~= '' then
+    blend('bytes', tonumber(ARGV[4]))
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1] .. ':samples', 1)
+return 1
+"""
+
+
+class RedisQueueBackend(QueueBackend):
+    """Shared by every API and worker process connected to the same Redis."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.redis: Optional[redis.Redis] = None
+        self._status_script = None
+        self._progress_script = None
+        self._enqueue_script = None
+        self._learn_script = None
+        self._release_job_script = None
+        self._release_client_script = None
+        self._next_reclaim_at = 0.0
+
+    async def connect(self):
+        if self.redis is None:
+            self.redis = redis.Redis(
+                host=self.settings.redis_host,
+                port=self.settings.redis_port,
+                decode_responses=True,
+            )
+
+    async def close(self):
+        if self.redis:
+            await self.redis.aclose()
+            self.redis = None
+
+    def _stream_key(self, lane: str) -> str:
+        return f"job_stream:{lane}"
+
+    def _fair_queue(self, lane: str, client: str) -> str:
+        return f"{FAIR_QUEUE}:{lane}:{client}"
+
+    def _status_index(self, status: str) -> str:
+        return f"{JOB_INDEX}:status:{status}"
+
+    def _type_index(self, job_type: str) -> str:
+        return f"{JOB_INDEX}:type:{job_type}"
+
+    async def add_jobs(
+        self, jobs: list[dict[str, str]], batch: Optional[dict[str, str]] = None, admit: bool = True
+    ):
+        """Estimate, admit and store every job in one script call (see ``ENQUEUE_SCRIPT``)."""
+        lanes = list(dict.fromkeys(job["lane"] for job in jobs))
+        args: list[Any] = [
+            int(time.time() * 1000),
+            READY_TOKENS,
+            self.settings.job_estimate_min_samples,
+            len(lanes),
+        ]
+        for lane in lanes:
+            # Limits of 0 admit everything
+            args += [
+                lane,
+                self.settings.lane_max_queued_jobs.get(lane, 0) if admit else 0,
+                int(self.settings.lane_max_queued_seconds.get(lane, 0) * 1000) if admit else 0,
+            ]
+
+        batch_fields = [value for pair in (batch or {}).items() for value in pair]
+        args += [batch["batch_id"] if batch else "", len(batch_fields) // 2, *batch_fields]
+
+        for job in jobs:
+            fields = [value for pair in job.items() for value in pair]
+            args += [
+                job["job_id"],
+                index_score(job["created_at"]),
+                job["lane"],
+                job["client"],
+                job["job_type"],
+                job["status"],
+                job.get("work_units", ""),
+                str(self.settings.job_cost_seconds.get(job["job_type"], 10)),
+                len(fields) // 2,
+                *fields,
+            ]
+
+        if self._enqueue_script is None:
+            self._enqueue_script = self.redis.register_script(ENQUEUE_SCRIPT)
+        refused = await self._enqueue_script(keys=[JOB_RATES], args=args, client=self.redis)
+        if refused:
+            lane, waiting, queued_ms, count, incoming_ms = refused
+            raise LaneFullError(lane, int(waiting), int(queued_ms) / 1000, int(count), int(incoming_ms) / 1000)
+
+    async def get_jobs(
+        self, job_ids: list[str], fields: Optional[tuple[str, ...]] = None
+    ) -> tuple[list[Optional[dict[str, str]]], dict[str, int]]:
+        lanes = [lane.value for lane in JobLane]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                if fields:
+                    pipe.hmget(f"job:{job_id}", fields)
+                else:
+                    pipe.hgetall(f"job:{job_id}")
+            for lane in lanes:
+                pipe.get(f"lane_dequeued:{lane}")
+            results = await pipe.execute()
+
+        dequeued_seqs = {lane: int(seq or 0) for lane, seq in zip(lanes, results[len(job_ids):])}
+
+        jobs = []
+        for values in results[:len(job_ids)]:
+            if fields:
+                values = {k: v for k, v in zip(fields, values) if v is not None}
+            jobs.append(values if values.get("job_id") else None)
+        return jobs, dequeued_seqs
+
+    async def get_job_field(self, job_id: str, field: str) -> Optional[str]:
+        return await self.redis.hget(f"job:{job_id}", field)
+
+    async def increment_job_field(self, job_id: str, field: str, amount: int = 1) -> int:
+        return await self.redis.hincrby(f"job:{job_id}", field, amount)
+
+    async def write_update(self, job_id: str, updates: dict[str, str], event: str, ttl: int) -> bool:
+        channel = f"job_updates:{job_id}"
+
+        if "status" in updates:
+            args = [channel, event, ttl]
+            for key, value in updates.items():
+                args.extend([key, value])
+            if self._status_script is None:
+                self._status_script = self.redis.register_script(STATUS_UPDATE_SCRIPT)
+            return bool(await self._status_script(keys=[f"job:{job_id}"], args=args, client=self.redis))
+
+        args = [channel, event]
+        for key, value in updates.items():
+            args.extend([key, value])
+        if self._progress_script is None:
+            self._progress_script = self.redis.register_script(PROGRESS_UPDATE_SCRIPT)
+        return bool(await self._progress_script(keys=[f"job:{job_id}"], args=args, client=self.redis))
+
+    async def get_batch(self, batch_id: str) -> Optional[dict[str, str]]:
+        return await self.redis.hgetall(f"batch:{batch_id}") or None
+
+    async def get_batch_job_ids(self, batch_id: str, offset: int = 0, limit: int = -1) -> list[str]:
+        end = -1 if limit < 0 else offset + limit - 1
+        return await self.redis.lrange(f"batch:{batch_id}:jobs", offset, end)
+
+    async def list_job_ids(
+        self,
+        cursor: Optional[tuple[int, str]],
+        page_size: int,
+        status: Optional[str] = None,
+        job_type: Optional[str] = None,
+    ) -> tuple[list[tuple[str, int]], int]:
+        key = await self._listing_index(status, job_type)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(key)
+            if cursor:
+                pipe.zrevrank(key, cursor[1])
+            results = await pipe.execute()
+        total = results[0]
+
+        if not cursor:
+            entries = await self.redis.zrevrange(key, 0, page_size - 1, withscores=True)
+        elif results[1] is not None:
+            rank = results[1]
+            entries = await self.redis.zrevrange(key, rank + 1, rank + page_size, withscores=True)
+        else:
+            # Jobs enqueued together share a score and sort by ID in reverse,
+            # so skip the ties that came before the cursor job
+            cursor_score, cursor_id = cursor
+            ties = await self.redis.zcount(key, cursor_score, cursor_score)
+            entries = await self.redis.zrevrangebyscore(
+                key, cursor_score, "-inf", start=0, num=page_size + ties, withscores=True
+            )
+            entries = [
+                (job_id, score) for job_id, score in entries
+                if not (int(score) == cursor_score and job_id >= cursor_id)
+            ][:page_size]
+
+        return [(job_id, int(score)) for job_id, score in entries], total
+
+    async def _listing_index(self, status: Optional[str], job_type: Optional[str]) -> str:
+        if status and job_type:
+            # Combined filters page through a briefly cached intersection
+            key = f"{JOB_INDEX}:filter:{status}:{job_type}"
+            if not await self.redis.exists(key):
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.zinterstore(key, [self._status_index(status), self._type_index(job_type)], aggregate="MAX")
+                    pipe.expire(key, 10)
+                    await pipe.execute()
+            return key
+        if status:
+            return self._status_index(status)
+        if job_type:
+            return self._type_index(job_type)
+        return JOB_INDEX
+
+    async def sweep_jobs(self, max_retained: int) -> int:
+        removed = 0
+        kept = 0
+        chunk_size = 500
+        start = 0
+
+        while True:
+            # Newest first: everything past the cap that has finished goes
+            job_ids = await self.redis.zrevrange(JOB_INDEX, start, start + chunk_size - 1)
+            if not job_ids:
+                break
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id in job_ids:
+                    pipe.hmget(f"job:{job_id}", ["status", "job_type"])
+                fields = await pipe.execute()
+
+            chunk_removed = 0
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id, (status, job_type) in zip(job_ids, fields):
+                    if status is None:
+                        # Expired; its status and type are gone with the hash
+                        self._unindex(pipe, job_id)
+                    elif kept >= max_retained and status in FINISHED_STATUSES:
+                        pipe.delete(f"job:{job_id}")
+                        self._unindex(pipe, job_id, status, job_type)
+                    else:
+                        kept += 1
+                        continue
+                    chunk_removed += 1
+                await pipe.execute()
+
+            removed += chunk_removed
+            # Removed entries shift the rest of the index up
+            start += len(job_ids) - chunk_removed
+
+        return removed
+
+    def _unindex(self, pipe, job_id: str, status: Optional[str] = None, job_type: Optional[str] = None):
+        pipe.zrem(JOB_INDEX, job_id)
+        for value in [status] if status else [s.value for s in JobStatus]:
+            pipe.zrem(self._status_index(value), job_id)
+        for value in [job_type] if job_type else [t.value for t in JobType]:
+            pipe.zrem(self._type_index(value), job_id)
+
+    async def try_lock(self, name: str, seconds: int) -> bool:
+        return bool(await self.redis.set(name, "1", nx=True, ex=seconds))
+
+    async def migrate_job_list(self) -> int:
+        """Move jobs from the legacy ``job_list`` into the listing indexes.
+
+        Safe to call on every startup: the list is renamed first, so only one
+        process migrates it and later calls find nothing to do.
+        """
+        try:
+            await self.redis.rename("job_list", "job_list:migrating")
+        except ResponseError:
+            return 0  # Nothing to migrate
+
+        migrated = 0
+        chunk_size = 500
+        total = await self.redis.llen("job_list:migrating")
+
+        for start in range(0, total, chunk_size):
+            job_ids = await self.redis.lrange("job_list:migrating", start, start + chunk_size - 1)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id in job_ids:
+                    pipe.hmget(f"job:{job_id}", ["created_at", "status", "job_type"])
+                fields = await pipe.execute()
+
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for job_id, (created_at, status, job_type) in zip(job_ids, fields):
+                    if created_at is None:
+                        continue
+                    score = index_score(created_at)
+                    pipe.zadd(JOB_INDEX, {job_id: score})
+                    pipe.zadd(self._status_index(status), {job_id: score})
+                    pipe.zadd(self._type_index(job_type), {job_id: score})
+                    migrated += 1
+                await pipe.execute()
+
+        await self.redis.delete("job_list:migrating")
+        return migrated
+
+    async def legacy_queued_jobs(self) -> list[dict[str, str]]:
+        """Pending jobs left in the legacy ``job_queue`` list, oldest first.
+
+        The list is renamed first, so only one process takes its jobs; it is
+        deleted by ``drop_legacy_queue`` once they are queued again.
+        """
+        try:
+            await self.redis.rename("job_queue", "job_queue:migrating")
+        except ResponseError:
+            return []  # Nothing to migrate
+
+        # Jobs were pushed on the left, so the oldest is last
+        entries = await self.redis.lrange("job_queue:migrating", 0, -1)
+        job_ids = []
+        for entry in reversed(entries):
+            try:
+                job_ids.append(json.loads(entry)["job_id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall(f"job:{job_id}")
+            records = await pipe.execute()
+        return [job for job in records if job.get("status") == JobStatus.PENDING.value]
+
+    async def drop_legacy_queue(self):
+        await self.redis.delete("job_queue:migrating")
+
+    async def storage_stats(self) -> dict[str, Any]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(JOB_INDEX)
+            for lane in JobLane:
+                pipe.zcard(f"lane_pending:{lane.value}")
+            pipe.info("memory")
+            pipe.dbsize()
+            results = await pipe.execute()
+
+        memory, key_count = results[-2], results[-1]
+        return {
+            "job_count": results[0],
+            "queued": dict(zip([lane.value for lane in JobLane], results[1:1 + len(JobLane)])),
+            "redis_keys": key_count,
+            "redis_used_memory": memory.get("used_memory"),
+            "redis_used_memory_peak": memory.get("used_memory_peak"),
+            "redis_maxmemory": memory.get("maxmemory"),
+            "redis_maxmemory_policy": memory.get("maxmemory_policy"),
+        }
+
+    async def queue_depths(self) -> dict[str, tuple[int, int]]:
+        lanes = [lane.value for lane in JobLane]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in lanes:
+                pipe.zcard(f"lane_pending:{lane}")
+                pipe.xlen(self._stream_key(lane))
+                pipe.xinfo_groups(self._stream_key(lane))
+            # Lanes nothing was ever queued on have no stream or group yet
+            results = await pipe.execute(raise_on_error=False)
+
+        depths = {}
+        for index, lane in enumerate(lanes):
+            waiting, length, groups = results[3 * index:3 * index + 3]
+            if isinstance(length, Exception) or isinstance(groups, Exception):
+                depths[lane] = (waiting, 0)
+                continue
+            # Released entries wait in the stream until a consumer claims them
+            pending = next((g["pending"] for g in groups if g["name"] == CONSUMER_GROUP), 0)
+            depths[lane] = (waiting + max(0, length - pending), pending)
+        return depths
+
+    async def queued_work(self) -> dict[str, float]:
+        lanes = [lane.value for lane in JobLane]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in lanes:
+                pipe.get(f"lane_work_ms:{lane}")
+            results = await pipe.execute()
+        return {lane: max(0, int(ms or 0)) / 1000 for lane, ms in zip(lanes, results)}
+
+    async def learn_job_rate(self, job_type: str, seconds: float, size: Optional[float], smoothing: float):
+        if self._learn_script is None:
+            self._learn_script = self.redis.register_script(LEARN_RATE_SCRIPT)
+        args = [job_type, smoothing, repr(seconds), repr(size) if size is not None else ""]
+        await self._learn_script(keys=[JOB_RATES], args=args, client=self.redis)
+
+    async def publish_cancel(self, job_id: str):
+        await self.redis.publish(CANCEL_CHANNEL, job_id)
+
+    @contextlib.asynccontextmanager
+    async def subscribe_cancels(self) -> AsyncIterator[AsyncIterator[str]]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(CANCEL_CHANNEL)
+        try:
+            yield (message["data"] async for message in pubsub.listen() if message["type"] == "message")
+        finally:
+            await pubsub.aclose()
+
+    @contextlib.asynccontextmanager
+    async def subscribe_updates(self) -> AsyncIterator[AsyncIterator[tuple[str, str]]]:
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe("job_updates:*")
+        try:
+            yield (
+                (message["channel"].split(":", 1)[1], message["data"])
+                async for message in pubsub.listen()
+                if message["type"] == "pmessage"
+            )
+        finally:
+            await pubsub.aclose()
+
+    async def prepare_dispatch(self):
+        for lane in JobLane:
+            try:
+                await self.redis.xgroup_create(self._stream_key(lane.value), CONSUMER_GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def _lane_order(self) -> list[JobLane]:
+        """Poll order from the age of each lane's oldest waiting job."""
+        lanes = list(JobLane)
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for lane in lanes:
+                pipe.zrange(f"lane_pending:{lane.value}", 0, 0, withscores=True)
+            heads = await pipe.execute()
+
+        now = time.time()
+        waited = {
+            lane: now - head[0][1] / 1000
+            for lane, head in zip(lanes, heads) if head
+        }
+        return lane_poll_order(waited, self.settings)
+
+    def _delivery(self, key: str, entry_id: str, fields: dict[str, str]) -> Delivery:
+        return Delivery(lane=key.split(":", 1)[1], entry_id=entry_id, fields=fields)
+
+    async def _claim(self, lane: str, consumer: str) -> Optional[Delivery]:
+        response = await self.redis.xreadgroup(
+            CONSUMER_GROUP, consumer, {self._stream_key(lane): ">"}, count=1
+        )
+        if not response:
+            return None
+
+        key, entries = response[0]
+        delivery = self._delivery(key, *entries[0])
+        if "client" not in delivery.fields:
+            # Queued straight onto the stream by an earlier version
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(f"lane_dequeued:{lane}")
+                if "estimated_seconds" in delivery.fields:
+                    pipe.incrby(f"lane_work_ms:{lane}", -work_ms(delivery.fields["estimated_seconds"]))
+                await pipe.execute()
+        return delivery
+
+    async def _release_job(self, lane: str) -> bool:
+        if self._release_job_script is None:
+            self._release_job_script = self.redis.register_script(RELEASE_JOB_SCRIPT)
+        released = await self._release_job_script(
+            keys=[
+                self._stream_key(lane),
+                f"fair_clients:{lane}",
+                f"fair_vtime:{lane}",
+                f"lane_pending:{lane}",
+                f"lane_dequeued:{lane}",
+                CLIENT_ACTIVE,
+                f"lane_work_ms:{lane}",
+            ],
+            args=[
+                self.settings.client_max_active_jobs,
+                f"{FAIR_QUEUE}:{lane}:",
+                *[value for pair in self.settings.client_weights.items() for value in pair],
+            ],
+            client=self.redis,
+        )
+        return bool(released)
+
+    async def next_delivery(self, consumer: str) -> Optional[Delivery]:
+        delivery = await self._reclaim_stale(consumer)
+        if delivery:
+            return delivery
+
+        for lane in await self._lane_order():
+            # Entries another consumer released but did not claim go first
+            delivery = await self._claim(lane.value, consumer)
+            if delivery is None and await self._release_job(lane.value):
+                delivery = await self._claim(lane.value, consumer)
+            if delivery:
+                return delivery
+
+        # Nothing to claim; wait for add_jobs or an ack to signal new work
+        await self.redis.blpop(JOB_READY, timeout=1)
+        return None
+
+    async def _reclaim_stale(self, consumer: str) -> Optional[Delivery]:
+        """Take over an entry whose worker stopped renewing its lease."""
+        if time.monotonic() < self._next_reclaim_at:
+            return None
+
+        lease_ms = self.settings.job_lease_seconds * 1000
+        for lane in JobLane:
+            key = self._stream_key(lane.value)
+            response = await self.redis.xautoclaim(key, CONSUMER_GROUP, consumer, lease_ms, count=1)
+            claimed = response[1]
+            if not claimed:
+                continue
+
+            entry_id, fields = claimed[0]
+            if fields is None:
+                # Entry was deleted while pending
+                await self.redis.xack(key, CONSUMER_GROUP, entry_id)
+                return None
+            return self._delivery(key, entry_id, fields)
+
+        # Nothing stale; sweep again in half a lease and drop departed consumers
+        self._next_reclaim_at = time.monotonic() + self.settings.job_lease_seconds / 2
+        for lane in JobLane:
+            await self._prune_consumers(self._stream_key(lane.value))
+        return None
+
+    async def _prune_consumers(self, key: str):
+        consumers = await self.redis.xinfo_consumers(key, CONSUMER_GROUP)
+        for info in consumers:
+            if info["pending"] == 0 and info["idle"] > 3600 * 1000:
+                await self.redis.xgroup_delconsumer(key, CONSUMER_GROUP, info["name"])
+
+    async def renew_delivery(self, delivery: Delivery, consumer: str):
+        # Resets the entry's idle time so it is not reclaimed
+        await self.redis.xclaim(
+            self._stream_key(delivery.lane), CONSUMER_GROUP, consumer, 0, [delivery.entry_id], justid=True
+        )
+
+    async def ack(self, delivery: Delivery):
+        key = self._stream_key(delivery.lane)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(key, CONSUMER_GROUP, delivery.entry_id)
+            pipe.xdel(key, delivery.entry_id)
+            await pipe.execute()
+
+        client = delivery.fields.get("client")
+        if client:
+            if self._release_client_script is None:
+                self._release_client_script = self.redis.register_script(RELEASE_CLIENT_SCRIPT)
+            await self._release_client_script(
+                keys=[CLIENT_ACTIVE, JOB_READY], args=[client, READY_TOKENS], client=self.redis
+            )
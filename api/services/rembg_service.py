@@ -1,29 +1,76 @@
+import asyncio
+import threading
+import time
 import uuid
+from typing import Callable, Optional
 import numpy as np
 import cv2
 from PIL import Image
 from rembg import remove, new_session
 
 from services.base_service import BaseProcessingService
+from services.executor_service import executor_service, PoolType
+from services.metrics_service import metrics
 from services.queue_service import job_queue
+from services.trace_service import span
 
 
 class RembgService(BaseProcessingService):
     def __init__(self):
         super().__init__()
         self.session = None
+        self._session_lock = threading.Lock()
 
     def _get_session(self):
-        if self.session is None:
-            self.session = new_session(self.settings.rembg_model)
+        # Called from pool threads; load the model only once
+        with self._session_lock:
+            if self.session is None:
+                self.session = new_session(self.settings.rembg_model)
         return self.session
 
+    def _open_image(self, path: str) -> Image.Image:
+        # Pillow decodes lazily; load now so the decode stage is timed on its own
+        with span("decode"):
+            img = Image.open(path)
+            try:
+                img.load()
+            except BaseException:
+                img.close()
+                raise
+        return img
+
     def _generate_output_filename(self, original_filename: str, suffix: str = "nobg", extension: str = "png") -> str:
         """Override to use simpler naming for background removal."""
         base = original_filename.rsplit(".", 1)[0] if "." in original_filename else original_filename
         unique_id = str(uuid.uuid4())[:8]
         return f"{base}_{suffix}_{unique_id}.{extension}"
 
+    def _progress_reporter(self, job_id: str, cancelled: threading.Event) -> Callable[[int, str], None]:
+        """Build a callback that posts progress from a pool thread to the event loop.
+
+        Once ``cancelled`` is set the callback raises instead, so the pool
+        thread abandons the job at its next progress step.
+        """
+        loop = asyncio.get_running_loop()
+
+        def report(progress: int, message: str):
+            if cancelled.is_set():
+                raise InterruptedError(f"Job {job_id} was cancelled")
+            asyncio.run_coroutine_threadsafe(
+                job_queue.update_job(job_id, progress=progress, message=message), loop
+            ).result()
+
+        return report
+
+    async def _run_in_thread(self, job_id: str, fn: Callable, *args):
+        """Run ``fn(*args, report)`` in the thread pool, stopping it if the job is cancelled."""
+        cancelled = threading.Event()
+        try:
+            await executor_service.run(PoolType.THREAD, fn, *args, self._progress_reporter(job_id, cancelled))
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
     async def remove_background(self, job_id: str, data: dict) -> dict:
         file_id = data["file_id"]
         alpha_matting = data.get("alpha_matting", False)
@@ -36,28 +83,57 @@ class RembgService(BaseProcessingService):
 
         await job_queue.update_job(job_id, progress=10, message="Loading image...")
 
-        with Image.open(input_path) as img:
-            await job_queue.update_job(job_id, progress=20, message="Initializing AI model...")
+        # ONNX Runtime releases the GIL, so a thread shares one loaded model
+        await self._run_in_thread(
+            job_id,
+            self._remove_background,
+            input_path,
+            output_path,
+            alpha_matting,
+            fg_threshold,
+            bg_threshold,
+        )
 
-            session = self._get_session()
+        await job_queue.update_job(job_id, progress=90, message="Finalizing...")
 
-            await job_queue.update_job(job_id, progress=30, message="Removing background (this may take a while)...")
+        return {"output_file": output_filename}
 
-            result = remove(
-                img,
-                session=session,
-                alpha_matting=alpha_matting,
-                alpha_matting_foreground_threshold=fg_threshold,
-                alpha_matting_background_threshold=bg_threshold,
+    def _remove_background(
+        self,
+        input_path: str,
+        output_path: str,
+        alpha_matting: bool,
+        fg_threshold: int,
+        bg_threshold: int,
+        report: Callable[[int, str], None],
+    ):
+        with self._open_image(input_path) as img:
+            report(20, "Initializing AI model...")
+
+            with span("model_load"):
+                session = self._get_session()
+
+            report(30, "Removing background (this may take a while)...")
+
+            started = time.monotonic()
+            with span("process"):
+                result = remove(
+                    img,
+                    session=session,
+                    alpha_matting=alpha_matting,
+                    alpha_matting_foreground_threshold=fg_threshold,
+                    alpha_matting_background_threshold=bg_threshold,
+                )
+            metrics.observe(
+                "ezclip_rembg_inference_seconds",
+                time.monotonic() - started,
+                {"model": self.settings.rembg_model},
             )
 
-            await job_queue.update_job(job_id, progress=80, message="Saving result...")
+            report(80, "Saving result...")
 
-            result.save(output_path, format="PNG")
-
-        await job_queue.update_job(job_id, progress=90, message="Finalizing...")
-
-        return {"output_file": output_filename}
+            with span("save"):
+                result.save(output_path, format="PNG")
 
     async def remove_background_interactive(self, job_id: str, data: dict) -> dict:
         """Remove background using user-specified region (GrabCut algorithm)."""
@@ -72,7 +148,31 @@ class RembgService(BaseProcessingService):
 
         await job_queue.update_job(job_id, progress=10, message="이미지 로딩 중...")
 
-        with Image.open(input_path) as pil_img:
+        # OpenCV releases the GIL while grabCut runs
+        await self._run_in_thread(
+            job_id,
+            self._grabcut,
+            input_path,
+            output_path,
+            rect,
+            fg_points,
+            bg_points,
+        )
+
+        await job_queue.update_job(job_id, progress=90, message="완료 중...")
+
+        return {"output_file": output_filename}
+
+    def _grabcut(
+        self,
+        input_path: str,
+        output_path: str,
+        rect: Optional[list[int]],
+        fg_points: list[list[float]],
+        bg_points: list[list[float]],
+        report: Callable[[int, str], None],
+    ):
+        with self._open_image(input_path) as pil_img:
             # Convert to RGB for OpenCV
             if pil_img.mode == 'RGBA':
                 background = Image.new('RGB', pil_img.size, (255, 255, 255))
@@ -84,7 +184,7 @@ class RembgService(BaseProcessingService):
             img = np.array(pil_img)
             img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
 
-            await job_queue.update_job(job_id, progress=20, message="배경 분석 중...")
+            report(20, "배경 분석 중...")
 
             # Create mask
             mask = np.zeros(img.shape[:2], np.uint8)
@@ -97,9 +197,10 @@ class RembgService(BaseProcessingService):
                 # Use bounding box with GrabCut
                 rect_tuple = tuple(rect)  # (x, y, w, h)
 
-                await job_queue.update_job(job_id, progress=30, message="선택 영역 처리 중...")
+                report(30, "선택 영역 처리 중...")
 
-                cv2.grabCut(img, mask, rect_tuple, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_RECT)
+                with span("process"):
+                    cv2.grabCut(img, mask, rect_tuple, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_RECT)
 
             # Apply foreground points
             if fg_points:
@@ -113,10 +214,11 @@ class RembgService(BaseProcessingService):
 
             # If we have points, run GrabCut again
             if fg_points or bg_points:
-                await job_queue.update_job(job_id, progress=50, message="마스크 정제 중...")
-                cv2.grabCut(img, mask, None, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_MASK)
+                report(50, "마스크 정제 중...")
+                with span("process"):
+                    cv2.grabCut(img, mask, None, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_MASK)
 
-            await job_queue.update_job(job_id, progress=70, message="배경 제거 중...")
+            report(70, "배경 제거 중...")
 
             # Create final mask (GC_FGD=1, GC_PR_FGD=3 are foreground)
             mask2 = np.where((mask == cv2.GC_FGD) | (mask == cv2.GC_PR_FGD), 255, 0).astype('uint8')
@@ -128,12 +230,9 @@ class RembgService(BaseProcessingService):
             result = np.dstack([img_rgb, mask2])
             result_img = Image.fromarray(result, 'RGBA')
 
-            await job_queue.update_job(job_id, progress=85, message="결과 저장 중...")
-            result_img.save(output_path, format="PNG")
-
-        await job_queue.update_job(job_id, progress=90, message="완료 중...")
-
-        return {"output_file": output_filename}
+            report(85, "결과 저장 중...")
+            with span("save"):
+                result_img.save(output_path, format="PNG")
 
 
 # Global instance
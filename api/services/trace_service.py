@@ -0,0 +1,27 @@
+"""Per-job timing spans.
+
+Handlers mark their stages with ``span("decode")``, ``span("ffprobe")`` and
+so on. Spans are recorded on the trace of the job running in the current
+context (threads and pool processes included, see ``executor_service``);
+the queue stores the trace on the job record when the job finishes and, if
+``job_trace_file`` is set, appends it to a JSON-lines file.
+"""
+
+import json
+import os
+from typing import Any
+
+# The spans themselves live in ``pool.tracing`` so pool processes can record
+# them without importing the services package
+from pool.tracing import MAX_SPANS, JobTrace, job_trace, span, call_traced
+
+__all__ = ["MAX_SPANS", "JobTrace", "job_trace", "span", "call_traced", "append_trace"]
+
+
+def append_trace(path: str, record: dict[str, Any]):
+    """Append one job's trace to a JSON-lines file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    # One write on an O_APPEND file, so lines from concurrent workers do not interleave
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
@@ -90,21 +90,22 @@ class VideoService(BaseProcessingService):
                 "-vf", f"{filter_str},palettegen=max_colors={settings['max_colors']}:stats_mode=diff",
                 "-y", palette_path
             ]
-            await self.ffmpeg.run(palette_args)
-
-            await job_queue.update_job(job_id, progress=50, message="Creating GIF...")
-
-            gif_args = time_opts + [
-                "-i", input_path,
-                "-i", palette_path,
-                "-lavfi", f"{filter_str}[x];[x][1:v]paletteuse=dither={settings['dither']}",
-                "-y", output_path
-            ]
-            await self.ffmpeg.run(gif_args)
-
-            # Clean up palette
-            if os.path.exists(palette_path):
-                os.remove(palette_path)
+            try:
+                await self.ffmpeg.run(palette_args, stage="ffmpeg_palette")
+
+                await job_queue.update_job(job_id, progress=50, message="Creating GIF...")
+
+                gif_args = time_opts + [
+                    "-i", input_path,
+                    "-i", palette_path,
+                    "-lavfi", f"{filter_str}[x];[x][1:v]paletteuse=dither={settings['dither']}",
+                    "-y", output_path
+                ]
+                await self.ffmpeg.run(gif_args, stage="ffmpeg_gif")
+            finally:
+                # Clean up palette, also when cancelled or failed
+                if os.path.exists(palette_path):
+                    os.remove(palette_path)
         else:
             args = time_opts + [
                 "-i", input_path,
@@ -0,0 +1,85 @@
+"""Queue fixtures run against each backend.
+
+The Redis backend is tested only when ``TEST_REDIS_HOST`` (and optionally
+``TEST_REDIS_PORT``) names a disposable redis-server: it is flushed before
+and after every test.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from config import get_settings
+from services.queue_backend import create_backend
+from services.queue_service import JobQueue
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _settings(backend: str, tmp_path):
+    return get_settings().model_copy(update={
+        "queue_backend": backend,
+        "redis_host": os.environ.get("TEST_REDIS_HOST", "127.0.0.1"),
+        "redis_port": int(os.environ.get("TEST_REDIS_PORT", "6379")),
+        "upload_dir": str(tmp_path),
+        "processed_dir": str(tmp_path),
+        "worker_concurrency": 1,
+        "job_type_concurrency": {},
+        "job_lease_seconds": 1,
+        "job_trace_file": "",
+    })
+
+
+def make_queue(settings) -> JobQueue:
+    """A queue with its own backend, as in a separate API or worker process."""
+    queue = JobQueue()
+    queue.settings = settings
+    queue.backend = create_backend(settings)
+    return queue
+
+
+@pytest.fixture(params=["memory", "redis"])
+async def settings(request, tmp_path):
+    settings = _settings(request.param, tmp_path)
+    if request.param == "redis":
+        if "TEST_REDIS_HOST" not in os.environ:
+            pytest.skip("set TEST_REDIS_HOST to a disposable redis-server")
+        queue = make_queue(settings)
+        await queue.connect()
+        await queue.redis.flushdb()
+        await queue.disconnect()
+
+    yield settings
+
+    if request.param == "redis":
+        queue = make_queue(settings)
+        await queue.connect()
+        await queue.redis.flushdb()
+        await queue.disconnect()
+
+
+@pytest.fixture
+async def queue(settings):
+    queue = make_queue(settings)
+    await queue.connect()
+    yield queue
+    if queue.worker_tasks:
+        await queue.stop_worker()
+    else:
+        await queue.disconnect()
+
+
+async def wait_for_status(queue: JobQueue, job_id: str, status: str, timeout: float = 10) -> str:
+    """Poll a job until it reaches ``status``; returns the last status seen."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    current = None
+    while asyncio.get_running_loop().time() < deadline:
+        current = await queue.backend.get_job_field(job_id, "status")
+        if current == status:
+            break
+        await asyncio.sleep(0.05)
+    return current
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from models.job import JobStatus
+from services.executor_service import executor_service, PoolType
+from services.queue_backend import create_backend
+from services.queue_service import track_output
+from tests.conftest import make_queue, wait_for_status
+
+pytestmark = pytest.mark.anyio
+
+
+async def next_delivery(backend, consumer: str, attempts: int = 5):
+    for _ in range(attempts):
+        delivery = await backend.next_delivery(consumer)
+        if delivery:
+            return delivery
+    return None
+
+
+async def test_enqueued_job_is_delivered_once_and_acked(queue):
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    await queue.backend.prepare_dispatch()
+
+    delivery = await next_delivery(queue.backend, "consumer-1")
+    assert delivery.fields["job_id"] == job_id
+    assert delivery.fields["job_type"] == "image_resize"
+
+    # Claimed by one consumer, so no other consumer gets it
+    assert await queue.backend.next_delivery("consumer-2") is None
+
+    await queue.backend.ack(delivery)
+    if queue.redis is not None:
+        pending = await queue.redis.xpending(f"job_stream:{delivery.lane}", "workers")
+        assert pending["pending"] == 0
+
+
+async def test_worker_runs_handler_and_completes_job(queue, tmp_path):
+    async def handler(job_id, data):
+        (tmp_path / "out.png").write_bytes(b"x" * data["width"])
+        return {"output_file": "out.png"}
+
+    queue.register_handler("image_resize", handler)
+    await queue.start_worker()
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+
+    assert await wait_for_status(queue, job_id, JobStatus.COMPLETED.value) == JobStatus.COMPLETED.value
+    job = await queue.get_job(job_id)
+    assert job.output_file == "out.png"
+    assert job.file_size == 10
+
+
+async def test_job_of_dead_consumer_is_reclaimed(queue, settings):
+    if settings.queue_backend == "memory":
+        pytest.skip("in-memory jobs end with the process that claimed them")
+
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    await queue.backend.prepare_dispatch()
+
+    # Claimed, then the consumer goes away without acknowledging or renewing
+    dead = create_backend(settings)
+    await dead.connect()
+    assert (await next_delivery(dead, "dead-consumer")).fields["job_id"] == job_id
+    await dead.close()
+
+    handled = []
+
+    async def handler(job_id, data):
+        handled.append(job_id)
+        return {}
+
+    # Another worker takes it over once the lease (1s) has expired
+    worker = make_queue(settings)
+    worker.register_handler("image_resize", handler)
+    await worker.start_worker()
+    try:
+        assert await wait_for_status(worker, job_id, JobStatus.COMPLETED.value) == JobStatus.COMPLETED.value
+    finally:
+        await worker.stop_worker()
+
+    assert handled == [job_id]
+    assert await queue.backend.get_job_field(job_id, "attempts") == "1"
+    pending = await queue.redis.xpending("job_stream:interactive", "workers")
+    assert pending["pending"] == 0
+
+
+async def test_cancelled_waiting_job_is_not_run(queue):
+    handled = []
+
+    async def handler(job_id, data):
+        handled.append(job_id)
+        return {}
+
+    queue.register_handler("image_resize", handler)
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    assert await queue.cancel_job(job_id)
+
+    await queue.start_worker()
+    # A job queued behind it runs, so the cancelled one has been dequeued by then
+    later = await queue.enqueue("image_resize", {"file_id": "b.png", "width": 10})
+    assert await wait_for_status(queue, later, JobStatus.COMPLETED.value) == JobStatus.COMPLETED.value
+
+    assert handled == [later]
+    assert await queue.backend.get_job_field(job_id, "status") == JobStatus.CANCELLED.value
+
+
+async def test_cancel_interrupts_running_job(queue):
+    started = asyncio.Event()
+    interrupted = asyncio.Event()
+
+    async def handler(job_id, data):
+        await queue.update_job(job_id, progress=10, message="Working...")
+        started.set()
+        try:
+            while True:
+                await asyncio.sleep(0.01)
+                await queue.update_job(job_id, progress=20, message="Still working...")
+        except asyncio.CancelledError:
+            interrupted.set()
+            raise
+
+    queue.register_handler("image_resize", handler)
+    await queue.start_worker()
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    await asyncio.wait_for(started.wait(), 10)
+
+    assert await queue.cancel_job(job_id)
+    await asyncio.wait_for(interrupted.wait(), 10)
+    for _ in range(100):
+        if job_id not in queue._active_jobs:
+            break
+        await asyncio.sleep(0.05)
+
+    # No progress state or pending flush outlives the job to overwrite it
+    assert job_id not in queue._progress
+    await asyncio.sleep(0.5)
+    job = await queue.get_job(job_id)
+    assert job.status == JobStatus.CANCELLED
+    assert job.message == "Job cancelled by user"
+
+
+async def test_cancel_removes_output_written_by_running_pool_work(queue, tmp_path):
+    output = tmp_path / "out.png"
+    started = threading.Event()
+
+    def render(path):
+        started.set()
+        time.sleep(0.5)
+        with open(path, "wb") as f:
+            f.write(b"x")
+
+    async def handler(job_id, data):
+        track_output(str(output))
+        await executor_service.run(PoolType.THREAD, render, str(output))
+        return {"output_file": "out.png"}
+
+    queue.register_handler("image_resize", handler)
+    await queue.start_worker()
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    assert await asyncio.get_running_loop().run_in_executor(None, started.wait, 10)
+
+    # The pool keeps running the work after the handler is cancelled; its
+    # output must still be cleaned up once it has been written
+    assert await queue.cancel_job(job_id)
+    assert await wait_for_status(queue, job_id, JobStatus.CANCELLED.value) == JobStatus.CANCELLED.value
+    for _ in range(100):
+        if job_id not in queue._active_jobs:
+            break
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+    assert not output.exists()
+
+
+async def test_lease_renewal_survives_backend_errors(queue, monkeypatch):
+    job_id = await queue.enqueue("image_resize", {"file_id": "a.png", "width": 10})
+    await queue.backend.prepare_dispatch()
+    delivery = await next_delivery(queue.backend, "consumer-1")
+
+    renewals = []
+
+    async def renew_delivery(delivery, consumer):
+        renewals.append(consumer)
+        if len(renewals) == 1:
+            raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(queue.backend, "renew_delivery", renew_delivery)
+    lease = asyncio.create_task(queue._renew_lease(delivery, "consumer-1"))
+    await asyncio.sleep(queue.settings.job_lease_seconds)
+    assert not lease.done()
+    lease.cancel()
+    await queue.backend.ack(delivery)
+
+    assert len(renewals) >= 2
+    assert delivery.fields["job_id"] == job_id
+
+
+async def test_cancel_is_refused_once_job_has_finished(queue):
+    job_ids = await queue.enqueue_many(
+        [("image_resize", {"file_id": "a.png", "width": 10})], batch_id="batch-1"
+    )
+    job_id = job_ids[0]
+    assert await queue.update_job(job_id, status=JobStatus.PROCESSING)
+    assert await queue.update_job(job_id, status=JobStatus.COMPLETED, output_file="out.png")
+
+    # Refused inside the atomic update, not just by the status check before it
+    assert not await queue.update_job(job_id, status=JobStatus.CANCELLED)
+    assert not await queue.cancel_job(job_id)
+
+    assert await queue.backend.get_job_field(job_id, "status") == JobStatus.COMPLETED.value
+    batch = await queue.backend.get_batch("batch-1")
+    assert batch[JobStatus.COMPLETED.value] == "1"
+    assert batch[JobStatus.CANCELLED.value] == "0"
+
+
+async def test_jobs_waiting_in_legacy_queue_run_after_upgrade(queue, settings):
+    if settings.queue_backend == "memory":
+        pytest.skip("only Redis keeps jobs from before the upgrade")
+
+    # Stored and queued the way versions before lanes did
+    now = datetime.utcnow().isoformat()
+    job_ids = ["legacy-1", "legacy-2", "legacy-3"]
+    for job_id in job_ids:
+        await queue.redis.hset(f"job:{job_id}", mapping={
+            "job_id": job_id,
+            "job_type": "image_resize",
+            "status": JobStatus.PENDING.value,
+            "progress": "0",
+            "data": json.dumps({"file_id": "a.png", "width": 10}),
+            "created_at": now,
+            "updated_at": now,
+        })
+        await queue.redis.lpush("job_queue", json.dumps({"job_id": job_id, "job_type": "image_resize"}))
+    await queue.update_job("legacy-2", status=JobStatus.CANCELLED)
+
+    handled = []
+
+    async def handler(job_id, data):
+        handled.append(job_id)
+        return {}
+
+    assert await queue.migrate_job_queue() == 2
+    assert await queue.migrate_job_queue() == 0
+    assert not await queue.redis.exists("job_queue", "job_queue:migrating")
+
+    queue.register_handler("image_resize", handler)
+    await queue.start_worker()
+    for job_id in ("legacy-1", "legacy-3"):
+        assert await wait_for_status(queue, job_id, JobStatus.COMPLETED.value) == JobStatus.COMPLETED.value
+    assert handled == ["legacy-1", "legacy-3"]
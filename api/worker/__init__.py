@@ -0,0 +1 @@
+"""Standalone job worker; run with ``python -m worker``."""
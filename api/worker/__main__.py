@@ -0,0 +1,52 @@
+"""Standalone job worker.
+
+Runs the job queue consumers without the HTTP API, so media processing can be
+scaled separately from request serving:
+
+    python -m worker
+
+It is the package's ``__main__`` so spawned process pool workers, which
+re-import the parent's main module unless it is a ``__main__``, do not load
+the queue and handlers again.
+"""
+
+import asyncio
+import os
+import signal
+
+from config import get_settings
+from services.executor_service import executor_service
+from services.handlers import register_handlers
+from services.metrics_service import metrics
+from services.queue_service import job_queue
+
+
+async def main():
+    settings = get_settings()
+    if settings.queue_backend == "memory":
+        raise SystemExit("The in-memory queue backend runs jobs inside the API; use QUEUE_BACKEND=redis with a separate worker")
+
+    # Ensure directories exist
+    for directory in [settings.upload_dir, settings.processed_dir, settings.temp_dir, settings.cache_dir, settings.blob_dir, settings.probe_dir]:
+        os.makedirs(directory, exist_ok=True)
+
+    register_handlers()
+    await metrics.start()
+    await job_queue.start_worker()
+    print(f"Worker started with {settings.worker_concurrency} consumers")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+
+    # Jobs interrupted here stay unacknowledged and are reclaimed by another worker
+    await job_queue.stop_worker()
+    await metrics.stop()
+    executor_service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,14 @@
-import type { JobDetail, JobListResponse, JobResponse } from './types'
+import type { JobDetail, JobListParams, JobListResponse, JobResponse } from './types'
 
 const API_BASE = '/api'
 
-export async function listJobs(page: number = 1, pageSize: number = 20): Promise<JobListResponse> {
-  const res = await fetch(`${API_BASE}/jobs?page=${page}&page_size=${pageSize}`)
+export async function listJobs({ cursor, pageSize = 20, status, jobType }: JobListParams = {}): Promise<JobListResponse> {
+  const params = new URLSearchParams({ page_size: String(pageSize) })
+  if (cursor) params.set('cursor', cursor)
+  if (status) params.set('status', status)
+  if (jobType) params.set('job_type', jobType)
+
+  const res = await fetch(`${API_BASE}/jobs?${params}`)
 
   if (!res.ok) {
     throw new Error('Failed to fetch jobs')
@@ -125,3 +130,42 @@ export function subscribeToJob(
 
   return cleanup
 }
+
+export function subscribeToJobs(
+  jobIds: string[],
+  onUpdate: (jobId: string, data: Partial<JobDetail>) => void,
+  onDone?: () => void
+): () => void {
+  const params = new URLSearchParams({ job_ids: jobIds.join(',') })
+  // One connection for every job; null fields in updates mean "unchanged"
+  const eventSource = new EventSource(`${API_BASE}/jobs/stream?${params}`)
+
+  const cleanup = () => {
+    eventSource.close()
+  }
+
+  eventSource.addEventListener('snapshot', (event) => {
+    try {
+      const jobs: Partial<JobDetail>[] = JSON.parse((event as MessageEvent).data)
+      jobs.forEach((job) => job.job_id && onUpdate(job.job_id, job))
+    } catch (e) {
+      console.error('Failed to parse SSE snapshot:', e)
+    }
+  })
+
+  eventSource.onmessage = (event) => {
+    try {
+      const data = JSON.parse(event.data)
+      onUpdate(data.job_id, data)
+    } catch (e) {
+      console.error('Failed to parse SSE data:', e)
+    }
+  }
+
+  eventSource.addEventListener('done', () => {
+    cleanup()
+    onDone?.()
+  })
+
+  return cleanup
+}
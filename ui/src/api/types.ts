@@ -1,6 +1,8 @@
 // Job types
 export type JobStatus = 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled'
 
+export type JobLane = 'interactive' | 'normal' | 'bulk'
+
 export type JobType =
   | 'image_convert'
   | 'image_resize'
@@ -25,26 +27,40 @@ export interface JobResponse {
   message?: string
 }
 
-export interface JobDetail {
+// Listing projection of a job (no request data)
+export interface JobSummary {
   job_id: string
   job_type: JobType
   status: JobStatus
   progress: number
   message?: string
-  input_file?: string
   output_file?: string
   file_size?: number
   created_at: string
   updated_at: string
   error?: string
+  lane?: JobLane
+  queue_position?: number
+  batch_id?: string
+}
+
+export interface JobDetail extends JobSummary {
+  input_file?: string
   metadata?: Record<string, unknown>
 }
 
 export interface JobListResponse {
-  jobs: JobDetail[]
+  jobs: JobSummary[]
   total: number
-  page: number
   page_size: number
+  next_cursor?: string
+}
+
+export interface JobListParams {
+  cursor?: string
+  pageSize?: number
+  status?: JobStatus
+  jobType?: JobType
 }
 
 // Upload types
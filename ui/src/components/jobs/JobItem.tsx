@@ -1,10 +1,9 @@
-import { useJobProgress } from '../../hooks'
 import { ProgressBar } from '../common'
-import type { JobDetail } from '../../api/types'
+import type { JobSummary } from '../../api/types'
 import styles from './JobItem.module.css'
 
 interface JobItemProps {
-  job: JobDetail
+  job: JobSummary
   onCancel?: () => void
   onDownload?: () => void
 }
@@ -37,8 +36,6 @@ const statusLabels: Record<string, string> = {
 export default function JobItem({ job, onCancel, onDownload }: JobItemProps) {
   const isActive = job.status === 'pending' || job.status === 'processing'
 
-  useJobProgress(isActive ? job.job_id : null)
-
   return (
     <div className={`${styles.item} ${styles[job.status]}`}>
       <div className={styles.header}>
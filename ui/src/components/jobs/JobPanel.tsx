@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react'
 import { useJobStore } from '../../stores'
+import { useJobsProgress } from '../../hooks'
 import { listJobs, cancelJob, getDownloadUrl } from '../../api/jobs'
 import JobItem from './JobItem'
 import styles from './JobPanel.module.css'
@@ -17,7 +18,7 @@ export default function JobPanel() {
   async function loadJobs() {
     try {
       setLoading(true)
-      const response = await listJobs(1, 50)
+      const response = await listJobs({ pageSize: 50 })
       setJobs(response.jobs)
     } catch (error) {
       console.error('Failed to load jobs:', error)
@@ -42,6 +43,9 @@ export default function JobPanel() {
   const activeJobs = jobs.filter(
     (j) => j.status === 'pending' || j.status === 'processing'
   )
+  // Watch every active job over a single SSE connection
+  useJobsProgress(activeJobs.map((j) => j.job_id))
+
   const recentJobs = jobs.filter(
     (j) => j.status === 'completed' || j.status === 'failed'
   ).slice(0, 10)
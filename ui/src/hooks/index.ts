@@ -1,4 +1,4 @@
-export { useJobProgress, useJobProgressCallback } from './useJobProgress'
+export { useJobProgress, useJobsProgress, useJobProgressCallback } from './useJobProgress'
 export { useUpload } from './useUpload'
 export { useCropSelection } from './useCropSelection'
 export type { CropState, CropScale } from './useCropSelection'
@@ -1,5 +1,5 @@
 import { useEffect, useCallback } from 'react'
-import { subscribeToJob } from '../api/jobs'
+import { subscribeToJob, subscribeToJobs } from '../api/jobs'
 import { useJobStore } from '../stores'
 import type { JobDetail } from '../api/types'
 
@@ -23,6 +23,25 @@ export function useJobProgress(jobId: string | null) {
   }, [jobId, updateJob])
 }
 
+export function useJobsProgress(jobIds: string[]) {
+  const updateJob = useJobStore((s) => s.updateJob)
+  // Resubscribe only when the set of jobs changes, not on every render
+  const key = [...jobIds].sort().join(',')
+
+  useEffect(() => {
+    if (!key) return
+
+    const unsubscribe = subscribeToJobs(key.split(','), (jobId, data) => {
+      const updates = Object.fromEntries(
+        Object.entries(data).filter(([, value]) => value !== null)
+      ) as Partial<JobDetail>
+      updateJob(jobId, updates)
+    })
+
+    return () => unsubscribe()
+  }, [key, updateJob])
+}
+
 export function useJobProgressCallback() {
   const updateJob = useJobStore((s) => s.updateJob)
 
@@ -2,27 +2,26 @@ import { useEffect, useState } from 'react'
 import { Card, Button } from '../components/common'
 import { JobItem } from '../components/jobs'
 import { listJobs, getDownloadUrl } from '../api/jobs'
-import type { JobDetail } from '../api/types'
+import type { JobSummary } from '../api/types'
 import styles from './HistoryPage.module.css'
 
 export default function HistoryPage() {
-  const [jobs, setJobs] = useState<JobDetail[]>([])
+  const [jobs, setJobs] = useState<JobSummary[]>([])
   const [loading, setLoading] = useState(true)
-  const [page, setPage] = useState(1)
-  const [hasMore, setHasMore] = useState(true)
+  const [cursor, setCursor] = useState<string | undefined>()
 
-  async function loadJobs(pageNum: number, append = false) {
+  async function loadJobs(fromCursor?: string) {
     try {
       setLoading(true)
-      const response = await listJobs(pageNum, 20)
+      const response = await listJobs({ cursor: fromCursor, pageSize: 20 })
 
-      if (append) {
+      if (fromCursor) {
         setJobs((prev) => [...prev, ...response.jobs])
       } else {
         setJobs(response.jobs)
       }
 
-      setHasMore(response.jobs.length === 20)
+      setCursor(response.next_cursor)
     } catch (error) {
       console.error('Failed to load jobs:', error)
     } finally {
@@ -31,13 +30,11 @@ export default function HistoryPage() {
   }
 
   useEffect(() => {
-    loadJobs(1)
+    loadJobs()
   }, [])
 
   function handleLoadMore() {
-    const nextPage = page + 1
-    setPage(nextPage)
-    loadJobs(nextPage, true)
+    loadJobs(cursor)
   }
 
   function handleDownload(jobId: string) {
@@ -115,7 +112,7 @@ export default function HistoryPage() {
           </Card>
         )}
 
-        {hasMore && jobs.length > 0 && (
+        {cursor && jobs.length > 0 && (
           <div className={styles.loadMore}>
             <Button
               variant="secondary"